@@ -0,0 +1,126 @@
+"""Compares ways of picking wrong answer options for quiz cards.
+
+* ``full list`` - the original approach: a list of every other word of the
+  user is built for each card and sampled with ``random.sample``;
+* ``random ids`` - random words from an ``IndexedIdSet``;
+* ``distractor index`` - neighbours by length and edit distance from a
+  ``DistractorIndex``, computed on first use.
+
+For every vocabulary size the build time, the time per card and the mean
+edit distance between the target and its options (lower means more
+plausible options) are reported.
+
+Usage (from the project root):
+    python -m benchmarks.distractors [--sizes 1000,100000,1000000] [--json]
+"""
+import argparse
+import json
+import random
+import string
+import time
+from typing import Callable
+
+from modules.search import DistractorIndex, IndexedIdSet, edit_distance
+
+
+def generate_words(count: int, rng: random.Random) -> dict[int, str]:
+    """Generates random lowercase words of 3 to 12 letters."""
+    return {
+        word_id: ''.join(
+            rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))
+        )
+        for word_id in range(1, count + 1)
+    }
+
+
+def measure(
+        words: dict[int, str], pick: Callable[[int], list[int]],
+        targets: list[int]
+) -> dict[str, float]:
+    """Times picking options for the targets and scores their plausibility."""
+    started_at: float = time.perf_counter()
+    options: list[list[int]] = [pick(target) for target in targets]
+    elapsed: float = time.perf_counter() - started_at
+
+    distances: list[int] = [
+        edit_distance(words[target], words[option])
+        for target, target_options in zip(targets, options)
+        for option in target_options
+    ]
+    return {
+        'pick_us': elapsed / len(targets) * 1e6,
+        'mean_distance': sum(distances) / len(distances),
+    }
+
+
+def run_benchmark(size: int, picks: int, baseline_picks: int, seed: int) \
+        -> dict[str, dict[str, float]]:
+    """Runs the three approaches on a vocabulary of the given size."""
+    rng = random.Random(seed)
+    words: dict[int, str] = generate_words(size, rng)
+    targets: list[int] = rng.choices(list(words), k=picks)
+    results: dict[str, dict[str, float]] = {}
+
+    def pick_from_full_list(target: int) -> list[int]:
+        candidates = [word_id for word_id in words if word_id != target]
+        return random.sample(candidates, 3)
+
+    results['full list'] = {
+        'build_s': 0.0,
+        **measure(words, pick_from_full_list, targets[:baseline_picks]),
+    }
+
+    started_at: float = time.perf_counter()
+    ids = IndexedIdSet()
+    for word_id in words:
+        ids.add(word_id)
+    results['random ids'] = {
+        'build_s': time.perf_counter() - started_at,
+        **measure(words, lambda target: ids.sample(3, target), targets),
+    }
+
+    started_at = time.perf_counter()
+    index = DistractorIndex()
+    for word_id, word in words.items():
+        index.add(word_id, word)
+    results['distractor index'] = {
+        'build_s': time.perf_counter() - started_at,
+        **measure(words, lambda target: index.choose(target, 3), targets),
+    }
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--picks', type=int, default=10000)
+    parser.add_argument(
+        '--baseline-picks', type=int, default=50,
+        help='cards picked with the full list approach'
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print JSON')
+    args = parser.parse_args()
+
+    report: dict[str, dict] = {
+        size: run_benchmark(
+            int(size), args.picks, args.baseline_picks, args.seed
+        )
+        for size in args.sizes.split(',')
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f'{"words":>8} {"approach":<17} {"build, s":>9} '
+          f'{"pick, us":>10} {"distance":>9}')
+    for size, results in report.items():
+        for name, stats in results.items():
+            print(f'{size:>8} {name:<17} {stats["build_s"]:>9.2f} '
+                  f'{stats["pick_us"]:>10.1f} {stats["mean_distance"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Compares ways of finding the words closest to a misspelt one.
+
+* ``linear scan`` - the edit distance to every word of the vocabulary;
+* ``fuzzy index`` - a ``FuzzyWordIndex`` filtering the words by shared
+  letter pairs and length before comparing them.
+
+The queries are vocabulary words with a random typo (a letter replaced,
+inserted or deleted), looked up within the edit distance allowed for
+their length. For every vocabulary size the build time, the median and
+99th percentile lookup time, and whether both approaches found the same
+words are reported.
+
+Usage (from the project root):
+    python -m benchmarks.fuzzy_lookup [--sizes 1000,10000,100000] [--json]
+"""
+import argparse
+import json
+import random
+import string
+import time
+from typing import Callable
+
+from modules.search import FuzzyWordIndex, allowed_edits, edit_distance
+
+from benchmarks.distractors import generate_words
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Returns the word with one letter replaced, inserted or deleted."""
+    position: int = rng.randrange(len(word))
+    letter: str = rng.choice(string.ascii_lowercase)
+    typo: str = rng.choice(('replace', 'insert', 'delete'))
+    if typo == 'replace':
+        return word[:position] + letter + word[position + 1:]
+    if typo == 'insert':
+        return word[:position] + letter + word[position:]
+    return word[:position] + word[position + 1:]
+
+
+def measure(
+        lookup: Callable[[str, int], list[tuple[int, int]]],
+        queries: list[str],
+        max_distance: int,
+        limit: int
+) -> tuple[dict[str, float], list[list[tuple[int, int]]]]:
+    """Times the lookups and returns the timings and the found words."""
+    timings: list[float] = []
+    found: list[list[tuple[int, int]]] = []
+    for query in queries:
+        started_at: float = time.perf_counter()
+        matches = lookup(query, allowed_edits(query, max_distance))
+        timings.append(time.perf_counter() - started_at)
+        found.append(matches[:limit])
+
+    timings.sort()
+    return {
+        'p50_us': timings[len(timings) // 2] * 1e6,
+        'p99_us': timings[int(len(timings) * 0.99)] * 1e6,
+    }, found
+
+
+def run_benchmark(
+        size: int,
+        lookups: int,
+        baseline_lookups: int,
+        max_distance: int,
+        limit: int,
+        seed: int
+) -> dict[str, dict[str, float]]:
+    """Runs both approaches on a vocabulary of the given size."""
+    rng = random.Random(seed)
+    words: dict[int, str] = generate_words(size, rng)
+    queries: list[str] = [
+        misspell(word, rng)
+        for word in rng.choices(list(words.values()), k=lookups)
+    ]
+
+    def scan(query: str, distance: int) -> list[tuple[int, int]]:
+        return sorted(
+            (word_distance, word_id)
+            for word_id, word in words.items()
+            if (word_distance := edit_distance(query, word, distance))
+            <= distance
+        )
+
+    scan_stats, scan_found = measure(
+        scan, queries[:baseline_lookups], max_distance, limit
+    )
+
+    started_at: float = time.perf_counter()
+    index = FuzzyWordIndex()
+    for word_id, word in words.items():
+        index.add(word_id, word)
+    build_s: float = time.perf_counter() - started_at
+    index_stats, index_found = measure(
+        lambda query, distance: index.search(query, distance, limit),
+        queries, max_distance, limit
+    )
+
+    same: bool = index_found[:baseline_lookups] == scan_found
+    return {
+        'linear scan': {'build_s': 0.0, **scan_stats, 'same': True},
+        'fuzzy index': {'build_s': build_s, **index_stats, 'same': same},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument(
+        '--baseline-lookups', type=int, default=50,
+        help='lookups made with the linear scan'
+    )
+    parser.add_argument('--max-distance', type=int, default=2)
+    parser.add_argument('--limit', type=int, default=3,
+                        help='closest words returned per lookup')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print JSON')
+    args = parser.parse_args()
+
+    report: dict[str, dict] = {
+        size: run_benchmark(
+            int(size), args.lookups, args.baseline_lookups,
+            args.max_distance, args.limit, args.seed
+        )
+        for size in args.sizes.split(',')
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f'{"words":>8} {"approach":<12} {"build, s":>9} '
+          f'{"p50, us":>9} {"p99, us":>9} {"same":>5}')
+    for size, results in report.items():
+        for name, stats in results.items():
+            print(f'{size:>8} {name:<12} {stats["build_s"]:>9.2f} '
+                  f'{stats["p50_us"]:>9.1f} {stats["p99_us"]:>9.1f} '
+                  f'{"yes" if stats["same"] else "no":>5}')
+
+
+if __name__ == '__main__':
+    main()
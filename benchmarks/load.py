@@ -0,0 +1,450 @@
+"""Synthetic load benchmark of the bot handlers.
+
+Simulated users go through the start, quiz/answer, add word, delete word
+and help flows of the sync bot concurrently, in one process. Bot API
+calls go to a stub transport that records them instead of using the
+network, and the database is a fresh SQLite file (or the database given
+by ``--db-url``, which must be a dedicated, empty one).
+
+For every kind of update the handler latency percentiles and the number
+of database queries are reported, together with the overall throughput.
+The result is written as JSON, so runs on different commits can be
+compared.
+
+Usage (from the project root):
+    python -m benchmarks.load [--users 50] [--actions 30] [--output load.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import string
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+
+PROJECT_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILES = ('chatbot.json', 'words.json')
+ACTION_WEIGHTS: dict[str, int] = {'quiz': 6, 'add': 2, 'delete': 1, 'help': 1}
+REPLY_TIMEOUT = 10.0
+
+
+class StubResponse:
+    """A successful Bot API response."""
+
+    def __init__(self, result) -> None:
+        self.status_code = 200
+        self.reason = 'OK'
+        self.text: str = json.dumps({'ok': True, 'result': result})
+        self._result = result
+
+    def json(self) -> dict:
+        return {'ok': True, 'result': self._result}
+
+
+class StubTransport:
+    """Records Bot API calls instead of sending them to Telegram.
+
+    Installed as ``apihelper.CUSTOM_REQUEST_SENDER``. Sent messages and
+    their edits are kept per chat; simulated users wait on it for the bot's
+    replies to their chat.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Counter[str] = Counter()
+        self._messages: dict[int, list[dict]] = defaultdict(list)
+        self._message_ids = itertools.count(1)
+        self._condition = threading.Condition()
+
+    def __call__(self, method: str, url: str, **kwargs) -> StubResponse:
+        api_method: str = url.rsplit('/', 1)[-1]
+        params: dict = kwargs.get('params') or {}
+
+        with self._condition:
+            self.calls[api_method] += 1
+            if api_method == 'editMessageText':
+                self._messages[int(params['chat_id'])].append(params)
+            if api_method != 'sendMessage':
+                return StubResponse(True)
+
+            chat_id = int(params['chat_id'])
+            self._messages[chat_id].append(params)
+            self._condition.notify_all()
+            return StubResponse({
+                'message_id': next(self._message_ids),
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': params.get('text', ''),
+            })
+
+    def messages(self, chat_id: int) -> list[dict]:
+        """Returns the parameters of the messages sent to the chat and of
+        their edits."""
+        with self._condition:
+            return list(self._messages[chat_id])
+
+    def count(self, chat_id: int) -> int:
+        """Returns the number of messages sent to the chat so far."""
+        with self._condition:
+            return len(self._messages[chat_id])
+
+    def wait_for_options(
+            self, chat_id: int, seen: int, final_text: str
+    ) -> list[str] | None:
+        """Waits for a reply keyboard sent to the chat after the first
+        ``seen`` messages and returns its button texts.
+
+        Returns None if a message containing ``final_text`` comes first or
+        nothing comes in time.
+        """
+        def find_options() -> list[str] | None:
+            for params in self._messages[chat_id][seen:]:
+                markup: dict = json.loads(params.get('reply_markup') or '{}')
+                if 'keyboard' in markup:
+                    return [
+                        button['text']
+                        for row in markup['keyboard'] for button in row
+                    ]
+                if final_text in params.get('text', ''):
+                    return []
+
+            return None
+
+        with self._condition:
+            options: list[str] | None = self._condition.wait_for(
+                find_options, REPLY_TIMEOUT
+            )
+            return options or None
+
+
+class LoadRecorder:
+    """Measures the handler latency and the database queries per update."""
+
+    def __init__(self, engine) -> None:
+        from modules.tg_bot.metrics import LatencyStats
+
+        self._new_stats = lambda: LatencyStats(window=10 ** 7)
+        self.latency: dict[str, 'LatencyStats'] = defaultdict(self._new_stats)
+        self.total = self._new_stats()
+        self.queries: dict[str, list[int]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        from sqlalchemy import event
+        event.listen(engine, 'before_cursor_execute', self._count_query)
+
+    def _count_query(self, *args) -> None:
+        if hasattr(self._local, 'queries'):
+            self._local.queries += 1
+
+    def measure(self, kind: str, handle: Callable[[], None]) -> None:
+        """Runs the handling of one update and records its cost."""
+        self._local.queries = 0
+        started_at: float = time.perf_counter()
+        try:
+            handle()
+        except Exception as e:
+            with self._lock:
+                self.errors[f'{kind}: {type(e).__name__}'] += 1
+        elapsed: float = time.perf_counter() - started_at
+
+        with self._lock:
+            stats = self.latency[kind]
+            self.queries[kind].append(self._local.queries)
+        stats.observe(elapsed)
+        self.total.observe(elapsed)
+        del self._local.queries
+
+    def report(self) -> dict:
+        """Returns the latency in milliseconds and the query counts."""
+        from modules.tg_bot.metrics import percentile
+
+        def in_ms(snapshot: dict) -> dict:
+            return {
+                key: value if key == 'count' else round(value * 1000, 3)
+                for key, value in snapshot.items()
+            }
+
+        def summarize(counts: list[int]) -> dict:
+            ordered: list[int] = sorted(counts)
+            return {
+                'avg': round(sum(ordered) / len(ordered), 2),
+                'p50': percentile(ordered, 0.50),
+                'p95': percentile(ordered, 0.95),
+                'max': ordered[-1],
+            }
+
+        all_queries: list[int] = list(itertools.chain(*self.queries.values()))
+        return {
+            'latency_ms': {
+                'all': in_ms(self.total.snapshot()),
+                **{
+                    kind: in_ms(stats.snapshot())
+                    for kind, stats in sorted(self.latency.items())
+                },
+            },
+            'queries_per_update': {
+                'all': summarize(all_queries),
+                **{
+                    kind: summarize(counts)
+                    for kind, counts in sorted(self.queries.items())
+                },
+            },
+            'errors': dict(self.errors),
+        }
+
+
+class SimulatedUser:
+    """A user going through random bot flows, one update at a time."""
+
+    def __init__(
+            self, chat_id: int, bot, transport: StubTransport,
+            recorder: LoadRecorder, rng: random.Random
+    ) -> None:
+        self.chat_id = chat_id
+        self.bot = bot
+        self.transport = transport
+        self.recorder = recorder
+        self.rng = rng
+        self.own_words: list[str] = []
+
+    def run(self, actions: int) -> None:
+        """Starts the bot and performs the given number of random flows."""
+        self.send('start', '/start')
+        for _ in range(actions):
+            action: str = self.rng.choices(
+                list(ACTION_WEIGHTS), list(ACTION_WEIGHTS.values())
+            )[0]
+            getattr(self, action)()
+
+    def send(self, kind: str, text: str) -> None:
+        """Handles a text message of the user."""
+        from telebot import types
+
+        message: dict = {
+            'message_id': self.rng.randint(1, 2 ** 31),
+            'date': int(time.time()),
+            'chat': {'id': self.chat_id, 'type': 'private'},
+            'from': {'id': self.chat_id, 'is_bot': False, 'first_name': 'u'},
+            'text': text,
+        }
+        if text.startswith('/'):
+            message['entities'] = [{
+                'type': 'bot_command', 'offset': 0, 'length': len(text)
+            }]
+        update = types.Update.de_json(
+            {'update_id': message['message_id'], 'message': message}
+        )
+        self.recorder.measure(
+            kind, lambda: self.bot.process_new_updates([update])
+        )
+
+    def quiz(self) -> None:
+        """Asks for a card and picks one of the answer options."""
+        from modules.tg_bot.bot_config import CHATBOT_ERRORS
+
+        seen: int = self.transport.count(self.chat_id)
+        self.send('quiz', '/next')
+        options = self.transport.wait_for_options(
+            self.chat_id, seen, CHATBOT_ERRORS['learn_all_words']
+        )
+        if options:
+            self.send('answer', self.rng.choice(options))
+
+    def add(self) -> None:
+        """Adds a new word of the user."""
+        word: str = ''.join(self.rng.choices(string.ascii_lowercase, k=8))
+        self.send('add_word', '/add_word')
+        self.send('add_word_text', f'{word}, Слово')
+        self.own_words.append(word.title())
+
+    def delete(self) -> None:
+        """Deletes one of the user's words or hides a base word."""
+        word: str = (
+            self.own_words.pop() if self.own_words
+            else self.rng.choice(['Red', 'Blue', 'Green', 'Winter'])
+        )
+        self.send('delete_word', '/delete_word')
+        self.send('delete_word_text', word)
+
+    def help(self) -> None:
+        """Requests the list of commands."""
+        self.send('help', '/help')
+
+
+def prepare_work_dir(work_dir: str, db_url: str) -> None:
+    """Writes the config and the data files the bot reads on import."""
+    os.makedirs(os.path.join(work_dir, 'data'), exist_ok=True)
+    for file_name in DATA_FILES:
+        shutil.copy(
+            os.path.join(PROJECT_ROOT, 'data', file_name),
+            os.path.join(work_dir, 'data', file_name)
+        )
+
+    with open(os.path.join(work_dir, 'settings.ini'), 'w') as config:
+        config.write(
+            '[TG]\nTOKEN = 0:benchmark\n\n'
+            f'[DB]\nURL = {db_url}\n\n'
+            # Telegram limits are not part of the handler cost
+            '[OUTBOUND]\nCHAT_RATE = 1000000\nGLOBAL_RATE = 1000000\n'
+            'LINGER = 0\n'
+        )
+
+
+def seed_words(work_dir: str, count: int) -> None:
+    """Creates the schema and imports the base words plus ``count``
+    generated ones."""
+    import main as bot_main
+    from modules.db import import_json_data_to_db
+    from modules.tg_bot import APP
+
+    bot_main.bootstrap_db()
+    path: str = os.path.join(work_dir, 'generated_words.jsonl')
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as file:
+        for _ in range(count):
+            word: str = ''.join(rng.choices(string.ascii_lowercase, k=7))
+            file.write(json.dumps(
+                {'word': word.title(), 'translation': 'Слово'},
+                ensure_ascii=False
+            ) + '\n')
+
+    with APP.session_factory() as session:
+        import_json_data_to_db(session, path)
+
+
+def git_revision() -> str | None:
+    """Returns the current commit of the project, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_load(args: argparse.Namespace, work_dir: str) -> dict:
+    """Runs the simulated users and returns the report."""
+    db_url: str = args.db_url or (
+        f'sqlite:///{os.path.join(work_dir, "benchmark.db")}'
+    )
+    prepare_work_dir(work_dir, db_url)
+    # The bot reads settings.ini and data/ from the working directory when
+    # its modules are imported
+    os.chdir(work_dir)
+
+    from telebot import apihelper
+
+    transport = StubTransport()
+    apihelper.CUSTOM_REQUEST_SENDER = transport
+
+    seed_words(work_dir, args.words)
+
+    import sqlalchemy
+    from modules.tg_bot import APP, get_bot
+    from modules.tg_bot.cache import get_vocabulary_cache
+    from modules.tg_bot.outbound import get_outbound_dispatcher
+
+    # Handle updates in the calling thread, so the latency covers the
+    # handler and the users stay concurrent
+    bot = get_bot()
+    bot.threaded = False
+    recorder = LoadRecorder(APP.engine)
+    users: list[SimulatedUser] = [
+        SimulatedUser(
+            100000 + index, bot, transport, recorder,
+            random.Random(args.seed + index)
+        )
+        for index in range(args.users)
+    ]
+
+    started_at: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for result in [
+            executor.submit(user.run, args.actions) for user in users
+        ]:
+            result.result()
+    elapsed: float = time.perf_counter() - started_at
+    get_outbound_dispatcher().wait_idle(timeout=30)
+
+    report: dict = recorder.report()
+    updates: int = report['latency_ms']['all']['count']
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'database': APP.engine.dialect.name,
+        },
+        'config': {
+            key: value for key, value in vars(args).items()
+            if key not in ('output', 'db_url')
+        },
+        'throughput': {
+            'updates': updates,
+            'seconds': round(elapsed, 3),
+            'updates_per_second': round(updates / elapsed, 1),
+        },
+        **report,
+        'api_calls': dict(transport.calls),
+        'vocabulary_cache': get_vocabulary_cache().stats(),
+    }
+
+
+def print_summary(report: dict) -> None:
+    """Prints the latency and query counts per kind of update."""
+    throughput: dict = report['throughput']
+    print(f'{throughput["updates"]} updates in {throughput["seconds"]} s, '
+          f'{throughput["updates_per_second"]} updates/s')
+    print(f'\n{"update":<17} {"count":>6} {"p50, ms":>8} {"p95, ms":>8} '
+          f'{"p99, ms":>8} {"queries":>8}')
+    for kind, latency in report['latency_ms'].items():
+        queries: dict = report['queries_per_update'][kind]
+        print(f'{kind:<17} {latency["count"]:>6} {latency["p50"]:>8.2f} '
+              f'{latency["p95"]:>8.2f} {latency["p99"]:>8.2f} '
+              f'{queries["avg"]:>8.2f}')
+
+    if report['errors']:
+        print(f'\nErrors: {report["errors"]}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--actions', type=int, default=30,
+                        help='flows performed by every user')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='users active at the same time')
+    parser.add_argument('--words', type=int, default=5000,
+                        help='generated base words besides words.json')
+    parser.add_argument('--db-url', help='a dedicated, empty database')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report to a file')
+    args = parser.parse_args()
+
+    if args.output:
+        args.output = os.path.abspath(args.output)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        report: dict = run_load(args, work_dir)
+        os.chdir(PROJECT_ROOT)
+
+    print_summary(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Compares ways of listing a page of the words starting with a prefix.
+
+* ``linear scan`` - every word and translation is checked, the matches are
+  sorted and the page is cut from them, as a ``LIKE 'prefix%'`` query
+  without an index does;
+* ``prefix index`` - a ``PrefixIndex`` finding the first match by binary
+  search and reading the page from the sorted array.
+
+The queries are prefixes of one to three letters of random vocabulary
+words and translations; every query reads the first page and the page
+after it. For every vocabulary size the build time, the median and 99th
+percentile time of a page, and whether both approaches listed the same
+words are reported.
+
+Usage (from the project root):
+    python -m benchmarks.prefix_search [--sizes 1000,10000,100000] [--json]
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+from typing import Callable
+
+from modules.search import PrefixIndex
+
+from benchmarks.distractors import generate_words
+
+RUSSIAN_LETTERS = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+Page = list[int]
+
+
+def generate_vocabulary(
+        size: int, rng: random.Random
+) -> dict[int, tuple[str, str]]:
+    """Generates random words with random Russian translations."""
+    return {
+        word_id: (word, ''.join(rng.choices(RUSSIAN_LETTERS, k=len(word))))
+        for word_id, word in generate_words(size, rng).items()
+    }
+
+
+def measure(
+        read_pages: Callable[[str], tuple[Page, Page]], queries: list[str]
+) -> tuple[dict[str, float], list[tuple[Page, Page]]]:
+    """Times reading two pages per query and returns the timings and the
+    pages."""
+    timings: list[float] = []
+    found: list[tuple[Page, Page]] = []
+    for query in queries:
+        started_at: float = time.perf_counter()
+        pages: tuple[Page, Page] = read_pages(query)
+        timings.append((time.perf_counter() - started_at) / 2)
+        found.append(pages)
+
+    timings.sort()
+    return {
+        'p50_us': timings[len(timings) // 2] * 1e6,
+        'p99_us': timings[int(len(timings) * 0.99)] * 1e6,
+    }, found
+
+
+def run_benchmark(
+        size: int, queries_count: int, page_size: int, seed: int
+) -> dict[str, dict[str, float]]:
+    """Runs both approaches on a vocabulary of the given size."""
+    rng = random.Random(seed)
+    words: dict[int, tuple[str, str]] = generate_vocabulary(size, rng)
+    queries: list[str] = [
+        rng.choice(keys)[:rng.randint(1, 3)]
+        for keys in rng.choices(list(words.values()), k=queries_count)
+    ]
+
+    def scan(prefix: str) -> tuple[Page, Page]:
+        matches: list[tuple[str, int]] = sorted(
+            (min(key for key in keys if key.startswith(prefix)), word_id)
+            for word_id, keys in words.items()
+            if any(key.startswith(prefix) for key in keys)
+        )
+        return (
+            [word_id for _, word_id in matches[:page_size]],
+            [word_id for _, word_id in matches[page_size:page_size * 2]],
+        )
+
+    started_at: float = time.perf_counter()
+    index = PrefixIndex()
+    index.extend(words.items())
+    build_s: float = time.perf_counter() - started_at
+
+    def read(prefix: str) -> tuple[Page, Page]:
+        first: list[tuple[str, int]] = list(
+            itertools.islice(index.scan(prefix), page_size)
+        )
+        second: list[tuple[str, int]] = list(itertools.islice(
+            index.scan(prefix, first[-1]), page_size
+        )) if first else []
+        return (
+            [word_id for _, word_id in first],
+            [word_id for _, word_id in second],
+        )
+
+    scan_stats, scan_found = measure(scan, queries)
+    index_stats, index_found = measure(read, queries)
+    return {
+        'linear scan': {'build_s': 0.0, **scan_stats, 'same': True},
+        'prefix index': {
+            'build_s': build_s, **index_stats,
+            'same': index_found == scan_found,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print JSON')
+    args = parser.parse_args()
+
+    report: dict[str, dict] = {
+        size: run_benchmark(
+            int(size), args.queries, args.page_size, args.seed
+        )
+        for size in args.sizes.split(',')
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f'{"words":>8} {"approach":<13} {"build, s":>9} '
+          f'{"p50, us":>9} {"p99, us":>9} {"same":>5}')
+    for size, results in report.items():
+        for name, stats in results.items():
+            print(f'{size:>8} {name:<13} {stats["build_s"]:>9.2f} '
+                  f'{stats["p50_us"]:>9.1f} {stats["p99_us"]:>9.1f} '
+                  f'{"yes" if stats["same"] else "no":>5}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""Checks that every handler of the sync bot stays within its query budget.
+
+Each flow of a user (start, help, about, quiz and answer, adding words one
+by one and as a list, deleting and hiding words, misspelling a word to
+delete, paging through the hidden words and unhiding one, answering and
+reading the statistics, paging through the words found by /find,
+searching inline and quizzing on a category) is run by a new user against a
+fresh SQLite database.
+The caches are cleared before every update, so the handlers issue the most
+statements they can. Bot API calls go to the stub transport of the load
+benchmark.
+
+Query budgets are strict during the check: a handler issuing more
+statements than its budget fails its update. The check also fails if a
+registered handler or conversation step has no budget. The exit status is
+1 on failure. The tests in tests/test_query_budgets.py enforce the same
+budgets handler by handler; this script prints the table of budgets and
+peaks.
+
+Usage (from the project root):
+    python -m benchmarks.query_budget [--hidden-words 25] [--json]
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from benchmarks.load import StubTransport, prepare_work_dir, seed_words
+
+CHAT_IDS = itertools.count(200000)
+
+
+class Flow:
+    """A user going through one flow, one update at a time.
+
+    Args:
+        bot: The bot handling the updates in the calling thread.
+        transport (StubTransport): The transport recording the replies.
+    """
+
+    def __init__(self, bot, transport: StubTransport) -> None:
+        self.bot = bot
+        self.transport = transport
+        self.chat_id: int = next(CHAT_IDS)
+        self.errors: list[str] = []
+
+    def send(self, text: str) -> None:
+        """Handles a text message of the user."""
+        message: dict = self._message(text)
+        if text.startswith('/'):
+            message['entities'] = [{
+                'type': 'bot_command', 'offset': 0, 'length': len(text)
+            }]
+        self._process({'message': message})
+
+    def press(self, callback_data: str) -> None:
+        """Handles a press of an inline button."""
+        message: dict = self._message('')
+        self._process({'callback_query': {
+            'id': str(message['message_id']),
+            'from': message['from'],
+            'chat_instance': str(self.chat_id),
+            'data': callback_data,
+            'message': message,
+        }})
+
+    def inline(self, query: str, offset: str = '') -> None:
+        """Handles an inline query of the user."""
+        self._process({'inline_query': {
+            'id': str(next(CHAT_IDS)),
+            'from': self._message('')['from'],
+            'query': query,
+            'offset': offset,
+        }})
+
+    def last_buttons(self) -> list[str]:
+        """Returns the callback data of the last inline keyboard sent to the
+        chat."""
+        for params in reversed(self.transport.messages(self.chat_id)):
+            markup: dict = json.loads(params.get('reply_markup') or '{}')
+            if 'inline_keyboard' in markup:
+                return [
+                    button['callback_data']
+                    for row in markup['inline_keyboard'] for button in row
+                ]
+
+        return []
+
+    def answer_options(self) -> list[str]:
+        """Returns the answer options of the last quiz card sent to the
+        chat."""
+        for params in reversed(self.transport.messages(self.chat_id)):
+            markup: dict = json.loads(params.get('reply_markup') or '{}')
+            if 'keyboard' in markup:
+                return [
+                    button['text']
+                    for row in markup['keyboard'] for button in row
+                ]
+
+        return []
+
+    def _message(self, text: str) -> dict:
+        return {
+            'message_id': next(CHAT_IDS),
+            'date': int(time.time()),
+            'chat': {'id': self.chat_id, 'type': 'private'},
+            'from': {'id': self.chat_id, 'is_bot': False, 'first_name': 'u'},
+            'text': text,
+        }
+
+    def _process(self, update_json: dict) -> None:
+        from modules.tg_bot.cache import (
+            get_user_id_cache, get_vocabulary_cache
+        )
+        from modules.tg_bot.outbound import get_outbound_dispatcher
+        from modules.tg_bot.query_budget import QueryBudgetExceeded
+        from telebot import types
+
+        get_user_id_cache().clear()
+        get_vocabulary_cache().clear()
+        update_json['update_id'] = next(CHAT_IDS)
+        try:
+            self.bot.process_new_updates([types.Update.de_json(update_json)])
+        except QueryBudgetExceeded as e:
+            self.errors.append(str(e))
+        get_outbound_dispatcher().wait_idle(timeout=10)
+
+
+def hide_words(chat_id: int, count: int) -> None:
+    """Hides ``count`` base words from the user."""
+    from sqlalchemy import select
+
+    from modules.db import Word
+    from modules.tg_bot import APP
+    from modules.tg_bot.db import get_user_word_setting
+    from modules.tg_bot.db.user_db_utils import upsert_user
+
+    with APP.session_factory() as session:
+        user_id: int = upsert_user(session, chat_id)
+        for word_id in session.scalars(
+                select(Word.id).where(Word.user_id.is_(None)).limit(count)
+        ):
+            setting = get_user_word_setting(session, user_id, word_id)
+            setting.is_hidden = True
+            setting.due_at = None
+        session.commit()
+
+
+def run_flows(bot, transport: StubTransport, hidden_words: int) -> list[str]:
+    """Runs every flow and returns the budget breaches."""
+    flows: list[Callable[[Flow], None]] = [
+        lambda flow: flow.send('/start'),
+        lambda flow: (flow.send('/help'), flow.send('/about')),
+        lambda flow: (
+            flow.send('/test_knowledge'),
+            flow.send(flow.answer_options()[0]),
+            flow.press('next'),
+        ),
+        lambda flow: (
+            flow.press('add_word'), flow.send('Budget, Бюджет'),
+            flow.send('/add_word'),
+            flow.send('\n'.join(f'Word{"x" * index}, Слово'
+                                for index in range(1, 20))),
+        ),
+        lambda flow: (
+            flow.send('/add_word'), flow.send('Budget, Бюджет'),
+            flow.press('delete_word'), flow.send('Budget'),
+            flow.send('/delete_word'), flow.send('Red'),
+            flow.send('/delete_word'), flow.send('Yelow'),
+        ),
+        lambda flow: (
+            hide_words(flow.chat_id, hidden_words),
+            flow.send('/hidden_words'),
+            flow.press(flow.last_buttons()[-1]),
+            flow.press(flow.last_buttons()[-1]),
+            flow.press(flow.last_buttons()[0]),
+        ),
+        lambda flow: (
+            flow.send('/test_knowledge'),
+            flow.send(flow.answer_options()[0]),
+            flow.send('/stats'), flow.send('/stats'),
+        ),
+        lambda flow: (
+            flow.send('/find'),
+            flow.press(flow.last_buttons()[-1]),
+            flow.press(flow.last_buttons()[0]),
+            flow.send('/find зел'),
+        ),
+        lambda flow: (
+            flow.inline('b'), flow.inline('', offset='1'),
+            flow.send('/start'), flow.inline('b'),
+        ),
+        lambda flow: (
+            flow.send('/categories'), flow.press('quiz_categories'),
+            flow.press(flow.last_buttons()[0]),
+            flow.send(flow.answer_options()[0]),
+            flow.press(flow.last_buttons()[0]),
+        ),
+    ]
+
+    errors: list[str] = []
+    for run in flows:
+        flow = Flow(bot, transport)
+        run(flow)
+        errors += flow.errors
+
+    return errors
+
+
+def registered_handlers(bot) -> list[Callable]:
+    """Returns the handlers registered with the bot and the conversation
+    steps."""
+    from modules.tg_bot.bot import CONVERSATION_STEPS
+
+    return [
+        handler['function']
+        for handler in (
+            *bot.message_handlers,
+            *bot.callback_query_handlers,
+            *bot.inline_handlers
+        )
+    ] + list(CONVERSATION_STEPS)
+
+
+def run_check(args: argparse.Namespace, work_dir: str) -> dict:
+    """Runs the flows with strict budgets and returns the report."""
+    prepare_work_dir(
+        work_dir, f'sqlite:///{os.path.join(work_dir, "budget.db")}'
+    )
+    # The bot reads settings.ini and data/ from the working directory
+    os.chdir(work_dir)
+
+    from telebot import apihelper
+
+    transport = StubTransport()
+    apihelper.CUSTOM_REQUEST_SENDER = transport
+    seed_words(work_dir, 0)
+
+    from modules.tg_bot import APP, get_bot
+    from modules.tg_bot.query_budget import (
+        QUERY_BUDGETS, count_handler_queries
+    )
+
+    from modules.tg_bot.word import load_word_search
+
+    bot = get_bot()
+    bot.threaded = False
+    # Loaded at startup, as start_bot does, so /find does not pay for it
+    load_word_search()
+    count_handler_queries(APP.engine)
+    QUERY_BUDGETS.strict = True
+
+    errors: list[str] = run_flows(bot, transport, args.hidden_words)
+    budgets: dict[str, int | None] = {
+        handler.__name__: getattr(handler, 'query_budget', None)
+        for handler in registered_handlers(bot)
+    }
+    return {
+        'handlers': {
+            name: {
+                'budget': budgets.get(name),
+                'peak': QUERY_BUDGETS.peaks.get(name),
+            }
+            for name in sorted(budgets)
+        },
+        'unbudgeted': sorted(
+            name for name, budget in budgets.items() if budget is None
+        ),
+        'breaches': errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hidden-words', type=int, default=25,
+                        help='hidden words of the user paging through them')
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args()
+
+    project_root: str = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        report: dict = run_check(args, work_dir)
+        os.chdir(project_root)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f'{"handler":<34} {"budget":>7} {"peak":>5}')
+        for name, handler in report['handlers'].items():
+            budget, peak = handler['budget'], handler['peak']
+            print(f'{name:<34} {"-" if budget is None else budget:>7} '
+                  f'{"-" if peak is None else peak:>5}')
+        for name in report['unbudgeted']:
+            print(f'No query budget: {name}')
+        for breach in report['breaches']:
+            print(f'Over budget: {breach}')
+
+    if report['unbudgeted'] or report['breaches']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
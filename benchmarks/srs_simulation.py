@@ -0,0 +1,220 @@
+"""Simulates spaced-repetition schedulers over synthetic review histories.
+
+Every synthetic learner forgets words along an exponential curve: a word
+with stability S days is recalled after t days with probability exp(-t/S).
+A recalled word becomes more stable, a forgotten one less. Each day the
+learner answers a fixed number of cards picked the way the bot picks them:
+due reviews first, then new words, then reviews ahead of time.
+
+The second part fills a SQLite database with review queues and measures
+how long it takes to pick the next card as the queues grow.
+
+Usage (from the project root):
+    python -m benchmarks.srs_simulation [--learners 200] [--days 180] [--json]
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+
+from modules.db import UserWordSetting, upgrade_database
+from modules.db.explain import explain
+from modules.srs import SCHEDULERS, ReviewState, Scheduler, next_review_query
+
+SCHEDULER_CONFIG = {'learned_interval_days': 90, 'relearn_minutes': 10}
+FIRST_STABILITY_DAYS = 1.0
+GUESS_PROBABILITY = 0.25
+
+
+def recall_probability(
+        stability: float | None, last_review: datetime | None, now: datetime
+) -> float:
+    """Returns the probability of choosing the right answer of a card.
+
+    A word never seen is only guessed among the four options; a known one
+    is recalled with the probability given by the forgetting curve.
+    """
+    if stability is None or last_review is None:
+        return GUESS_PROBABILITY
+
+    elapsed: float = (now - last_review).total_seconds() / 86400
+    recall: float = math.exp(-elapsed / stability)
+    return recall + (1 - recall) * GUESS_PROBABILITY
+
+
+def simulate_learner(
+        scheduler: Scheduler, words: int, days: int, cards_per_day: int,
+        rng: random.Random
+) -> dict[str, float]:
+    """Simulates one learner and returns their review statistics."""
+    start = datetime(2024, 1, 1)
+    growth: list[float] = [rng.uniform(1.8, 3.5) for _ in range(words)]
+    stability: dict[int, float] = {}
+    last_review: dict[int, datetime] = {}
+    states: dict[int, ReviewState] = {}
+    queue: list[tuple[datetime, int]] = []
+    learned: set[int] = set()
+    reviews = correct = 0
+    next_new = 0
+
+    for day in range(days):
+        now: datetime = start + timedelta(days=day, hours=9)
+        for _ in range(cards_per_day):
+            while queue and queue[0][0] != states[queue[0][1]].due_at:
+                heapq.heappop(queue)
+
+            if queue and queue[0][0] <= now:
+                word: int = heapq.heappop(queue)[1]
+            elif next_new < words:
+                word, next_new = next_new, next_new + 1
+                states[word] = ReviewState()
+            elif queue:
+                word = heapq.heappop(queue)[1]
+            else:
+                break
+
+            is_correct: bool = rng.random() < recall_probability(
+                stability.get(word), last_review.get(word), now
+            )
+            if word not in stability:
+                stability[word] = FIRST_STABILITY_DAYS
+            elif is_correct:
+                stability[word] *= growth[word]
+            else:
+                stability[word] = max(
+                    FIRST_STABILITY_DAYS, stability[word] * 0.5
+                )
+
+            states[word] = scheduler.review(states[word], is_correct, now)
+            last_review[word] = now
+            if scheduler.is_learned(states[word]):
+                learned.add(word)
+            else:
+                heapq.heappush(queue, (states[word].due_at, word))
+
+            reviews += 1
+            correct += is_correct
+            now += timedelta(minutes=1)
+
+    end: datetime = start + timedelta(days=days)
+    retention: list[float] = [
+        recall_probability(stability[word], last_review[word], end)
+        for word in last_review
+    ]
+    return {
+        'reviews': reviews,
+        'accuracy': correct / reviews if reviews else 0.0,
+        'introduced': len(last_review),
+        'learned': len(learned),
+        'retention': sum(retention) / len(retention) if retention else 0.0,
+    }
+
+
+def run_simulation(args: argparse.Namespace) -> dict[str, dict]:
+    """Runs every registered scheduler on the same synthetic learners."""
+    results: dict[str, dict] = {}
+    for name, scheduler_class in SCHEDULERS.items():
+        scheduler: Scheduler = scheduler_class(
+            {'algorithm': name, **SCHEDULER_CONFIG}
+        )
+        rng = random.Random(args.seed)
+        learners: list[dict] = [
+            simulate_learner(
+                scheduler, args.words, args.days, args.cards_per_day, rng
+            )
+            for _ in range(args.learners)
+        ]
+        results[name] = {
+            key: sum(learner[key] for learner in learners) / len(learners)
+            for key in learners[0]
+        }
+
+    return results
+
+
+def run_queue_benchmark(sizes: list[int], picks: int) -> dict[str, dict]:
+    """Measures the next-card query on review queues of the given sizes."""
+    results: dict[str, dict] = {}
+    now = datetime.now()
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f'sqlite:///{directory}/srs.db')
+            upgrade_database(engine)
+            users: int = max(1, size // 1000)
+            with engine.begin() as connection:
+                connection.execute(insert(UserWordSetting), [
+                    {
+                        'user_id': index % users + 1,
+                        'word_id': index // users + 1,
+                        'due_at': now + timedelta(
+                            minutes=random.randint(-10000, 10000)
+                        ),
+                    }
+                    for index in range(size)
+                ])
+
+            with engine.connect() as connection:
+                started_at: float = time.perf_counter()
+                for _ in range(picks):
+                    connection.execute(
+                        next_review_query(random.randint(1, users))
+                    ).first()
+                elapsed: float = time.perf_counter() - started_at
+
+            with engine.begin() as connection:
+                plan: list[str] = explain(connection, next_review_query(1))
+            engine.dispose()
+
+        results[str(size)] = {
+            'avg_pick_ms': elapsed / picks * 1000,
+            'plan': plan,
+        }
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--learners', type=int, default=200)
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--cards-per-day', type=int, default=20)
+    parser.add_argument('--queue-sizes', default='1000,10000,100000')
+    parser.add_argument('--picks', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print JSON')
+    args = parser.parse_args()
+
+    report: dict = {
+        'simulation': run_simulation(args),
+        'queue': run_queue_benchmark(
+            [int(size) for size in args.queue_sizes.split(',')], args.picks
+        ),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f'{"scheduler":<10} {"reviews":>8} {"accuracy":>9} '
+          f'{"introduced":>11} {"learned":>8} {"retention":>10}')
+    for name, stats in report['simulation'].items():
+        print(f'{name:<10} {stats["reviews"]:>8.0f} {stats["accuracy"]:>9.2%} '
+              f'{stats["introduced"]:>11.1f} {stats["learned"]:>8.1f} '
+              f'{stats["retention"]:>10.2%}')
+
+    print(f'\n{"settings":>10} {"pick, ms":>9}  plan')
+    for size, stats in report['queue'].items():
+        print(f'{size:>10} {stats["avg_pick_ms"]:>9.3f}  '
+              f'{" / ".join(stats["plan"])}')
+
+
+if __name__ == '__main__':
+    main()
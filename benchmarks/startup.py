@@ -0,0 +1,139 @@
+"""Reports where the bot spends its cold start.
+
+The first part imports the bot package in a fresh interpreter with
+``python -X importtime`` and lists the slowest imports. The second part
+runs the initialisation phases of the application context one by one, as
+the bot does when it starts: parsing settings.ini, loading chatbot.json,
+creating the engine, opening the first connection and creating the bot with
+its handlers.
+
+Run it from a directory with settings.ini and data/chatbot.json, e.g. the
+project root:
+    python -m benchmarks.startup [--top 15] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT: str = os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+IMPORT_TARGET = 'modules.tg_bot'
+
+
+def measure_imports(target: str) -> dict:
+    """Imports the target in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict: The wall time of the import and the imported modules with
+            their own and cumulative import time in milliseconds.
+    """
+    started_at: float = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=os.getcwd(), capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': PROJECT_ROOT},
+    )
+    elapsed: float = time.perf_counter() - started_at
+
+    modules: list[dict] = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+
+    return {
+        'process_s': elapsed,
+        'import_ms': max(
+            (module['cumulative_ms'] for module in modules
+             if module['module'] == target),
+            default=0.0
+        ),
+        'modules': modules,
+    }
+
+
+def group_by_package(modules: list[dict]) -> list[tuple[str, float]]:
+    """Sums the own import time of modules by their top-level package."""
+    packages: dict[str, float] = {}
+    for module in modules:
+        package: str = module['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + module['self_ms']
+
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_phases() -> dict[str, float]:
+    """Runs the initialisation phases and returns their duration in ms."""
+    sys.path.insert(0, PROJECT_ROOT)
+    started_at: float = time.perf_counter()
+    import modules.tg_bot as tg_bot
+    import_time: float = time.perf_counter() - started_at
+
+    from sqlalchemy import text
+
+    app = tg_bot.APP
+    _ = app.config
+    _ = app.chatbot_data
+    _ = app.engine
+    with app.phase('first_connection'), app.engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    tg_bot.get_bot()
+
+    return {
+        'import': import_time * 1000,
+        **{name: seconds * 1000 for name, seconds in app.phases.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--top', type=int, default=15, help='slowest imports to list'
+    )
+    parser.add_argument('--json', action='store_true', help='print JSON')
+    args = parser.parse_args()
+
+    imports: dict = measure_imports(IMPORT_TARGET)
+    report: dict = {
+        'imports': {
+            'process_s': imports['process_s'],
+            'import_ms': imports['import_ms'],
+            'slowest': sorted(
+                imports['modules'], key=lambda module: module['self_ms'],
+                reverse=True
+            )[:args.top],
+            'packages': group_by_package(imports['modules'])[:args.top],
+        },
+        'phases_ms': measure_phases(),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f'import {IMPORT_TARGET}: {report["imports"]["import_ms"]:.1f} ms '
+          f'(interpreter and import: '
+          f'{report["imports"]["process_s"] * 1000:.0f} ms)')
+    print(f'\n{"package":<40} {"self, ms":>15}')
+    for package, milliseconds in report['imports']['packages']:
+        print(f'{package:<40} {milliseconds:>15.1f}')
+    print(f'\n{"slowest module":<40} {"self, ms":>15}')
+    for module in report['imports']['slowest']:
+        print(f'{module["module"]:<40} {module["self_ms"]:>15.1f}')
+    print(f'\n{"phase":<40} {"ms":>15}')
+    for name, milliseconds in report['phases_ms'].items():
+        print(f'{name:<40} {milliseconds:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
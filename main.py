@@ -1,27 +1,57 @@
-from modules.fs_tools.read_config import read_config
-from modules.db import create_tables, create_db_session, import_json_data_to_db
+import argparse
+import logging
+
+from modules.db import SyncStats, sync_dictionary, upgrade_database
 from modules.fs_tools import get_absolute_path
-from modules.tg_bot import start_bot
+from modules.tg_bot import APP, start_bot
+from modules.tg_bot.cache import get_vocabulary_cache
+from modules.tg_bot.db import rebuild_user_stats
 
 
 def bootstrap_db():
-    # Get absolute path to config and data files
-    path_to_config: str = get_absolute_path(['settings.ini'])
+    # Get absolute path to the data file
     path_to_json: str = get_absolute_path(['data', 'words.json'])
 
-    DB = read_config(path_to_config, 'DB')
+    # Create missing tables and migrate the schema to the latest version
+    with APP.phase('migrations'):
+        upgrade_database(APP.engine)
+
+    # The bot shares the engine, so its pool is already warm
+    with APP.phase('import_words'), APP.session_factory() as session:
+        # Apply only the categories of the JSON file changed since the last
+        # start; an unchanged file is not even parsed
+        stats: SyncStats = sync_dictionary(session, path_to_json)
+        if stats.affected_users:
+            rebuild_user_stats(session, stats.affected_users)
+        session.commit()
+        # Keep the shared base dictionary of the vocabulary cache in step
+        get_vocabulary_cache().sync_base_words(
+            session, stats.words, stats.affected_users
+        )
+
+    APP.note_phase('import_words', stats.summary())
 
-    engine = create_db_session(DB)[1]
 
-    # Create tables in the database if they don't exist
-    create_tables(engine)
+def rebuild_stats():
+    # Recompute the users' statistics from their words and daily answers
+    with APP.session_factory() as session:
+        users: int = rebuild_user_stats(session)
+        session.commit()
 
-    # Create a session for working with the database
-    with create_db_session(DB)[0] as session:
-        # Import data from a JSON file to the database
-        import_json_data_to_db(session, path_to_json)
+    logging.info('Rebuilt the statistics of %d users', users)
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        'command', nargs='?', default='run', choices=('run', 'rebuild-stats'),
+        help='run the bot (default) or rebuild the users\' statistics'
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
     bootstrap_db()
-    start_bot()
+    if args.command == 'rebuild-stats':
+        rebuild_stats()
+    else:
+        start_bot()
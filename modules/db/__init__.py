@@ -1,15 +1,41 @@
 from .db_operations import create_tables, drop_tables
-from .db_session import create_db_session
+from .db_session import (
+    create_async_session_factory,
+    create_db_engine,
+    create_db_session,
+    create_session_factory
+)
+from .dictionary_sync import SyncStats, sync_dictionary
 from .json2db import import_json_data_to_db
-from .models import User, Word, UserWordSetting
+from .migrations import MIGRATIONS, get_schema_version, upgrade_database
+from .models import (
+    User, Category, Word, UserWordSetting, UserStats, UserDailyAnswers,
+    ImportSource, ImportedCategory
+)
+from .pool_metrics import PoolMetrics, start_pool_reporter
 
 
 __all__ = [
+    'create_async_session_factory',
+    'create_db_engine',
     'create_db_session',
+    'create_session_factory',
     'create_tables',
     'drop_tables',
     'import_json_data_to_db',
+    'SyncStats',
+    'sync_dictionary',
+    'MIGRATIONS',
+    'get_schema_version',
+    'upgrade_database',
     'User',
+    'Category',
     'Word',
     'UserWordSetting',
+    'UserStats',
+    'UserDailyAnswers',
+    'ImportSource',
+    'ImportedCategory',
+    'PoolMetrics',
+    'start_pool_reporter',
 ]
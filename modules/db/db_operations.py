@@ -1,5 +1,14 @@
+from sqlalchemy import Table, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
 from .models import Base
 
+ON_CONFLICT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
 
 def create_tables(engine):
     """Creates all tables in the database"""
@@ -9,3 +18,92 @@ def create_tables(engine):
 def drop_tables(engine):
     """Drops all tables in the database"""
     Base.metadata.drop_all(engine)
+
+
+def insert_ignoring_conflicts(
+        session: Session,
+        table: Table,
+        rows: list[dict],
+        key_columns: list[str],
+        key_where=None
+) -> int:
+    """Inserts the rows, skipping those whose key already exists.
+
+    PostgreSQL and SQLite get a single ``INSERT ... ON CONFLICT DO NOTHING``
+    statement against the unique index on ``key_columns`` (partial when
+    ``key_where`` is given). Other dialects look the chunk's keys up first
+    and insert only the new rows.
+
+    Args:
+        session (Session): The database session.
+        table (Table): The target table.
+        rows (list[dict]): The rows to insert; the values may be SQL
+            expressions, e.g. scalar subqueries.
+        key_columns (list[str]): The columns of the unique index.
+        key_where: The condition of the partial unique index, if any.
+
+    Returns:
+        int: The number of inserted rows.
+    """
+    if not rows:
+        return 0
+
+    insert = ON_CONFLICT_DIALECTS.get(session.get_bind().dialect.name)
+    if insert is not None:
+        statement = insert(table).values(rows).on_conflict_do_nothing(
+            index_elements=key_columns, index_where=key_where
+        )
+        return session.execute(statement).rowcount
+
+    key = tuple_(*(table.c[column] for column in key_columns))
+    existing_query = select(key).where(key.in_(
+        {tuple(row[column] for column in key_columns) for row in rows}
+    ))
+    if key_where is not None:
+        existing_query = existing_query.where(key_where)
+    existing: set = {tuple(row) for row in session.execute(existing_query)}
+
+    new_rows: dict = {}
+    for row in rows:
+        row_key: tuple = tuple(row[column] for column in key_columns)
+        if row_key not in existing:
+            new_rows.setdefault(row_key, row)
+    if new_rows:
+        session.execute(table.insert().values(list(new_rows.values())))
+
+    return len(new_rows)
+
+
+def increment_counters(
+        session: Session, table: Table, key: dict, counters: dict[str, int]
+) -> None:
+    """Adds to the counters of the row with the key, creating the row.
+
+    PostgreSQL and SQLite do it atomically with
+    ``INSERT ... ON CONFLICT DO UPDATE``; other dialects update the row and
+    insert it if nothing was updated.
+
+    Args:
+        session (Session): The database session.
+        table (Table): The target table; ``key`` must be its primary key.
+        key (dict): The values of the key columns.
+        counters (dict[str, int]): The amounts to add by column.
+    """
+    increments: dict = {
+        column: table.c[column] + amount for column, amount in counters.items()
+    }
+    insert = ON_CONFLICT_DIALECTS.get(session.get_bind().dialect.name)
+    if insert is not None:
+        session.execute(
+            insert(table).values(**key, **counters)
+            .on_conflict_do_update(index_elements=list(key), set_=increments)
+        )
+        return
+
+    result = session.execute(
+        table.update()
+        .where(*(table.c[column] == value for column, value in key.items()))
+        .values(increments)
+    )
+    if not result.rowcount:
+        session.execute(table.insert().values(**key, **counters))
@@ -1,12 +1,119 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, async_sessionmaker, create_async_engine
+)
 from sqlalchemy.orm import sessionmaker
 
+POOL_DEFAULTS: dict[str, str] = {
+    'pool_size': '5',
+    'max_overflow': '10',
+    'pool_timeout': '30',
+    'pool_recycle': '1800',
+    'pool_pre_ping': 'true',
+    'report_interval': '0',
+}
+ASYNC_DRIVERS: dict[str, str] = {
+    'postgresql': 'asyncpg',
+    'sqlite': 'aiosqlite',
+}
 
-def create_db_session(config_dict: dict) -> tuple:
+
+def build_dsn(config_dict: dict) -> str:
+    """Builds the database URL from the DB section of the config.
+
+    A ready ``url`` option takes precedence over the separate options.
+    """
+    if config_dict.get('url'):
+        return config_dict['url']
+
+    return (
+        f"{config_dict['dbms']}://{config_dict['user']}:{config_dict['pass']}"
+        f"@{config_dict['host']}:{config_dict['port']}/{config_dict['db']}"
+    )
+
+
+def build_async_dsn(config_dict: dict) -> str:
+    """Builds the database URL for the asyncio driver of the same DBMS.
+
+    A ready ``async_url`` option takes precedence over the derived URL.
+    """
+    if config_dict.get('async_url'):
+        return config_dict['async_url']
+
+    url = make_url(build_dsn(config_dict))
+    backend: str = url.get_backend_name()
+    url = url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+    return url.render_as_string(hide_password=False)
+
+
+def get_pool_options(pool_config: dict | None) -> dict:
+    """Converts the POOL section of the config to create_engine() options."""
+    options: dict[str, str] = {**POOL_DEFAULTS, **(pool_config or {})}
+
+    return {
+        'pool_size': int(options['pool_size']),
+        'max_overflow': int(options['max_overflow']),
+        'pool_timeout': float(options['pool_timeout']),
+        'pool_recycle': int(options['pool_recycle']),
+        'pool_pre_ping': options['pool_pre_ping'].lower() in (
+            'true', 'yes', 'on', '1'
+        ),
+    }
+
+
+def create_db_engine(config_dict: dict, pool_config: dict | None = None) \
+        -> Engine:
+    """Creates an engine with a connection pool configured from the config."""
+    dsn: str = build_dsn(config_dict)
+
+    return create_engine(dsn, **get_engine_pool_options(dsn, pool_config))
+
+
+def get_engine_pool_options(dsn: str, pool_config: dict | None) -> dict:
+    """Returns the pool options applicable to the database of the URL.
+
+    SQLite uses its own pool classes, so only pre-ping is applied to it.
+    """
+    pool_options: dict = get_pool_options(pool_config)
+
+    if make_url(dsn).get_backend_name() == 'sqlite':
+        return {'pool_pre_ping': pool_options['pool_pre_ping']}
+
+    return pool_options
+
+
+def create_session_factory(
+        config_dict: dict, pool_config: dict | None = None
+) -> tuple[sessionmaker, Engine]:
+    """Creates a session factory bound to a pooled engine.
+
+    Sessions made by the factory are short-lived: one per incoming update
+    or unit of work, each borrowing a connection from the pool.
+    """
+    engine: Engine = create_db_engine(config_dict, pool_config)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    return Session, engine
+
+
+def create_db_session(config_dict: dict, pool_config: dict | None = None) \
+        -> tuple:
     """Creates a session for working with the database"""
-    dbms, user, password, host, port, dbname = config_dict.values()
-    DSN = f'{dbms}://{user}:{password}@{host}:{port}/{dbname}'
-    engine = create_engine(DSN)
-    Session = sessionmaker(bind=engine)
+    Session, engine = create_session_factory(config_dict, pool_config)
 
     return Session(), engine
+
+
+def create_async_session_factory(
+        config_dict: dict, pool_config: dict | None = None
+) -> tuple[async_sessionmaker, AsyncEngine]:
+    """Creates an asyncio session factory bound to a pooled async engine."""
+    dsn: str = build_async_dsn(config_dict)
+    engine: AsyncEngine = create_async_engine(
+        dsn, **get_engine_pool_options(dsn, pool_config)
+    )
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    return Session, engine
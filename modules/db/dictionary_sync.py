@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from .db_operations import insert_ignoring_conflicts
+from .json2db import (
+    IMPORT_CHUNK_SIZE, chunked, get_category_ids, read_word_records
+)
+from .models import (
+    ImportedCategory, ImportSource, UserWordSetting, Word, word_category
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SyncStats(NamedTuple):
+    """The result of syncing a dictionary file with the database.
+
+    Attributes:
+        source (str): The name of the file.
+        skipped (bool): Whether the file was unchanged and not read.
+        changed (list[str]): The categories applied to the database,
+            including the ones removed from the file.
+        unchanged (int): The categories skipped as unchanged.
+        inserted (int): The new base words.
+        updated (int): The base words whose translation or category
+            changed.
+        removed (int): The base words removed from the file.
+        affected_users (list[int]): The users who had settings of the
+            removed words; their statistics need a rebuild.
+        words (list[str]): The base words of the applied categories, i.e.
+            every word inserted, updated or removed; in-memory copies of
+            the dictionary reload them.
+        seconds (float): The duration of the sync.
+    """
+    source: str
+    skipped: bool
+    changed: list[str]
+    unchanged: int
+    inserted: int
+    updated: int
+    removed: int
+    affected_users: list[int]
+    words: list[str]
+    seconds: float
+
+    def summary(self) -> str:
+        """Describes the outcome in a few words for the startup report."""
+        if self.skipped:
+            return f'{self.source} unchanged, import skipped'
+
+        return (
+            f'{self.source}: applied {", ".join(self.changed) or "nothing"}, '
+            f'skipped {self.unchanged} unchanged categories, '
+            f'{self.inserted} inserted, {self.updated} updated, '
+            f'{self.removed} removed'
+        )
+
+
+def file_hash(file_path: str) -> str:
+    """Returns the SHA-256 of the file's contents."""
+    with open(file_path, 'rb') as file:
+        return hashlib.file_digest(file, 'sha256').hexdigest()
+
+
+def category_hash(words: dict[str, str | None]) -> str:
+    """Returns the SHA-256 of the category's words and translations.
+
+    The words are sorted first, so reordering a category does not change
+    its hash.
+    """
+    return hashlib.sha256(json.dumps(
+        sorted(words.items()), ensure_ascii=False
+    ).encode()).hexdigest()
+
+
+def sync_dictionary(session: Session, file_path: str) -> SyncStats:
+    """Applies the changes of a dictionary file since its last import.
+
+    The hash of the file is compared with the recorded one first, so an
+    unchanged file costs one query and is not parsed. Otherwise only the
+    categories whose hash changed are applied as a diff against the base
+    words: new words are inserted, changed translations and categories
+    updated, and the words no longer in any category removed together with
+    the users' settings of them. The caller commits, so the diff and the new
+    hashes are stored together.
+
+    A first sync of an existing database has no recorded categories, so it
+    inserts the missing words and updates the translations and categories,
+    as the full import did, but removes nothing.
+
+    Args:
+        session (Session): The database session.
+        file_path (str): The path to the JSON, JSONL or CSV file.
+
+    Returns:
+        SyncStats: What was skipped or changed.
+    """
+    started_at: float = time.monotonic()
+    source: str = os.path.basename(file_path)
+    content_hash: str = file_hash(file_path)
+
+    recorded: ImportSource | None = session.get(ImportSource, source)
+    if recorded is not None and recorded.content_hash == content_hash:
+        return SyncStats(
+            source, True, [], 0, 0, 0, 0, [], [],
+            time.monotonic() - started_at
+        )
+
+    categories: dict[str, dict[str, str | None]] = read_categories(file_path)
+    hashes: dict[str, str] = {
+        name: category_hash(words) for name, words in categories.items()
+    }
+    previous: dict[str, ImportedCategory] = {
+        category.category: category
+        for category in session.scalars(
+            select(ImportedCategory).where(ImportedCategory.source == source)
+        )
+    }
+    changed: list[str] = sorted(
+        name for name in hashes.keys() | previous.keys()
+        if name not in previous or name not in hashes
+        or previous[name].content_hash != hashes[name]
+    )
+
+    category_ids: dict[str, int] = get_category_ids(
+        session, (name for name in changed if name in categories)
+    )
+    words: dict[str, tuple[str | None, int | None]] = {
+        word: (translation, category_ids.get(name))
+        for name in changed
+        for word, translation in categories.get(name, {}).items()
+    }
+    inserted, updated = upsert_base_words(session, words)
+
+    present: set[str] = {
+        word for category in categories.values() for word in category
+    }
+    removed: set[str] = {
+        word for name in changed if name in previous
+        for word in previous[name].words
+    } - present
+    affected_users: list[int] = remove_base_words(session, removed)
+
+    for name in changed:
+        if name in previous:
+            session.delete(previous[name])
+    session.flush()
+    session.add_all(
+        ImportedCategory(
+            source=source, category=name, content_hash=hashes[name],
+            words=list(categories[name])
+        )
+        for name in changed if name in categories
+    )
+    session.merge(ImportSource(
+        source=source, content_hash=content_hash, imported_at=datetime.now()
+    ))
+
+    return SyncStats(
+        source, False, changed, len(categories.keys() - set(changed)),
+        inserted, updated, len(removed), affected_users,
+        sorted(words.keys() | removed), time.monotonic() - started_at
+    )
+
+
+def read_categories(file_path: str) -> dict[str, dict[str, str | None]]:
+    """Reads the words and translations of the file by category."""
+    categories: dict[str, dict[str, str | None]] = {}
+    for record in read_word_records(file_path):
+        categories.setdefault(record.category or '', {})[record.word] = \
+            record.translation
+
+    return categories
+
+
+def upsert_base_words(
+        session: Session, words: dict[str, tuple[str | None, int | None]]
+) -> tuple[int, int]:
+    """Inserts the missing base words and updates the changed ones.
+
+    The users' settings of the updated words get their new category.
+
+    Args:
+        session (Session): The database session.
+        words (dict[str, tuple[str | None, int | None]]): The words with
+            their translation and category ID.
+
+    Returns:
+        tuple[int, int]: The numbers of inserted and updated words.
+    """
+    inserted = updated = 0
+    for chunk in chunked(words, IMPORT_CHUNK_SIZE):
+        existing: dict[str, tuple[int, tuple[str | None, int | None]]] = {
+            word: (word_id, (translation, category_id))
+            for word_id, word, translation, category_id in session.execute(
+                select(Word.id, Word.word, Word.translation, Word.category_id)
+                .where(Word.user_id.is_(None), Word.word.in_(chunk))
+            )
+        }
+        inserted += insert_ignoring_conflicts(
+            session,
+            Word.__table__,
+            [
+                {
+                    'word': word,
+                    'translation': words[word][0],
+                    'category_id': words[word][1],
+                }
+                for word in chunk if word not in existing
+            ],
+            ['word'],
+            Word.user_id.is_(None)
+        )
+
+        changes: list[dict] = [
+            {
+                'id': word_id,
+                'translation': words[word][0],
+                'category_id': words[word][1],
+            }
+            for word, (word_id, stored) in existing.items()
+            if stored != words[word]
+        ]
+        if changes:
+            session.execute(update(Word), changes)
+            session.execute(
+                update(UserWordSetting)
+                .where(UserWordSetting.word_id.in_(
+                    [change['id'] for change in changes]
+                ))
+                .values(category_id=word_category(UserWordSetting.word_id))
+            )
+            updated += len(changes)
+
+    return inserted, updated
+
+
+def remove_base_words(session: Session, words: set[str]) -> list[int]:
+    """Deletes the base words and the users' settings of them.
+
+    Returns:
+        list[int]: The users who had settings of the deleted words.
+    """
+    affected_users: set[int] = set()
+    for chunk in chunked(sorted(words), IMPORT_CHUNK_SIZE):
+        word_ids = select(Word.id).where(
+            Word.user_id.is_(None), Word.word.in_(chunk)
+        )
+        affected_users.update(session.scalars(
+            select(UserWordSetting.user_id).distinct()
+            .where(UserWordSetting.word_id.in_(word_ids))
+        ))
+        session.execute(
+            delete(UserWordSetting)
+            .where(UserWordSetting.word_id.in_(word_ids))
+        )
+        session.execute(
+            delete(Word).where(Word.user_id.is_(None), Word.word.in_(chunk))
+        )
+
+    if words:
+        logger.info('Removed %d base words from the dictionary', len(words))
+    return sorted(affected_users)
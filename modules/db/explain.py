@@ -0,0 +1,84 @@
+from sqlalchemy import Connection, Engine, func, select, text
+
+from .models import User, UserWordSetting, Word
+
+HOT_QUERIES: dict = {
+    'user by Telegram ID': select(User).where(User.tg_id == 1),
+    'word by text': select(Word).where(Word.word == 'word'),
+    'user word by lower(word)': select(Word).where(
+        func.lower(Word.word) == func.lower('Word'), Word.user_id == 1
+    ),
+    'user word setting': select(UserWordSetting).where(
+        UserWordSetting.user_id == 1, UserWordSetting.word_id == 1
+    ),
+    'hidden user word settings': select(UserWordSetting).where(
+        UserWordSetting.user_id == 1, UserWordSetting.is_hidden.is_(True)
+    ),
+    'word settings by word': select(UserWordSetting).where(
+        UserWordSetting.word_id == 1
+    ),
+    'base words of a category': select(Word.id).where(
+        Word.category_id == 1, Word.user_id.is_(None)
+    ),
+}
+# Plan lines naming the temporary results of subqueries and CTEs
+SUBQUERY_STEPS = ('MATERIALIZE ', 'CO-ROUTINE ')
+
+
+def explain(connection: Connection, statement) -> list[str]:
+    """Returns the query plan of the statement as text lines.
+
+    On PostgreSQL sequential scans are disabled for the transaction, so the
+    plan shows whether an index can serve the query even on small tables.
+    """
+    sql: str = str(statement.compile(
+        dialect=connection.dialect, compile_kwargs={'literal_binds': True}
+    ))
+
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in rows]
+
+    connection.execute(text('SET LOCAL enable_seqscan = off'))
+    return [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {sql}')]
+
+
+def uses_index(plan: list[str]) -> bool:
+    """Checks that no step of the plan scans a whole table.
+
+    Scans of the rows of subqueries and CTEs, already narrowed by their own
+    steps, are not table scans.
+    """
+    subqueries: set[str] = {
+        line.split()[1] for line in plan if line.startswith(SUBQUERY_STEPS)
+    }
+    return not any(
+        'Seq Scan' in line
+        or (line.startswith('SCAN') and 'USING' not in line
+            and line != 'SCAN CONSTANT ROW'
+            and line.split()[1] not in subqueries)
+        for line in plan
+    )
+
+
+def check_hot_queries(
+        engine: Engine, queries: dict
+) -> dict[str, tuple[bool, list[str]]]:
+    """Explains every query.
+
+    Args:
+        engine (Engine): The engine of a database with the current schema.
+        queries (dict): The statements by name, e.g. ``HOT_QUERIES`` and
+            the hot queries of the bot.
+
+    Returns:
+        dict[str, tuple[bool, list[str]]]: The query name to whether it uses
+            an index and its plan.
+    """
+    results: dict[str, tuple[bool, list[str]]] = {}
+    for name, statement in queries.items():
+        with engine.begin() as connection:
+            plan: list[str] = explain(connection, statement)
+        results[name] = (uses_index(plan), plan)
+
+    return results
@@ -1,63 +1,333 @@
+import argparse
+import csv
+import io
+import logging
+import os
+import time
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, TypeVar
+
+from sqlalchemy import Column, MetaData, String, Table, select
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
+
+from ..fs_tools.path_utils import get_absolute_path
+from ..fs_tools.read_config import read_config
+from ..fs_tools.read_stream import (
+    iter_csv, iter_json_category_items, iter_jsonl
+)
+from .db_operations import insert_ignoring_conflicts
+from .db_session import create_db_session
+from .migrations import upgrade_database
+from .models import Category, Word
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+IMPORT_CHUNK_SIZE = 1000
+COPY_CHUNK_SIZE = 10000
+PROGRESS_INTERVAL = 5.0
+
+staging_metadata = MetaData()
+words_import = Table(
+    'words_import', staging_metadata,
+    Column('word', String, nullable=False),
+    Column('translation', String),
+    Column('category', String),
+    prefixes=['TEMPORARY'],
+    postgresql_on_commit='DROP'
+)
+
+
+class WordRecord(NamedTuple):
+    """A dictionary entry read from an import source.
+
+    Attributes:
+        category (str | None): The category of the word, if the source has
+            one.
+        word (str): The English word.
+        translation (str | None): The translation of the word.
+    """
+    category: str | None
+    word: str
+    translation: str | None
+
+
+class ImportStats(NamedTuple):
+    """The result of a dictionary import.
+
+    Attributes:
+        read (int): The number of records read from the source.
+        inserted (int): The number of new words written to the database.
+        seconds (float): The duration of the import.
+    """
+    read: int
+    inserted: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """Returns the import throughput in records per second."""
+        return self.read / self.seconds if self.seconds else 0.0
+
 
-from ..fs_tools.read_file import read_file
-from .models import Word
+class ImportProgress:
+    """Counts imported records and periodically logs the progress."""
 
+    def __init__(self, interval: float = PROGRESS_INTERVAL) -> None:
+        self.interval = interval
+        self.read = 0
+        self.inserted = 0
+        self.started_at = time.monotonic()
+        self._reported_at = self.started_at
 
-def import_json_data_to_db(session, file_path: str) -> None:
-    """Imports JSON data from a file into a database using the provided session.
+    def advance(self, read: int, inserted: int = 0) -> None:
+        """Adds processed records, logging the progress every interval."""
+        self.read += read
+        self.inserted += inserted
+
+        now: float = time.monotonic()
+        if now - self._reported_at >= self.interval:
+            self._reported_at = now
+            self.report()
+
+    def report(self) -> None:
+        """Logs the number of records and the rate."""
+        stats: ImportStats = self.result()
+        logger.info(
+            'Import: %d records read, %d new words, %.0f rows/s',
+            stats.read, stats.inserted, stats.rows_per_second
+        )
+
+    def result(self) -> ImportStats:
+        """Returns the counters and the elapsed time."""
+        return ImportStats(
+            self.read, self.inserted, time.monotonic() - self.started_at
+        )
+
+
+def import_json_data_to_db(
+        session: Session,
+        file_path: str,
+        chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportStats:
+    """Imports dictionary words from a file into the database.
+
+    The source is parsed incrementally, so memory usage does not depend on
+    its size. Words that already exist among the base words are skipped;
+    new words get the category of their record, which is created if it is
+    missing. On PostgreSQL the records are streamed with COPY into a temporary
+    staging table and moved into ``words`` with one
+    ``INSERT ... ON CONFLICT DO NOTHING``; other databases get chunked
+    ``INSERT ... ON CONFLICT DO NOTHING`` statements.
 
     Args:
-        session (Session): The session object used to interact with the database
-        file_path (str): The path to the JSON file containing the data
-            to be imported
+        session (Session): The session object used to interact with the
+            database
+        file_path (str): The path to the JSON, JSONL or CSV file containing
+            the data to be imported
+        chunk_size (int): The number of rows per INSERT statement.
 
     Returns:
-        None: This function does not return anything.
+        ImportStats: The number of read and inserted records and the
+            duration of the import.
 
     Raises:
         DatabaseError: If there is an error while importing the data into the
             database
     """
-    data: dict = read_file(file_path)
-    words = extract_words_from_json(data)
-    existing_word_words = get_existing_words(session, words)
-    words = filter_out_existing_words(words, existing_word_words)
-    import_words_to_db(session, words)
-
-
-def extract_words_from_json(data: dict) -> list[Word]:
-    """Extracts words from the JSON data and returns a list of Word objects."""
-    return [
-        Word(word=word_data['word'], translation=word_data['translation'])
-        for category_content in data['categories'].values()
-        for word_data in category_content
-    ]
-
-
-def get_existing_words(session, words: list[Word]) -> list[str]:
-    """Returns a list of words that already exist in the database. """
-    existing_word_words = (
-        session
-        .query(Word.word)
-        .filter(Word.word.in_([word.word for word in words]))
-        .all()
+    records: Iterator[WordRecord] = read_word_records(file_path)
+    progress = ImportProgress()
+
+    try:
+        if supports_copy(session):
+            copy_words_to_db(session, records, progress)
+        else:
+            insert_words_in_chunks(session, records, chunk_size, progress)
+    except DatabaseError as e:
+        session.rollback()
+        raise e
+
+    progress.report()
+    return progress.result()
+
+
+def read_word_records(file_path: str) -> Iterator[WordRecord]:
+    """Reads dictionary records from a JSON, JSONL or CSV file.
+
+    A JSON file has the ``{"categories": {name: [{word, translation}]}}``
+    structure of ``words.json``. JSONL lines and CSV rows (with a header)
+    have ``word``, ``translation`` and an optional ``category`` field.
+    Records without a word are skipped.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+    extension: str = os.path.splitext(file_path)[1].lower()
+
+    if extension == '.json':
+        items: Iterable[tuple[str | None, dict]] = iter_json_category_items(
+            file_path
+        )
+    elif extension in ('.jsonl', '.ndjson'):
+        items = ((None, item) for item in iter_jsonl(file_path))
+    elif extension == '.csv':
+        items = ((None, item) for item in iter_csv(file_path))
+    else:
+        raise ValueError(f'Unsupported dictionary format: {extension}')
+
+    for category, item in items:
+        word: str = (item.get('word') or '').strip()
+        if word:
+            yield WordRecord(
+                item.get('category', category),
+                word,
+                (item.get('translation') or '').strip() or None
+            )
+
+
+def get_category_ids(
+        session: Session, names: Iterable[str | None]
+) -> dict[str, int]:
+    """Returns the IDs of the named categories, creating missing ones."""
+    unique_names: set[str] = {name for name in names if name}
+    if not unique_names:
+        return {}
+
+    insert_ignoring_conflicts(
+        session, Category.__table__,
+        [{'name': name} for name in sorted(unique_names)], ['name']
     )
-    return [word[0] for word in existing_word_words]
+    return dict(session.execute(
+        select(Category.name, Category.id)
+        .where(Category.name.in_(unique_names))
+    ).all())
 
 
-def filter_out_existing_words(
-        words: list[Word], existing_word_words: list[str]
-) -> list[Word]:
-    """Filters out words that already exist in the database."""
-    return [word for word in words if word.word not in existing_word_words]
+def chunked(records: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Splits the records into lists of ``size`` items."""
+    iterator: Iterator[T] = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
-def import_words_to_db(session, words: list[Word]) -> None:
-    """Imports words into the database using the provided session."""
-    session.add_all(words)
-    try:
+def insert_words_in_chunks(
+        session: Session,
+        records: Iterable[WordRecord],
+        chunk_size: int,
+        progress: ImportProgress
+) -> None:
+    """Inserts the records chunk by chunk, committing after each chunk.
+
+    A failed import can simply be restarted: the chunks that were already
+    committed are skipped as existing words.
+    """
+    for chunk in chunked(records, chunk_size):
+        category_ids: dict[str, int] = get_category_ids(
+            session, (record.category for record in chunk)
+        )
+        inserted: int = insert_ignoring_conflicts(
+            session,
+            Word.__table__,
+            [
+                {
+                    'word': record.word,
+                    'translation': record.translation,
+                    'category_id': category_ids.get(record.category),
+                }
+                for record in chunk
+            ],
+            ['word'],
+            Word.user_id.is_(None)
+        )
         session.commit()
-    except DatabaseError as e:
-        session.rollback()
-        raise e
+        progress.advance(len(chunk), inserted)
+
+
+def supports_copy(session: Session) -> bool:
+    """Checks if the session is bound to PostgreSQL through psycopg2."""
+    dialect = session.get_bind().dialect
+    return dialect.name == 'postgresql' and dialect.driver == 'psycopg2'
+
+
+def copy_words_to_db(
+        session: Session,
+        records: Iterable[WordRecord],
+        progress: ImportProgress
+) -> None:
+    """Streams the records into PostgreSQL with COPY.
+
+    The records are copied into a temporary staging table which is dropped
+    on commit. The missing categories are created from it, then the words
+    are inserted into ``words`` with their category IDs in one statement.
+    """
+    words_import.create(session.connection())
+    cursor = session.connection().connection.dbapi_connection.cursor()
+
+    for chunk in chunked(records, COPY_CHUNK_SIZE):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            (record.word, record.translation, record.category)
+            for record in chunk
+        )
+        buffer.seek(0)
+        cursor.copy_expert(
+            'COPY words_import (word, translation, category) FROM STDIN '
+            'WITH (FORMAT csv)',
+            buffer
+        )
+        progress.advance(len(chunk))
+
+    session.execute(
+        postgresql.insert(Category)
+        .from_select(
+            ['name'],
+            select(words_import.c.category).distinct()
+            .where(words_import.c.category.is_not(None))
+        )
+        .on_conflict_do_nothing(index_elements=['name'])
+    )
+    statement = (
+        postgresql.insert(Word)
+        .from_select(
+            ['word', 'translation', 'category_id'],
+            select(
+                words_import.c.word, words_import.c.translation, Category.id
+            )
+            .select_from(words_import)
+            .outerjoin(Category, Category.name == words_import.c.category)
+        )
+        .on_conflict_do_nothing(
+            index_elements=['word'], index_where=Word.user_id.is_(None)
+        )
+    )
+    progress.advance(0, session.execute(statement).rowcount)
+    session.commit()
+
+
+def main() -> None:
+    """Imports a dictionary file into the database configured in
+    settings.ini."""
+    parser = argparse.ArgumentParser(
+        description='Imports dictionary words from a JSON, JSONL or CSV file.'
+    )
+    parser.add_argument('path', help='the dictionary file')
+    parser.add_argument(
+        '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+        help='rows per INSERT statement'
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    session, engine = create_db_session(
+        read_config(get_absolute_path(['settings.ini']), 'DB')
+    )
+    upgrade_database(engine)
+    with session:
+        import_json_data_to_db(session, args.path, args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
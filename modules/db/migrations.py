@@ -0,0 +1,368 @@
+import logging
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from sqlalchemy import (
+    Column, ColumnElement, Connection, DateTime, Engine, Integer, MetaData,
+    String, Table, and_, delete, exists, func, inspect, insert, select, text,
+    update
+)
+from sqlalchemy.orm import aliased
+
+from .models import (
+    CREATE_PG_TRGM, Base, Category, ImportedCategory, ImportSource,
+    UserDailyAnswers, UserStats, UserWordSetting, Word, word_category
+)
+
+logger = logging.getLogger(__name__)
+
+# Words per UPDATE when the categories of the base words are filled in
+CATEGORY_UPDATE_CHUNK = 1000
+
+version_metadata = MetaData()
+schema_version = Table(
+    'schema_version', version_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String, nullable=False),
+    Column('applied_at', DateTime, nullable=False, default=datetime.now)
+)
+
+
+class Migration(NamedTuple):
+    """A step upgrading the schema of an existing database.
+
+    Attributes:
+        version (int): The schema version the step upgrades to.
+        description (str): What the step changes.
+        upgrade (Callable[[Connection], None]): Applies the step.
+    """
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def create_index(connection: Connection, table: Table, name: str) -> None:
+    """Creates the model index with the given name if it does not exist."""
+    index = next(index for index in table.indexes if index.name == name)
+    index.create(connection, checkfirst=True)
+
+
+def merge_duplicate_words(
+        connection: Connection,
+        same_word: Callable[[type[Word], type[Word]], ColumnElement[bool]]
+) -> int:
+    """Deletes the duplicates of words, keeping the oldest one of each.
+
+    The users' settings of a duplicate are moved to the kept word, unless
+    the user already has a setting of it, in which case the duplicate's
+    setting is deleted.
+
+    Args:
+        connection (Connection): The connection of the migration.
+        same_word (Callable): Builds the condition that two aliases of the
+            words are duplicates of each other.
+
+    Returns:
+        int: The number of deleted duplicates.
+    """
+    duplicate, kept = aliased(Word), aliased(Word)
+    kept_ids: dict[int, int] = dict(connection.execute(
+        select(duplicate.id, func.min(kept.id))
+        .join(kept, and_(kept.id < duplicate.id, same_word(duplicate, kept)))
+        .group_by(duplicate.id)
+    ).all())
+
+    other = aliased(UserWordSetting)
+    for duplicate_id, kept_id in kept_ids.items():
+        connection.execute(
+            delete(UserWordSetting)
+            .where(
+                UserWordSetting.word_id == duplicate_id,
+                exists().where(
+                    other.user_id == UserWordSetting.user_id,
+                    other.word_id == kept_id
+                )
+            )
+        )
+        connection.execute(
+            update(UserWordSetting)
+            .where(UserWordSetting.word_id == duplicate_id)
+            .values(word_id=kept_id)
+        )
+        connection.execute(delete(Word).where(Word.id == duplicate_id))
+
+    if kept_ids:
+        logger.info('Merged %d duplicate words', len(kept_ids))
+    return len(kept_ids)
+
+
+def add_hot_query_indexes(connection: Connection) -> None:
+    """Adds the indexes of the hot queries and makes settings unique.
+
+    Duplicate base words are merged into the oldest one, and duplicate
+    settings of a user for the same word are deleted, keeping the oldest
+    one, before the unique indexes are created.
+    """
+    create_index(connection, Word.__table__, 'ix_words_word')
+    merge_duplicate_words(connection, lambda duplicate, kept: and_(
+        duplicate.user_id.is_(None),
+        kept.user_id.is_(None),
+        kept.word == duplicate.word
+    ))
+    create_index(connection, Word.__table__, 'uq_words_base_word')
+
+    connection.execute(
+        delete(UserWordSetting)
+        .where(UserWordSetting.id.not_in(
+            select(func.min(UserWordSetting.id))
+            .group_by(UserWordSetting.user_id, UserWordSetting.word_id)
+        ))
+    )
+    for name in (
+            'uq_user_word_settings_user_id_word_id',
+            'ix_user_word_settings_user_id_is_hidden',
+            'ix_user_word_settings_word_id'
+    ):
+        create_index(connection, UserWordSetting.__table__, name)
+
+
+def add_column(connection: Connection, table: Table, name: str) -> None:
+    """Adds the model column with the given name if it does not exist."""
+    existing: set[str] = {
+        column['name']
+        for column in inspect(connection).get_columns(table.name)
+    }
+    if name in existing:
+        return
+
+    column_type: str = table.c[name].type.compile(connection.dialect)
+    connection.execute(
+        text(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}')
+    )
+
+
+def add_review_schedule(connection: Connection) -> None:
+    """Adds the spaced-repetition state to the user word settings.
+
+    Visible words become due at their last show time, so they are asked
+    in the order they were last seen; hidden words get no due time.
+    """
+    table: Table = UserWordSetting.__table__
+    for name in ('due_at', 'ease', 'interval_days', 'repetitions'):
+        add_column(connection, table, name)
+
+    connection.execute(
+        update(UserWordSetting)
+        .values(ease=2.5, interval_days=0, repetitions=0)
+    )
+    connection.execute(
+        update(UserWordSetting)
+        .where(UserWordSetting.is_hidden.is_not(True))
+        .values(due_at=func.coalesce(
+            UserWordSetting.last_shown_at, datetime.now()
+        ))
+    )
+    create_index(connection, table, 'ix_user_word_settings_user_id_due_at')
+
+
+def add_user_stats(connection: Connection) -> None:
+    """Adds the per-user progress aggregates and the daily answers.
+
+    The answers given before the upgrade are not known, so the history
+    starts empty; a user's aggregates are built on their first read.
+    """
+    UserStats.__table__.create(connection, checkfirst=True)
+    UserDailyAnswers.__table__.create(connection, checkfirst=True)
+
+
+def add_trigram_index(connection: Connection) -> None:
+    """Adds the trigram index of the words for typo-tolerant lookups.
+
+    Only PostgreSQL gets the index, along with the ``pg_trgm`` extension.
+    """
+    if connection.dialect.name != 'postgresql':
+        return
+
+    connection.execute(CREATE_PG_TRGM)
+    create_index(connection, Word.__table__, 'ix_words_lower_word_trgm')
+
+
+def add_import_hashes(connection: Connection) -> None:
+    """Adds the content hashes of the imported dictionary files.
+
+    No file is recorded yet, so the next start compares every category
+    with the words already in the database once.
+    """
+    ImportSource.__table__.create(connection, checkfirst=True)
+    ImportedCategory.__table__.create(connection, checkfirst=True)
+
+
+def add_word_categories(connection: Connection) -> None:
+    """Adds the categories of the base words.
+
+    The words of the categories recorded by the dictionary sync get their
+    category here. A database never synced has no recorded categories, and
+    its next start applies every category of the dictionary file anyway.
+    """
+    Category.__table__.create(connection, checkfirst=True)
+    add_column(connection, Word.__table__, 'category_id')
+    create_index(connection, Word.__table__, 'ix_words_category_id_id')
+
+    categories: dict[str, list[str]] = {}
+    for name, words in connection.execute(
+            select(ImportedCategory.category, ImportedCategory.words)
+            .where(ImportedCategory.category != '')
+    ):
+        categories.setdefault(name, []).extend(words)
+
+    for name, words in categories.items():
+        category_id: int = connection.execute(
+            insert(Category).values(name=name)
+        ).inserted_primary_key[0]
+        for start in range(0, len(words), CATEGORY_UPDATE_CHUNK):
+            connection.execute(
+                update(Word)
+                .where(
+                    Word.user_id.is_(None),
+                    Word.word.in_(words[start:start + CATEGORY_UPDATE_CHUNK])
+                )
+                .values(category_id=category_id)
+            )
+
+
+def make_user_words_unique(connection: Connection) -> None:
+    """Makes the words of a user unique regardless of case.
+
+    Words added twice by concurrent handlers are merged into the older one
+    first, then the ``(user_id, lower(word))`` index is recreated unique.
+    """
+    merge_duplicate_words(connection, lambda duplicate, kept: and_(
+        duplicate.user_id.is_not(None),
+        kept.user_id == duplicate.user_id,
+        func.lower(kept.word) == func.lower(duplicate.word)
+    ))
+    create_index(connection, Word.__table__, 'uq_words_user_id_lower_word')
+    connection.execute(
+        text('DROP INDEX IF EXISTS ix_words_user_id_lower_word')
+    )
+
+
+def add_setting_categories(connection: Connection) -> None:
+    """Copies the categories of the words to the user word settings.
+
+    The review queue of a category is then read from the
+    ``(user_id, category_id, due_at)`` index instead of the whole queue of
+    the user.
+    """
+    table: Table = UserWordSetting.__table__
+    add_column(connection, table, 'category_id')
+    connection.execute(
+        update(UserWordSetting)
+        .where(UserWordSetting.word_id.in_(
+            select(Word.id).where(Word.category_id.is_not(None))
+        ))
+        .values(category_id=word_category(UserWordSetting.word_id))
+    )
+    create_index(
+        connection, table, 'ix_user_word_settings_user_id_category_id_due_at'
+    )
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        'Indexes for hot queries, unique user word settings',
+        add_hot_query_indexes
+    ),
+    Migration(
+        2,
+        'Spaced-repetition schedule of user word settings',
+        add_review_schedule
+    ),
+    Migration(
+        3,
+        'Per-user progress statistics and daily answers',
+        add_user_stats
+    ),
+    Migration(
+        4,
+        'Trigram index of words for typo-tolerant lookups',
+        add_trigram_index
+    ),
+    Migration(
+        5,
+        'Content hashes of the imported dictionary files',
+        add_import_hashes
+    ),
+    Migration(
+        6,
+        'Categories of the base words',
+        add_word_categories
+    ),
+    Migration(
+        7,
+        'Unique words of a user regardless of case',
+        make_user_words_unique
+    ),
+    Migration(
+        8,
+        'Categories of the user word settings',
+        add_setting_categories
+    ),
+]
+
+
+def get_schema_version(connection: Connection) -> int:
+    """Returns the version of the database schema, 0 if none is recorded."""
+    return connection.scalar(
+        select(func.coalesce(func.max(schema_version.c.version), 0))
+    )
+
+
+def record_version(connection: Connection, migration: Migration) -> None:
+    """Records that the migration has been applied."""
+    connection.execute(
+        insert(schema_version).values(
+            version=migration.version, description=migration.description
+        )
+    )
+
+
+def upgrade_database(engine: Engine) -> int:
+    """Creates missing tables and upgrades the schema to the latest version.
+
+    A new database gets the current schema from the models and is stamped
+    with the latest version. An existing one is upgraded in place by the
+    pending migrations, each in its own transaction.
+
+    Args:
+        engine (Engine): The engine of the database.
+
+    Returns:
+        int: The schema version of the database after the upgrade.
+    """
+    with engine.begin() as connection:
+        is_new: bool = not inspect(connection).has_table(Word.__tablename__)
+        Base.metadata.create_all(connection)
+        schema_version.create(connection, checkfirst=True)
+
+        if is_new:
+            for migration in MIGRATIONS:
+                record_version(connection, migration)
+
+        current_version: int = get_schema_version(connection)
+
+    for migration in MIGRATIONS:
+        if migration.version <= current_version:
+            continue
+
+        logger.info(
+            'Migrating the database to version %d: %s',
+            migration.version, migration.description
+        )
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            record_version(connection, migration)
+        current_version = migration.version
+
+    return current_version
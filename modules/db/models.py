@@ -1,5 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import (
+    DDL, JSON, Boolean, Column, Date, DateTime, Float, ForeignKey, Index,
+    Integer, String, event, func, select
+)
 from sqlalchemy.orm import relationship, DeclarativeBase
 
 
@@ -22,6 +25,19 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.now)
 
 
+class Category(Base):
+    """Define the Category database model.
+
+    Attributes:
+        id (int): The primary key for the Category.
+        name (str): The unique name of the category in the dictionary
+            file, e.g. 'colors'.
+    """
+    __tablename__ = 'categories'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+
 class Word(Base):
     """Define the Word database model.
 
@@ -30,13 +46,53 @@ class Word(Base):
         word (str): The actual word.
         translation (str): The translation of the word.
         user_id (int): Foreign key reference to the User who added this word.
+        category_id (int): Foreign key reference to the Category of a base
+            word; None for the users' words and uncategorised words.
+
+    Base words (without a user) are unique, which lets the dictionary import
+    skip existing words with ``INSERT ... ON CONFLICT DO NOTHING``. A user's
+    words are unique case-insensitively by ``(user_id, lower(word))``, which
+    serves their lookups and lets a word added twice at once be skipped.
+    On PostgreSQL, ``lower(word)`` also has a trigram index for the
+    typo-tolerant lookups of the ``pg_trgm`` extension. The quiz of a
+    category finds the id range of its words and picks words from it by
+    the ``(category_id, id)`` index.
     """
     __tablename__ = 'words'
     id = Column(Integer, primary_key=True)
     word = Column(String, nullable=False)
     translation = Column(String)
     user_id = Column(Integer, ForeignKey('users.id'))
+    category_id = Column(Integer, ForeignKey('categories.id'))
     user = relationship('User', backref='added_words')
+    category = relationship('Category', backref='words')
+
+    __table_args__ = (
+        Index(
+            'uq_words_base_word', word, unique=True,
+            postgresql_where=user_id.is_(None),
+            sqlite_where=user_id.is_(None)
+        ),
+        Index('ix_words_word', word),
+        Index(
+            'uq_words_user_id_lower_word', user_id, func.lower(word),
+            unique=True
+        ),
+        Index('ix_words_category_id_id', category_id, id),
+        Index(
+            'ix_words_lower_word_trgm', func.lower(word).label('lower_word'),
+            postgresql_using='gin',
+            postgresql_ops={'lower_word': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
+
+
+# The trigram operator class of the words index comes with the extension
+CREATE_PG_TRGM = DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+event.listen(
+    Word.__table__, 'before_create',
+    CREATE_PG_TRGM.execute_if(dialect='postgresql')
+)
 
 
 class UserWordSetting(Base):
@@ -52,6 +108,17 @@ class UserWordSetting(Base):
         correct_answers (int): The number of correct answers.
         last_shown_at (datetime): The timestamp of the last time
             the word was shown.
+        due_at (datetime): When the word should be asked next; None for
+            hidden words.
+        ease (float): The interval growth factor of the word.
+        interval_days (float): The current interval between reviews.
+        repetitions (int): Consecutive correct answers.
+        category_id (int): The category of the word, copied from it so
+            the review queue of a category is read from the
+            ``(user_id, category_id, due_at)`` index alone; None for
+            uncategorised words.
+
+    A user has at most one setting per word.
     """
     __tablename__ = 'user_word_settings'
     id = Column(Integer, primary_key=True)
@@ -60,5 +127,122 @@ class UserWordSetting(Base):
     is_hidden = Column(Boolean, default=False)
     correct_answers = Column(Integer, default=0)
     last_shown_at = Column(DateTime, default=datetime.now)
+    due_at = Column(DateTime, default=datetime.now)
+    ease = Column(Float, default=2.5)
+    interval_days = Column(Float, default=0)
+    repetitions = Column(Integer, default=0)
+    category_id = Column(Integer, ForeignKey('categories.id'))
     user = relationship('User', backref='user_word_settings')
     word = relationship('Word', backref='user_word_settings')
+
+    __table_args__ = (
+        Index(
+            'uq_user_word_settings_user_id_word_id', user_id, word_id,
+            unique=True
+        ),
+        Index('ix_user_word_settings_user_id_is_hidden', user_id, is_hidden),
+        Index('ix_user_word_settings_word_id', word_id),
+        Index('ix_user_word_settings_user_id_due_at', user_id, due_at),
+        Index(
+            'ix_user_word_settings_user_id_category_id_due_at',
+            user_id, category_id, due_at
+        ),
+    )
+
+
+def word_category(word_id):
+    """Returns the category of the word with the given ID as a scalar
+    subquery, for copying it to the user word settings."""
+    return select(Word.category_id).where(Word.id == word_id) \
+        .scalar_subquery()
+
+
+class UserStats(Base):
+    """Define the UserStats database model.
+
+    The aggregates are updated together with the data they count, so
+    reading a user's progress is a lookup of one row. A missing row is
+    rebuilt from the words, settings and daily answers of the user.
+
+    Attributes:
+        user_id (int): The primary key and foreign key reference to the
+            User.
+        words_added (int): The words the user added to the dictionary.
+        words_in_progress (int): Visible words answered correctly at least
+            once.
+        words_learned (int): Words hidden after being learned.
+        answers (int): All quiz answers of the user.
+        correct_answers (int): The correct quiz answers.
+        active_days (int): The days with at least one answer.
+        streak_days (int): Consecutive days with answers, ending on the
+            last answer day.
+        answers_today (int): The answers given on the last answer day.
+        last_answer_on (date): The day of the last answer.
+    """
+    __tablename__ = 'user_stats'
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    words_added = Column(Integer, nullable=False, default=0)
+    words_in_progress = Column(Integer, nullable=False, default=0)
+    words_learned = Column(Integer, nullable=False, default=0)
+    answers = Column(Integer, nullable=False, default=0)
+    correct_answers = Column(Integer, nullable=False, default=0)
+    active_days = Column(Integer, nullable=False, default=0)
+    streak_days = Column(Integer, nullable=False, default=0)
+    answers_today = Column(Integer, nullable=False, default=0)
+    last_answer_on = Column(Date)
+
+
+class UserDailyAnswers(Base):
+    """Define the UserDailyAnswers database model.
+
+    Attributes:
+        user_id (int): Foreign key reference to the User.
+        day (date): The day of the answers.
+        answers (int): The quiz answers of the user on the day.
+        correct_answers (int): The correct ones among them.
+    """
+    __tablename__ = 'user_daily_answers'
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    answers = Column(Integer, nullable=False, default=0)
+    correct_answers = Column(Integer, nullable=False, default=0)
+
+
+class ImportSource(Base):
+    """Define the ImportSource database model.
+
+    A dictionary file imported at startup, so an unchanged file is not
+    read again.
+
+    Attributes:
+        source (str): The primary key, the name of the file.
+        content_hash (str): The SHA-256 of the file as it was imported.
+        imported_at (datetime): When the file was last imported.
+    """
+    __tablename__ = 'import_sources'
+    source = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)
+    imported_at = Column(DateTime, default=datetime.now)
+
+
+class ImportedCategory(Base):
+    """Define the ImportedCategory database model.
+
+    A category of an imported dictionary file. Its words are kept to find
+    the words removed from the category when it changes.
+
+    Attributes:
+        source (str): Foreign key reference to the ImportSource.
+        category (str): The name of the category; empty for the words of a
+            file without categories.
+        content_hash (str): The SHA-256 of the category's words and
+            translations.
+        words (list[str]): The words of the category.
+    """
+    __tablename__ = 'imported_categories'
+    source = Column(
+        String, ForeignKey('import_sources.source'), primary_key=True
+    )
+    category = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)
+    words = Column(JSON, nullable=False)
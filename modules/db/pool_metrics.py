@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Counts connection pool events of an engine.
+
+    Attributes:
+        connects (int): The number of DBAPI connections opened.
+        checkouts (int): The number of connections borrowed from the pool.
+        checkins (int): The number of connections returned to the pool.
+        invalidations (int): The number of connections found broken.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+
+    def stats(self) -> dict[str, int]:
+        """Returns the event counters and the current pool occupancy."""
+        pool = self.engine.pool
+        occupancy: dict[str, int] = {
+            name: getattr(pool, name)()
+            for name in ('size', 'checkedin', 'checkedout', 'overflow')
+            if hasattr(pool, name)
+        }
+
+        return {
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'invalidations': self.invalidations,
+            **occupancy,
+        }
+
+    def _on_connect(self, *args) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, *args) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, *args) -> None:
+        self.checkins += 1
+
+    def _on_invalidate(self, *args) -> None:
+        self.invalidations += 1
+
+
+def start_pool_reporter(metrics: PoolMetrics, interval: float) \
+        -> threading.Thread | None:
+    """Logs the pool metrics every ``interval`` seconds in a daemon thread.
+
+    Args:
+        metrics (PoolMetrics): The metrics to report.
+        interval (float): The report interval. Nothing is started if it is
+            not positive.
+
+    Returns:
+        threading.Thread | None: The reporter thread, if started.
+    """
+    if interval <= 0:
+        return None
+
+    def report() -> None:
+        while True:
+            time.sleep(interval)
+            logger.info('DB pool: %s', metrics.stats())
+
+    thread = threading.Thread(target=report, name='pool-reporter', daemon=True)
+    thread.start()
+    return thread
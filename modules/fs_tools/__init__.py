@@ -1,6 +1,15 @@
-from .read_config import read_config
+from .read_config import read_config, read_section
 from .read_file import read_file
+from .read_stream import iter_csv, iter_json_category_items, iter_jsonl
 from .path_utils import get_absolute_path
 
 
-__all__ = ['read_config', 'read_file', 'get_absolute_path']
+__all__ = [
+    'read_config',
+    'read_section',
+    'read_file',
+    'iter_csv',
+    'iter_json_category_items',
+    'iter_jsonl',
+    'get_absolute_path'
+]
@@ -1,12 +1,19 @@
 import configparser
 
 
-def read_config(file_path: str, section: str = 'engine') -> dict[str, str]:
+def read_config(
+        file_path: str,
+        section: str = 'engine',
+        defaults: dict[str, str] | None = None
+) -> dict[str, str]:
     """Reads the specified section from the config file.
 
     Args:
         file_path (str): The path to the config file.
         section (str): The section to read. Defaults to 'engine'.
+        defaults (dict[str, str] | None): Default values for the section.
+            If given, the section becomes optional and the values read from
+            the file override the defaults.
 
     Returns:
         dict: A dictionary with the section's parameters.
@@ -14,4 +21,30 @@ def read_config(file_path: str, section: str = 'engine') -> dict[str, str]:
     config = configparser.ConfigParser()
     config.read(file_path)
 
-    return {key: value for key, value in config[section].items()}
+    return read_section(config, section, defaults)
+
+
+def read_section(
+        config: configparser.ConfigParser,
+        section: str,
+        defaults: dict[str, str] | None = None
+) -> dict[str, str]:
+    """Reads the specified section from an already parsed config.
+
+    Args:
+        config (configparser.ConfigParser): The parsed config file.
+        section (str): The section to read.
+        defaults (dict[str, str] | None): Default values for the section,
+            as in ``read_config``.
+
+    Returns:
+        dict: A dictionary with the section's parameters.
+    """
+    if defaults is None:
+        return {key: value for key, value in config[section].items()}
+
+    options: dict[str, str] = dict(defaults)
+    if config.has_section(section):
+        options.update(config[section].items())
+
+    return options
@@ -0,0 +1,138 @@
+import csv
+import json
+from typing import Any, Iterator, TextIO
+
+READ_CHUNK_CHARS = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class JsonStreamReader:
+    """Reads a JSON document from a text file piece by piece.
+
+    Only the structural tokens the caller asks for are consumed; nested
+    values are decoded one at a time, so memory usage is bounded by the
+    largest single value rather than by the whole document.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        self._file = file
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Reads the next piece of the file, returns False at the end."""
+        if self._eof:
+            return False
+
+        chunk: str = self._file.read(READ_CHUNK_CHARS)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            while (
+                    self._position < len(self._buffer)
+                    and self._buffer[self._position].isspace()
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ''
+
+    def expect(self, *chars: str) -> str:
+        """Consumes the next character, which must be one of ``chars``."""
+        char: str = self.peek()
+        if char not in chars:
+            raise ValueError(
+                f'Expected one of {chars!r}, got {char!r} '
+                f'at offset {self._position}'
+            )
+        self._position += 1
+        return char
+
+    def value(self) -> Any:
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+
+def iter_json_category_items(path: str, key: str = 'categories') \
+        -> Iterator[tuple[str, dict]]:
+    """Yields the items of a ``{key: {category: [item, ...]}}`` JSON file.
+
+    Args:
+        path (str): The path to the JSON file.
+        key (str): The top-level key holding the categories.
+
+    Yields:
+        tuple[str, dict]: The category name and one of its items.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        reader = JsonStreamReader(file)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+
+        while True:
+            name: str = reader.value()
+            reader.expect(':')
+            if name == key:
+                yield from _iter_categories(reader)
+            else:
+                reader.value()
+            if reader.expect(',', '}') == '}':
+                return
+
+
+def _iter_categories(reader: JsonStreamReader) -> Iterator[tuple[str, dict]]:
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.expect('}')
+        return
+
+    while True:
+        category: str = reader.value()
+        reader.expect(':')
+        reader.expect('[')
+        if reader.peek() == ']':
+            reader.expect(']')
+        else:
+            while True:
+                yield category, reader.value()
+                if reader.expect(',', ']') == ']':
+                    break
+        if reader.expect(',', '}') == '}':
+            return
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """Yields the objects of a JSON Lines file, skipping blank lines."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv(path: str) -> Iterator[dict]:
+    """Yields the rows of a CSV file with a header row as dictionaries."""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        yield from csv.DictReader(file)
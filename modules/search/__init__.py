@@ -0,0 +1,14 @@
+from .distance import edit_distance
+from .distractors import DistractorIndex
+from .fuzzy import FuzzyWordIndex, allowed_edits
+from .id_set import IndexedIdSet
+from .prefix import PrefixIndex
+
+__all__ = [
+    'edit_distance',
+    'DistractorIndex',
+    'FuzzyWordIndex',
+    'allowed_edits',
+    'IndexedIdSet',
+    'PrefixIndex'
+]
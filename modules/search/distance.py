@@ -0,0 +1,32 @@
+def edit_distance(
+        first: str, second: str, max_distance: int | None = None
+) -> int:
+    """Returns the Levenshtein distance between two strings.
+
+    With ``max_distance`` the comparison stops as soon as the distance is
+    known to exceed it, and ``max_distance + 1`` is returned then.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+
+    if max_distance is not None and len(first) - len(second) > max_distance:
+        return max_distance + 1
+
+    previous: list[int] = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current: list[int] = [i]
+        distance: int = i
+        for j, second_char in enumerate(second):
+            distance += 1
+            if previous[j + 1] + 1 < distance:
+                distance = previous[j + 1] + 1
+            if previous[j] + (first_char != second_char) < distance:
+                distance = previous[j] + (first_char != second_char)
+            current.append(distance)
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+
+    if max_distance is not None:
+        return min(previous[-1], max_distance + 1)
+    return previous[-1]
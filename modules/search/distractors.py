@@ -0,0 +1,138 @@
+import random
+from collections.abc import Hashable
+
+from .distance import edit_distance
+from .id_set import IndexedIdSet
+
+# Neighbours kept per word, candidates compared when they are computed and
+# cached neighbour lists a new word is offered to
+NEIGHBOURS = 6
+CANDIDATES = 16
+OFFERS = 8
+
+
+class DistractorIndex:
+    """Plausible wrong answers for quiz words.
+
+    Words are grouped into buckets by category and length. The neighbours
+    of a word are the closest ones by edit distance among a bounded sample
+    of its own and the adjacent length buckets. They are computed when the
+    word is first asked and kept; a word added later is offered to the
+    cached neighbour lists of its bucket, and removed words are skipped
+    when the lists are read. Every operation costs O(1) in the number of
+    words, so the index is never rebuilt.
+    """
+    __slots__ = ('_words', '_buckets', '_neighbours')
+
+    def __init__(self) -> None:
+        self._words: dict[int, tuple[str, tuple]] = {}
+        self._buckets: dict[tuple, IndexedIdSet] = {}
+        self._neighbours: dict[int, list[tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(
+            self, word_id: int, word: str, category: Hashable = None
+    ) -> None:
+        """Adds the word to its bucket and to close cached neighbour lists."""
+        if word_id in self._words:
+            return
+
+        key: tuple = (category, len(word))
+        bucket: IndexedIdSet = self._buckets.setdefault(key, IndexedIdSet())
+        if self._neighbours:
+            for other_id in bucket.sample(OFFERS, word_id):
+                if other_id in self._neighbours:
+                    self._offer(other_id, word_id, word)
+
+        self._words[word_id] = (word, key)
+        bucket.add(word_id)
+
+    def discard(self, word_id: int) -> None:
+        """Removes the word from the index."""
+        entry: tuple[str, tuple] | None = self._words.pop(word_id, None)
+        if entry is None:
+            return
+
+        bucket: IndexedIdSet = self._buckets[entry[1]]
+        bucket.discard(word_id)
+        if not len(bucket):
+            del self._buckets[entry[1]]
+        self._neighbours.pop(word_id, None)
+
+    def choose(self, word_id: int, count: int = 3) -> list[int]:
+        """Returns up to ``count`` random neighbours of the word.
+
+        Fewer IDs are returned when the word has few neighbours, e.g. in a
+        small category; the caller fills the rest with random words.
+        """
+        if word_id not in self._words:
+            return []
+
+        neighbours: list[int] = self._live_neighbours(word_id)
+        if len(neighbours) < count:
+            self._neighbours.pop(word_id)
+            neighbours = self._live_neighbours(word_id)
+
+        return random.sample(neighbours, min(count, len(neighbours)))
+
+    def _live_neighbours(self, word_id: int) -> list[int]:
+        """Returns the cached neighbours still in the index, computing them
+        on first use."""
+        if word_id not in self._neighbours:
+            self._neighbours[word_id] = self._find_neighbours(word_id)
+
+        return [
+            neighbour_id for _, neighbour_id in self._neighbours[word_id]
+            if neighbour_id in self._words
+        ]
+
+    def _find_neighbours(self, word_id: int) -> list[tuple[int, int]]:
+        """Finds the closest words among a sample of the nearby buckets."""
+        word, (category, length) = self._words[word_id]
+        buckets: list[IndexedIdSet] = [
+            self._buckets[key]
+            for key in (
+                (category, length),
+                (category, length - 1),
+                (category, length + 1)
+            )
+            if key in self._buckets
+        ]
+
+        candidates: set[int] = set()
+        for bucket in buckets:
+            candidates.update(
+                bucket.sample(CANDIDATES // len(buckets), word_id)
+            )
+
+        lowered: str = word.lower()
+        scored: list[tuple[int, int]] = []
+        for candidate_id in candidates:
+            candidate: str = self._words[candidate_id][0].lower()
+            if candidate != lowered:
+                scored.append(
+                    (edit_distance(lowered, candidate), candidate_id)
+                )
+
+        scored.sort()
+        return scored[:NEIGHBOURS]
+
+    def _offer(self, word_id: int, candidate_id: int, candidate: str) -> None:
+        """Puts the candidate into the word's neighbours if it is closer
+        than the farthest of them."""
+        neighbours: list[tuple[int, int]] = self._neighbours[word_id]
+        word: str = self._words[word_id][0].lower()
+        if candidate.lower() == word:
+            return
+
+        distance: int = edit_distance(word, candidate.lower())
+        if len(neighbours) < NEIGHBOURS:
+            neighbours.append((distance, candidate_id))
+        elif distance < neighbours[-1][0]:
+            neighbours[-1] = (distance, candidate_id)
+        else:
+            return
+
+        neighbours.sort()
@@ -0,0 +1,115 @@
+from collections import Counter
+
+from .distance import edit_distance
+
+# Letters of a word per edit a typo in it may have: shorter words must
+# match exactly, as two edits turn them into most other short words
+LETTERS_PER_EDIT = 4
+
+
+def allowed_edits(word: str, max_distance: int) -> int:
+    """Returns the edit distance a typo in the word may have, up to
+    ``max_distance``."""
+    return min(max_distance, len(word) // LETTERS_PER_EDIT)
+
+
+def padded_bigrams(word: str) -> set[str]:
+    """Returns the distinct letter pairs of the word padded at both ends."""
+    padded: str = f'^{word}$'
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class FuzzyWordIndex:
+    """Words indexed by their letter pairs for typo-tolerant lookups.
+
+    One edit changes at most two letter pairs of a word padded at both
+    ends, so a word within ``d`` edits of the query shares all but ``2 * d``
+    of the query's pairs and differs from it in length by ``d`` at most.
+    A lookup counts the shared pairs over the posting lists of the query's
+    pairs, and only the words passing both filters are compared by edit
+    distance. Queries too short to be filtered by their pairs scan the
+    words of the close lengths instead. Words are compared in lowercase.
+    """
+    __slots__ = ('_words', '_postings', '_lengths')
+
+    def __init__(self) -> None:
+        self._words: dict[int, str] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._lengths: dict[int, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(self, word_id: int, word: str) -> None:
+        """Adds the word to the index."""
+        if word_id in self._words:
+            return
+
+        word = word.lower()
+        self._words[word_id] = word
+        self._lengths.setdefault(len(word), set()).add(word_id)
+        for bigram in padded_bigrams(word):
+            self._postings.setdefault(bigram, set()).add(word_id)
+
+    def discard(self, word_id: int) -> None:
+        """Removes the word from the index."""
+        word: str | None = self._words.pop(word_id, None)
+        if word is None:
+            return
+
+        self._remove_posting(self._lengths, len(word), word_id)
+        for bigram in padded_bigrams(word):
+            self._remove_posting(self._postings, bigram, word_id)
+
+    def search(self, word: str, max_distance: int, limit: int | None = None) \
+            -> list[tuple[int, int]]:
+        """Returns the words within ``max_distance`` edits of the word.
+
+        Args:
+            word (str): The word to look up.
+            max_distance (int): The largest edit distance of a match.
+            limit (int | None): The number of the closest matches to
+                return; all matches if None.
+
+        Returns:
+            list[tuple[int, int]]: The edit distances and IDs of the
+                matches, closest first.
+        """
+        word = word.lower()
+        bigrams: set[str] = padded_bigrams(word)
+        min_shared: int = len(bigrams) - 2 * max_distance
+        if min_shared > 0:
+            shared: Counter = Counter()
+            for bigram in bigrams:
+                shared.update(self._postings.get(bigram, ()))
+            candidates = (
+                word_id for word_id, count in shared.items()
+                if count >= min_shared
+            )
+        else:
+            candidates = (
+                word_id
+                for length in range(len(word) - max_distance,
+                                    len(word) + max_distance + 1)
+                for word_id in self._lengths.get(length, ())
+            )
+
+        matches: list[tuple[int, int]] = []
+        for candidate_id in candidates:
+            candidate: str = self._words[candidate_id]
+            if abs(len(candidate) - len(word)) > max_distance:
+                continue
+
+            distance: int = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, candidate_id))
+
+        matches.sort()
+        return matches if limit is None else matches[:limit]
+
+    @staticmethod
+    def _remove_posting(postings: dict, key, word_id: int) -> None:
+        ids: set[int] = postings[key]
+        ids.discard(word_id)
+        if not ids:
+            del postings[key]
@@ -0,0 +1,84 @@
+import random
+from collections.abc import Container
+from itertools import chain, islice
+
+# Random picks tried before scanning for an ID that is not excluded
+CHOICE_ATTEMPTS = 16
+
+
+class IndexedIdSet:
+    """A set of IDs supporting O(1) insertion, removal and random choice."""
+    __slots__ = ('_ids', '_positions')
+
+    def __init__(self) -> None:
+        self._ids: list[int] = []
+        self._positions: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._positions
+
+    def add(self, item_id: int) -> None:
+        """Adds the ID to the set."""
+        if item_id not in self._positions:
+            self._positions[item_id] = len(self._ids)
+            self._ids.append(item_id)
+
+    def discard(self, item_id: int) -> None:
+        """Removes the ID from the set by swapping it with the last one."""
+        position: int | None = self._positions.pop(item_id, None)
+        if position is None:
+            return
+
+        last_id: int = self._ids.pop()
+        if position < len(self._ids):
+            self._ids[position] = last_id
+            self._positions[last_id] = position
+
+    def choice(self) -> int | None:
+        """Returns a random ID or None if the set is empty."""
+        return random.choice(self._ids) if self._ids else None
+
+    def choice_excluding(self, excluded: Container[int]) -> int | None:
+        """Returns a random ID not in ``excluded`` or None if there is none.
+
+        A few random picks are tried first; when they keep hitting excluded
+        IDs, the IDs are scanned from a random position instead, so the
+        cost stays bounded however few IDs are left.
+        """
+        if not self._ids:
+            return None
+
+        for _ in range(CHOICE_ATTEMPTS):
+            item_id: int = random.choice(self._ids)
+            if item_id not in excluded:
+                return item_id
+
+        start: int = random.randrange(len(self._ids))
+        for item_id in chain(islice(self._ids, start, None),
+                             islice(self._ids, start)):
+            if item_id not in excluded:
+                return item_id
+
+        return None
+
+    def sample(self, count: int, exclude: int) -> list[int]:
+        """Returns up to ``count`` distinct random IDs other than ``exclude``.
+
+        Rejection sampling keeps the cost independent of the set size.
+        """
+        if len(self._ids) <= 2 * (count + 1):
+            candidates = [
+                item_id for item_id in self._ids if item_id != exclude
+            ]
+            return random.sample(candidates, min(count, len(candidates)))
+
+        sample: list[int] = []
+        while len(sample) < count:
+            item_id: int = random.choice(self._ids)
+            if item_id != exclude and item_id not in sample:
+                sample.append(item_id)
+
+        return sample
@@ -0,0 +1,102 @@
+import bisect
+from collections.abc import Iterable, Iterator
+
+
+class PrefixIndex:
+    """Words by their lowercase keys in a sorted array, for prefix search.
+
+    Every key of a word (e.g. the word and its translation) is an entry
+    ``(key, word_id)`` of the array. The entries starting with a prefix are
+    adjacent, so they are found by binary search and read in key order:
+    a page of matches costs O(log n + page size), however many words there
+    are. A word matching the prefix by several keys is listed once, at the
+    first of them, so an entry is also a stable anchor to page from.
+    """
+    __slots__ = ('_entries', '_keys')
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[str, int]] = []
+        self._keys: dict[int, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, word_id: int) -> bool:
+        return word_id in self._keys
+
+    def add(self, word_id: int, keys: Iterable[str]) -> None:
+        """Adds the word under its keys."""
+        for key in self._register(word_id, keys):
+            bisect.insort(self._entries, (key, word_id))
+
+    def extend(self, words: Iterable[tuple[int, Iterable[str]]]) -> None:
+        """Adds many words with their keys, sorting the entries once."""
+        for word_id, keys in words:
+            self._entries.extend(
+                (key, word_id) for key in self._register(word_id, keys)
+            )
+        self._entries.sort()
+
+    def discard(self, word_id: int) -> None:
+        """Removes the word from the index."""
+        for key in self._keys.pop(word_id, ()):
+            position: int = bisect.bisect_left(self._entries, (key, word_id))
+            del self._entries[position]
+
+    def anchor(self, word_id: int, prefix: str) -> tuple[str, int] | None:
+        """Returns the entry the word is listed at for the prefix, if any."""
+        key: str | None = self._first_key(word_id, prefix.lower())
+        return None if key is None else (key, word_id)
+
+    def scan(
+            self,
+            prefix: str,
+            anchor: tuple[str, int] | None = None,
+            reverse: bool = False
+    ) -> Iterator[tuple[str, int]]:
+        """Yields the entries of the words matching the prefix in key order.
+
+        Args:
+            prefix (str): The prefix of the keys.
+            anchor (tuple[str, int] | None): The entry to continue after,
+                or before if ``reverse``; the first (or last) match if None.
+            reverse (bool): Whether to go in descending key order.
+
+        Yields:
+            tuple[str, int]: The key and the ID of a matching word.
+        """
+        prefix = prefix.lower()
+        if reverse:
+            end: int = bisect.bisect_left(
+                self._entries, anchor or (prefix + '\U0010ffff',)
+            )
+            positions: range = range(end - 1, -1, -1)
+        else:
+            positions = range(
+                bisect.bisect_right(self._entries, anchor)
+                if anchor else bisect.bisect_left(self._entries, (prefix,)),
+                len(self._entries)
+            )
+
+        for position in positions:
+            key, word_id = self._entries[position]
+            if not key.startswith(prefix):
+                return
+            if key == self._first_key(word_id, prefix):
+                yield key, word_id
+
+    def _register(self, word_id: int, keys: Iterable[str]) -> tuple[str, ...]:
+        if word_id in self._keys:
+            return ()
+
+        self._keys[word_id] = tuple(sorted(
+            {key.lower() for key in keys if key}
+        ))
+        return self._keys[word_id]
+
+    def _first_key(self, word_id: int, prefix: str) -> str | None:
+        return next(
+            (key for key in self._keys.get(word_id, ())
+             if key.startswith(prefix)),
+            None
+        )
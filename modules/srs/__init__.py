@@ -0,0 +1,19 @@
+from .due_queue import next_review_query
+from .scheduler import (
+    SCHEDULERS,
+    LeitnerScheduler,
+    ReviewState,
+    Scheduler,
+    SM2Scheduler,
+    create_scheduler
+)
+
+__all__ = [
+    'next_review_query',
+    'SCHEDULERS',
+    'LeitnerScheduler',
+    'ReviewState',
+    'Scheduler',
+    'SM2Scheduler',
+    'create_scheduler'
+]
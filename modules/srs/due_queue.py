@@ -0,0 +1,30 @@
+from sqlalchemy import select
+
+from ..db.models import UserWordSetting, Word
+
+
+def next_review_query(user_id: int, category_id: int | None = None):
+    """Builds the query returning the user's card that is due first.
+
+    Hidden cards have no due time, so the query is a range scan of the
+    ``(user_id, due_at)`` index that stops at the first row, independent of
+    the number of cards. With a category, the settings carry the category
+    of their word, so the scan of the ``(user_id, category_id, due_at)``
+    index stops at the first row too.
+    """
+    query = (
+        select(
+            Word.id, Word.word, Word.translation, UserWordSetting.due_at
+        )
+        .join(Word, Word.id == UserWordSetting.word_id)
+        .where(
+            UserWordSetting.user_id == user_id,
+            UserWordSetting.due_at.is_not(None)
+        )
+        .order_by(UserWordSetting.due_at)
+        .limit(1)
+    )
+    if category_id is not None:
+        query = query.where(UserWordSetting.category_id == category_id)
+
+    return query
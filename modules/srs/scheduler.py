@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+SM2_INITIAL_EASE = 2.5
+SM2_MIN_EASE = 1.3
+SM2_CORRECT_QUALITY = 4
+SM2_WRONG_QUALITY = 2
+LEITNER_INTERVALS_DAYS = (1, 3, 7, 14, 30, 60, 120)
+
+
+class ReviewState(NamedTuple):
+    """The scheduling state of a card.
+
+    Attributes:
+        repetitions (int): Consecutive correct answers (the Leitner box).
+        interval_days (float): The current interval between reviews.
+        ease (float): The interval growth factor of the card.
+        due_at (datetime | None): When the card should be reviewed next.
+    """
+    repetitions: int = 0
+    interval_days: float = 0.0
+    ease: float = SM2_INITIAL_EASE
+    due_at: datetime | None = None
+
+
+class Scheduler(ABC):
+    """Base class of the spaced-repetition schedulers.
+
+    A scheduler turns the state of a card and the result of its review into
+    the next state. A wrong answer brings the card back after
+    ``relearn_minutes``; a card whose interval reaches
+    ``learned_interval_days`` is considered learned.
+
+    Args:
+        config (dict): The ``scheduler`` section of chatbot.json.
+    """
+
+    def __init__(self, config: dict) -> None:
+        self.learned_interval_days = float(config['learned_interval_days'])
+        self.relearn_delay = timedelta(
+            minutes=float(config['relearn_minutes'])
+        )
+
+    @abstractmethod
+    def review(
+            self, state: ReviewState, is_correct: bool, now: datetime
+    ) -> ReviewState:
+        """Returns the state of the card after a review."""
+
+    def is_learned(self, state: ReviewState) -> bool:
+        """Checks if the card no longer needs to be reviewed."""
+        return state.interval_days >= self.learned_interval_days
+
+    def relearn(self, ease: float, now: datetime) -> ReviewState:
+        """Returns the state of a forgotten card."""
+        return ReviewState(0, 0.0, ease, now + self.relearn_delay)
+
+
+class SM2Scheduler(Scheduler):
+    """SuperMemo-2 scheduler.
+
+    The intervals are 1 and 6 days and then grow by the card's ease, which
+    drops every time the card is forgotten. A correct answer is graded as
+    quality 4 and a wrong one as quality 2 on the SM-2 scale.
+    """
+
+    def review(
+            self, state: ReviewState, is_correct: bool, now: datetime
+    ) -> ReviewState:
+        quality: int = SM2_CORRECT_QUALITY if is_correct else SM2_WRONG_QUALITY
+        ease: float = max(
+            SM2_MIN_EASE,
+            state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+        )
+
+        if not is_correct:
+            return self.relearn(ease, now)
+
+        if state.repetitions == 0:
+            interval_days: float = 1.0
+        elif state.repetitions == 1:
+            interval_days = 6.0
+        else:
+            interval_days = state.interval_days * ease
+
+        return ReviewState(
+            state.repetitions + 1, interval_days, ease,
+            now + timedelta(days=interval_days)
+        )
+
+
+class LeitnerScheduler(Scheduler):
+    """Leitner box scheduler.
+
+    A correct answer moves the card to the next box with a longer fixed
+    interval, a wrong one moves it back to the first box.
+    """
+
+    def review(
+            self, state: ReviewState, is_correct: bool, now: datetime
+    ) -> ReviewState:
+        if not is_correct:
+            return self.relearn(state.ease, now)
+
+        box: int = min(state.repetitions, len(LEITNER_INTERVALS_DAYS) - 1)
+        interval_days: float = LEITNER_INTERVALS_DAYS[box]
+
+        return ReviewState(
+            state.repetitions + 1, interval_days, state.ease,
+            now + timedelta(days=interval_days)
+        )
+
+
+SCHEDULERS: dict[str, type[Scheduler]] = {
+    'sm2': SM2Scheduler,
+    'leitner': LeitnerScheduler,
+}
+
+
+def create_scheduler(config: dict) -> Scheduler:
+    """Creates the scheduler selected by ``algorithm`` in the config.
+
+    Raises:
+        ValueError: If the algorithm is not registered in SCHEDULERS.
+    """
+    algorithm: str = config['algorithm']
+    if algorithm not in SCHEDULERS:
+        raise ValueError(f'Unknown scheduler: {algorithm}')
+
+    return SCHEDULERS[algorithm](config)
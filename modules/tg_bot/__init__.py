@@ -1,31 +1,32 @@
-from .bot import start_bot
+from .bot import register_handlers, start_bot
 from .bot_config import (
+    APP,
     CHATBOT_COMMANDS,
     CHATBOT_MESSAGE,
     CHATBOT_BTNS,
     CHATBOT_ERRORS,
     CHATBOT_REGEX,
     CHATBOT_DATA,
-    SESSION,
-    DB,
-    TG_TOKEN
+    BOT,
+    WEBHOOK,
+    DB
 )
-from .bot_init import bot
+from .bot_init import get_bot
 from .response_handlers import inform_user_of_word_change
-from .bot import start_bot
 
 __all__ = [
     'start_bot',
+    'register_handlers',
+    'APP',
     'CHATBOT_COMMANDS',
     'CHATBOT_MESSAGE',
     'CHATBOT_BTNS',
     'CHATBOT_ERRORS',
     'CHATBOT_REGEX',
     'CHATBOT_DATA',
-    'SESSION',
+    'BOT',
+    'WEBHOOK',
     'DB',
-    'TG_TOKEN',
-    'bot',
-    'inform_user_of_word_change',
-    'start_bot'
+    'get_bot',
+    'inform_user_of_word_change'
 ]
@@ -0,0 +1,14 @@
+from .bot import register_async_handlers, start_async_bot
+from .bot_init import (
+    get_async_bot, get_async_engine, get_async_session_factory,
+    open_async_session
+)
+
+__all__ = [
+    'start_async_bot',
+    'register_async_handlers',
+    'get_async_bot',
+    'get_async_engine',
+    'get_async_session_factory',
+    'open_async_session'
+]
@@ -0,0 +1,300 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy.orm import Session
+from telebot import types
+from telebot.async_telebot import AsyncTeleBot
+
+from ...db import PoolMetrics, start_pool_reporter
+from ..bot import get_help_text, get_stats_text, log_startup_phases
+from ..bot_config import (
+    BOT, CHATBOT_BTNS, CHATBOT_MESSAGE, METRICS, POOL, WEBHOOK
+)
+from ..db import find_user_id, get_user_id, get_user_stats
+from ..instrumentation import start_metrics
+from ..query_budget import query_budget
+from ..response_handlers import get_word_change_message
+from ..word.word_find import (
+    INLINE_CACHE_TIME,
+    FoundWordsScreen,
+    get_find_prefix,
+    get_inline_answer,
+    load_word_search,
+    load_found_words_screen
+)
+from ..word.word_hidden import (
+    HiddenWordsScreen, load_hidden_words_screen, run_hidden_words_action
+)
+from .bot_init import get_async_bot, get_async_engine, open_async_session
+from .instrumentation import instrument_async_bot_api
+from .outbound import (
+    call_bot_api, get_async_outbound_dispatcher, send_message
+)
+from .quiz import (
+    handle_quiz, show_quiz_categories, validate_and_feedback_user_answer
+)
+from .states import WordStates
+from .ui import menu_btn_commands, show_interaction_menu
+from .webhook import run_async_webhook
+from .word import (
+    ensure_user,
+    handle_add_word,
+    handle_add_word_request,
+    handle_delete_word,
+    handle_delete_word_request
+)
+
+
+@query_budget(1)
+async def start_message(message: types.Message) -> None:
+    """ Start message handler """
+    send_message(
+        message.chat.id, CHATBOT_MESSAGE['start_message']
+    )
+    await show_interaction_menu(
+        message.chat.id,
+        CHATBOT_BTNS,
+        ['test_knowledge', 'quiz_categories', 'add_word', 'delete_word']
+    )
+    await ensure_user(message)
+
+
+@query_budget(7)
+async def handle_callback_query(call: types.CallbackQuery) -> None:
+    """Handles the callback query from the bot."""
+    match call.data.split(':'):
+        case ['test_knowledge' | 'next']:
+            await handle_quiz(call.message)
+        case ['quiz' | 'next', category_id]:
+            await handle_quiz(call.message, int(category_id))
+        case ['quiz_categories']:
+            await show_quiz_categories(call.message)
+        case ['add_word']:
+            await handle_add_word(call.message)
+        case ['delete_word']:
+            await handle_delete_word(call.message)
+        case ['hidden' | 'unhide' as action, *args]:
+            await handle_hidden_words_callback(call, action, *args)
+        case ['find', direction, anchor_id, *prefix]:
+            # The prefix may itself contain colons
+            await handle_find_callback(
+                call, direction, anchor_id, ':'.join(prefix)
+            )
+
+
+@query_budget(1)
+async def help_message(message: types.Message) -> None:
+    """Handles the /help command and sends the user a list of available
+    commands."""
+    await ensure_user(message)
+    send_message(message.chat.id, get_help_text())
+
+
+@query_budget(1)
+async def about_bot_command(message: types.Message) -> None:
+    """Handles the /about command and sends the user information about the
+    bot."""
+    await ensure_user(message)
+    send_message(message.chat.id, CHATBOT_MESSAGE['about'])
+
+
+@query_budget(2)
+async def hidden_words_command(message: types.Message) -> None:
+    """Handles the /hidden_words command and sends the user the first page
+    of their hidden words."""
+    await ensure_user(message)
+    async with open_async_session() as session:
+        screen: HiddenWordsScreen = await session.run_sync(
+            hidden_words_screen_for_user, message
+        )
+
+    send_message(message.chat.id, screen.text, screen.reply_markup)
+
+
+def hidden_words_screen_for_user(
+        session: Session, message: types.Message
+) -> HiddenWordsScreen:
+    """Returns the first page of the hidden words of the message's user."""
+    return load_hidden_words_screen(session, get_user_id(session, message))
+
+
+@query_budget(5)
+async def handle_hidden_words_callback(
+        call: types.CallbackQuery, action: str, *args: str
+) -> None:
+    """Turns the page of the hidden words list or unhides one of its words,
+    editing the list message in place."""
+    async with open_async_session() as session:
+        word, screen = await session.run_sync(
+            hidden_words_callback_for_user, call.message, action, args
+        )
+
+    chat_id: int = call.message.chat.id
+    call_bot_api(
+        chat_id, 'answer_callback_query', callback_query_id=call.id,
+        text=get_word_change_message('unhide', word) if word else None
+    )
+    call_bot_api(
+        chat_id, 'edit_message_text', text=screen.text, chat_id=chat_id,
+        message_id=call.message.message_id, reply_markup=screen.reply_markup
+    )
+
+
+def hidden_words_callback_for_user(
+        session: Session,
+        message: types.Message,
+        action: str,
+        args: tuple[str, ...]
+) -> tuple[str | None, HiddenWordsScreen]:
+    """Runs the hidden words action for the message's user."""
+    return run_hidden_words_action(
+        session, get_user_id(session, message), action, *args
+    )
+
+
+@query_budget(9)
+async def stats_command(message: types.Message) -> None:
+    """Handles the /stats command and sends the user their progress."""
+    async with open_async_session() as session:
+        text: str = await session.run_sync(stats_text_for_user, message)
+
+    send_message(message.chat.id, text)
+
+
+def stats_text_for_user(session: Session, message: types.Message) -> str:
+    """Returns the text describing the progress of the message's user."""
+    user_stats = get_user_stats(session, get_user_id(session, message))
+    return get_stats_text(user_stats, date.today())
+
+
+@query_budget(1)
+async def find_command(message: types.Message) -> None:
+    """Handles the /find command and sends the user the first page of the
+    words and translations starting with the text after the command."""
+    async with open_async_session() as session:
+        user_id: int = await session.run_sync(get_user_id, message)
+
+    screen: FoundWordsScreen = load_found_words_screen(
+        user_id, get_find_prefix(message.text)
+    )
+    send_message(message.chat.id, screen.text, screen.reply_markup)
+
+
+@query_budget(1)
+async def handle_find_callback(
+        call: types.CallbackQuery, direction: str, anchor_id: str, prefix: str
+) -> None:
+    """Turns the page of the found words, editing the message in place."""
+    async with open_async_session() as session:
+        user_id: int = await session.run_sync(get_user_id, call.message)
+
+    screen: FoundWordsScreen = load_found_words_screen(
+        user_id, prefix, int(anchor_id), direction
+    )
+    chat_id: int = call.message.chat.id
+    call_bot_api(chat_id, 'answer_callback_query', callback_query_id=call.id)
+    call_bot_api(
+        chat_id, 'edit_message_text', text=screen.text, chat_id=chat_id,
+        message_id=call.message.message_id, reply_markup=screen.reply_markup
+    )
+
+
+@query_budget(1)
+async def handle_inline_query(query: types.InlineQuery) -> None:
+    """Answers an inline query with the words starting with its text."""
+    async with open_async_session() as session:
+        user_id: int | None = await session.run_sync(
+            find_user_id, query.from_user.id
+        )
+
+    results, next_offset = get_inline_answer(user_id, query)
+    call_bot_api(
+        query.from_user.id, 'answer_inline_query', inline_query_id=query.id,
+        results=results, cache_time=INLINE_CACHE_TIME, is_personal=True,
+        next_offset=next_offset
+    )
+
+
+def register_async_handlers(async_bot: AsyncTeleBot) -> None:
+    """Registers the handlers of the asyncio bot.
+
+    A handler waiting for the user's answer in a state is registered before
+    the commands, so the answer is not mistaken for a command.
+    """
+    async_bot.register_message_handler(
+        handle_quiz, commands=['test_knowledge', 'next']
+    )
+    async_bot.register_message_handler(
+        validate_and_feedback_user_answer, state=WordStates.quiz_answer
+    )
+    async_bot.register_message_handler(
+        handle_add_word, commands=['add_word']
+    )
+    async_bot.register_message_handler(
+        handle_add_word_request,
+        state=WordStates.add_word,
+        content_types=['text', 'document']
+    )
+    async_bot.register_message_handler(
+        handle_delete_word, commands=['delete_word']
+    )
+    async_bot.register_message_handler(
+        handle_delete_word_request, state=WordStates.delete_word
+    )
+    async_bot.register_message_handler(start_message, commands=['start'])
+    async_bot.register_message_handler(help_message, commands=['help'])
+    async_bot.register_message_handler(about_bot_command, commands=['about'])
+    async_bot.register_message_handler(
+        hidden_words_command, commands=['hidden_words']
+    )
+    async_bot.register_message_handler(stats_command, commands=['stats'])
+    async_bot.register_message_handler(find_command, commands=['find'])
+    async_bot.register_message_handler(
+        show_quiz_categories, commands=['categories']
+    )
+    async_bot.register_callback_query_handler(
+        handle_callback_query, func=lambda call: True
+    )
+    async_bot.register_inline_handler(
+        handle_inline_query, func=lambda query: True
+    )
+
+
+async def run_async_bot() -> None:
+    """Runs the asyncio bot until it is stopped.
+
+    Updates are received by long polling or by the webhook endpoint,
+    depending on INGRESS in the BOT section of the config.
+    """
+    async_bot: AsyncTeleBot = get_async_bot()
+    async_engine = get_async_engine()
+    pool_metrics = PoolMetrics(async_engine.sync_engine)
+    instrument_async_bot_api()
+    # Loaded through the sync engine, so before any update is handled
+    load_word_search()
+    start_metrics(
+        METRICS, async_engine.sync_engine, pool_metrics,
+        get_async_outbound_dispatcher()
+    )
+    log_startup_phases()
+    await menu_btn_commands()
+    start_pool_reporter(pool_metrics, float(POOL['report_interval']))
+    try:
+        if BOT['ingress'] == 'webhook':
+            await run_async_webhook(WEBHOOK)
+        else:
+            await async_bot.polling()
+    finally:
+        await get_async_outbound_dispatcher().wait_idle(timeout=5)
+        await async_bot.close_session()
+        await async_engine.dispose()
+
+
+def start_async_bot() -> None:
+    """Starts the asyncio bot.
+
+    All handlers run as coroutines in one event loop; database work is done
+    on the async engine through ``AsyncSession.run_sync``, so the sync query
+    helpers are shared with the threaded bot.
+    """
+    asyncio.run(run_async_bot())
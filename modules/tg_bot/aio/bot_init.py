@@ -0,0 +1,48 @@
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker
+)
+from telebot.asyncio_filters import StateFilter
+from telebot.asyncio_storage import StateMemoryStorage
+
+from ...db.db_session import create_async_session_factory
+from ..bot_config import APP, DB, POOL
+from .instrumentation import InstrumentedAsyncTeleBot
+
+
+def create_async_bot() -> InstrumentedAsyncTeleBot:
+    """Creates the asyncio bot and registers its handlers."""
+    # Imported here because the handler modules use get_async_bot()
+    from .bot import register_async_handlers
+
+    async_bot = InstrumentedAsyncTeleBot(
+        APP.section('TG')['token'], state_storage=StateMemoryStorage()
+    )
+    async_bot.add_custom_filter(StateFilter(async_bot))
+    register_async_handlers(async_bot)
+    return async_bot
+
+
+def get_async_bot() -> InstrumentedAsyncTeleBot:
+    """Returns the asyncio bot, creating it on first use."""
+    return APP.resource('async_bot', create_async_bot)
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Returns the asyncio session factory, creating it on first use."""
+    return _async_database()[0]
+
+
+def open_async_session() -> AsyncSession:
+    """Opens a session of the asyncio session factory."""
+    return get_async_session_factory()()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Returns the async engine, creating it on first use."""
+    return _async_database()[1]
+
+
+def _async_database() -> tuple[async_sessionmaker, AsyncEngine]:
+    return APP.resource(
+        'async_engine', lambda: create_async_session_factory(DB, POOL)
+    )
@@ -0,0 +1,95 @@
+import functools
+import time
+from typing import Awaitable, Callable
+
+from telebot import asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
+
+from ..instrumentation import (
+    HANDLER_ERRORS, HANDLER_LATENCY, observe_api_request
+)
+from ..query_budget import QUERY_BUDGETS
+
+
+def instrument_async_handler(
+        function: Callable[..., Awaitable], kind: str
+) -> Callable[..., Awaitable]:
+    """Wraps a coroutine handler to record its latency, errors and SQL
+    statements.
+
+    Args:
+        function (Callable[..., Awaitable]): The handler.
+        kind (str): The kind of the handler: 'message', 'callback_query'
+            or 'inline_query'.
+
+    Returns:
+        Callable[..., Awaitable]: The wrapper, which keeps the handler's
+            signature so the bot passes it the same arguments.
+    """
+    name: str = function.__name__
+    budget: int | None = getattr(function, 'query_budget', None)
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        started_at: float = time.perf_counter()
+        try:
+            with QUERY_BUDGETS.track(name, budget):
+                return await function(*args, **kwargs)
+        except Exception:
+            HANDLER_ERRORS.inc(name, kind)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(
+                time.perf_counter() - started_at, name, kind
+            )
+
+    return wrapper
+
+
+class InstrumentedAsyncTeleBot(AsyncTeleBot):
+    """AsyncTeleBot recording the latency and errors of every handler."""
+
+    def add_message_handler(self, handler_dict: dict) -> None:
+        handler_dict['function'] = instrument_async_handler(
+            handler_dict['function'], 'message'
+        )
+        super().add_message_handler(handler_dict)
+
+    def add_callback_query_handler(self, handler_dict: dict) -> None:
+        handler_dict['function'] = instrument_async_handler(
+            handler_dict['function'], 'callback_query'
+        )
+        super().add_callback_query_handler(handler_dict)
+
+    def add_inline_handler(self, handler_dict: dict) -> None:
+        handler_dict['function'] = instrument_async_handler(
+            handler_dict['function'], 'inline_query'
+        )
+        super().add_inline_handler(handler_dict)
+
+
+def instrument_async_bot_api() -> None:
+    """Times every request of the asyncio Bot API client.
+
+    Calling this again has no effect.
+    """
+    process_request = asyncio_helper._process_request
+    if getattr(process_request, 'instrumented', False):
+        return
+
+    @functools.wraps(process_request)
+    async def timed_request(token, url, *args, **kwargs):
+        started_at: float = time.perf_counter()
+        error: Exception | None = None
+        try:
+            return await process_request(token, url, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            observe_api_request(
+                url, error, time.perf_counter() - started_at
+            )
+
+    timed_request.instrumented = True
+    asyncio_helper._process_request = timed_request
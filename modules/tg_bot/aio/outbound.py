@@ -0,0 +1,155 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from telebot.asyncio_helper import ApiTelegramException
+
+from ..bot_config import APP, OUTBOUND
+from ..metrics import LatencyStats
+from ..outbound import OutboundQueue, OutgoingMessage, classify_send_error
+from .bot_init import get_async_bot
+
+
+class AsyncOutboundDispatcher:
+    """Central outbound message dispatcher of the asyncio bot.
+
+    Shares the scheduling, rate limiting and coalescing of
+    :class:`OutboundQueue` with the threaded dispatcher; the senders are
+    tasks of the running event loop instead of threads.
+    """
+
+    def __init__(
+            self,
+            send_func: Callable[[OutgoingMessage], Awaitable[Any]],
+            config: dict
+    ) -> None:
+        self.senders = int(config['senders'])
+        self.max_attempts = int(config['max_attempts'])
+        self.queue = OutboundQueue(config)
+        self.send_latency = LatencyStats()
+        self.api_latency = LatencyStats()
+        self.counters: dict[str, int] = dict.fromkeys(
+            ('queued', 'sent', 'rate_limited', 'retried', 'failed'), 0
+        )
+        self._send = send_func
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._in_flight = 0
+
+    def send_message(self, chat_id: int, text: str, reply_markup=None) \
+            -> None:
+        """Queues a message for sending. Must be called in the event loop.
+        """
+        self._start()
+        now: float = time.monotonic()
+        self.queue.put(OutgoingMessage(chat_id, text, reply_markup, now), now)
+        self.counters['queued'] += 1
+        self._wakeup.set()
+
+    def call(self, chat_id: int, method: str, /, **params) -> None:
+        """Queues a Bot API call other than sending a message, made after
+        the messages queued to the chat before it unless it answers a
+        callback or inline query. Must be called in the event loop."""
+        self._start()
+        now: float = time.monotonic()
+        self.queue.put(
+            OutgoingMessage(chat_id, '', None, now, 0, method, params), now
+        )
+        self.counters['queued'] += 1
+        self._wakeup.set()
+
+    async def wait_idle(self, timeout: float | None = None) -> bool:
+        """Waits until all queued messages are sent.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        deadline: float = time.monotonic() + (timeout or float('inf'))
+        while self.queue.depth or self._in_flight:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+
+        return True
+
+    def stats(self) -> dict:
+        """Returns the counters, queue depth and latency summaries."""
+        return {
+            **self.counters,
+            'coalesced': self.queue.coalesced,
+            'queue_depth': self.queue.depth,
+            'send_latency': self.send_latency.snapshot(),
+            'api_latency': self.api_latency.snapshot(),
+        }
+
+    def _start(self) -> None:
+        if self._tasks:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run()) for _ in range(self.senders)
+        ]
+
+    async def _run(self) -> None:
+        while True:
+            item = self.queue.take(time.monotonic())
+            if not isinstance(item, OutgoingMessage):
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), item)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._in_flight += 1
+            started_at: float = time.monotonic()
+            try:
+                await self._send(item)
+                outcome, retry_after = 'sent', None
+            except Exception as e:
+                outcome, retry_after = classify_send_error(
+                    e, item, self.max_attempts, ApiTelegramException
+                )
+            finished_at: float = time.monotonic()
+            self._in_flight -= 1
+
+            self.counters[outcome] += 1
+            self.api_latency.observe(finished_at - started_at)
+            if retry_after is None:
+                self.queue.done(item, finished_at)
+            else:
+                self.queue.retry(item, retry_after, finished_at)
+            if outcome == 'sent':
+                self.send_latency.observe(finished_at - item.enqueued_at)
+            self._wakeup.set()
+
+
+async def send_via_async_bot(message: OutgoingMessage) -> None:
+    """Sends the message or makes the API call with the asyncio bot."""
+    if not message.is_message:
+        await getattr(get_async_bot(), message.method)(**message.params)
+        return
+
+    await get_async_bot().send_message(
+        message.chat_id, message.text, reply_markup=message.reply_markup
+    )
+
+
+def get_async_outbound_dispatcher() -> AsyncOutboundDispatcher:
+    """Returns the outbound dispatcher of the asyncio bot, creating it on
+    first use."""
+    return APP.resource(
+        'async_outbound_dispatcher',
+        lambda: AsyncOutboundDispatcher(send_via_async_bot, OUTBOUND)
+    )
+
+
+def send_message(chat_id: int, text: str, reply_markup=None) -> None:
+    """Queues a message to the chat through the outbound dispatcher."""
+    get_async_outbound_dispatcher().send_message(chat_id, text, reply_markup)
+
+
+def call_bot_api(chat_id: int, method: str, /, **params) -> None:
+    """Queues a Bot API call of the chat through the outbound dispatcher."""
+    get_async_outbound_dispatcher().call(chat_id, method, **params)
@@ -0,0 +1,134 @@
+from sqlalchemy.orm import Session
+from telebot import types
+
+from ..bot_config import CHATBOT_BTNS, CHATBOT_CATEGORIES
+from ..db import get_quiz_categories, get_user_id
+from ..query_budget import query_budget
+from ..quiz.handle_quiz import get_no_words_operation, get_quiz_question_text
+from ..quiz.prefetch import (
+    PrefetchedCard,
+    prefetch_next_card,
+    prepare_card,
+    take_prefetched_card
+)
+from ..quiz.quiz_validator import (
+    CONTINUE_QUESTION,
+    get_feedback_message,
+    get_result_icon,
+    is_answer_correct,
+    record_answer
+)
+from ..response_handlers import get_word_change_message
+from .bot_init import get_async_bot, open_async_session
+from .outbound import send_message
+from .states import WordStates
+from ..ui import (
+    CATEGORY_PICKER_TEXT, create_category_keyboard, get_next_operations
+)
+from .ui import show_interaction_menu
+
+
+@query_budget(7)
+async def handle_quiz(
+        message: types.Message, category_id: int | None = None
+) -> None:
+    """Handles the 'test_knowledge' and 'next' commands.
+
+    Takes the card prefetched after the previous answer or selects one from
+    the category, if given, sends the word's translation with the answer
+    options and waits for the user's answer in the quiz_answer state.
+    """
+    chat_id: int = message.chat.id
+    card: PrefetchedCard | None = take_prefetched_card(chat_id, category_id)
+    if card is None:
+        async with open_async_session() as session:
+            card = await session.run_sync(prepare_quiz, message, category_id)
+
+    if card is None:
+        send_message(
+            chat_id,
+            get_word_change_message(get_no_words_operation(category_id))
+        )
+        return
+
+    send_message(
+        chat_id,
+        get_quiz_question_text(card.quiz_card.translation),
+        reply_markup=card.reply_markup
+    )
+    await get_async_bot().set_state(chat_id, WordStates.quiz_answer, chat_id)
+    await get_async_bot().add_data(
+        chat_id, chat_id,
+        user_word_setting_id=card.user_word_setting_id,
+        word=card.quiz_card.word,
+        translation=card.quiz_card.translation,
+        distractors=card.quiz_card.distractors,
+        category_id=category_id
+    )
+
+
+@query_budget(1)
+async def show_quiz_categories(message: types.Message) -> None:
+    """Handles the /categories command and the 'quiz_categories' button
+    and offers the user the categories of the words to be quizzed on."""
+    async with open_async_session() as session:
+        categories: list[tuple[int, str]] = await session.run_sync(
+            get_quiz_categories
+        )
+
+    send_message(
+        message.chat.id,
+        CATEGORY_PICKER_TEXT,
+        reply_markup=create_category_keyboard(
+            categories, CHATBOT_BTNS, CHATBOT_CATEGORIES
+        )
+    )
+
+
+@query_budget(4)
+async def validate_and_feedback_user_answer(message: types.Message) -> None:
+    """Validates user's response and provides feedback based on its accuracy.
+    """
+    chat_id: int = message.chat.id
+    async with get_async_bot().retrieve_data(chat_id, chat_id) as data:
+        quiz: dict = dict(data)
+    await get_async_bot().delete_state(chat_id, chat_id)
+
+    correct_answer: str = quiz['word']
+    is_correct: bool = is_answer_correct(
+        message.text, correct_answer, quiz.get('distractors', [])
+    )
+
+    send_message(chat_id, get_result_icon(is_correct))
+    send_message(
+        chat_id,
+        get_feedback_message(is_correct, correct_answer, quiz['translation'])
+    )
+
+    async with open_async_session() as session:
+        is_learned: bool = await session.run_sync(
+            record_answer, quiz['user_word_setting_id'], is_correct
+        )
+    prefetch_next_card(chat_id, quiz.get('category_id'))
+    if is_learned:
+        send_message(
+            chat_id, get_word_change_message('learned_word', correct_answer)
+        )
+
+    send_message(
+        chat_id, CONTINUE_QUESTION, reply_markup=types.ReplyKeyboardRemove()
+    )
+    await show_interaction_menu(
+        chat_id, CHATBOT_BTNS, get_next_operations(quiz.get('category_id'))
+    )
+
+
+def prepare_quiz(
+        session: Session,
+        message: types.Message,
+        category_id: int | None = None
+) -> PrefetchedCard | None:
+    """Resolves the user and prepares a quiz card for them."""
+    return prepare_card(
+        session, get_user_id(session, message), category_id
+    )
@@ -0,0 +1,12 @@
+from telebot.asyncio_handler_backends import State, StatesGroup
+
+
+class WordStates(StatesGroup):
+    """Conversation states replacing the sync next step handlers.
+
+    The states are keyed by the chat ID, so callback queries (whose message
+    is sent by the bot) and the user's replies share the same state.
+    """
+    quiz_answer = State()
+    add_word = State()
+    delete_word = State()
@@ -0,0 +1,29 @@
+from ..ui.drop_down_menu import convert_json_to_list
+from ..ui.nav_menu import INTERACTION_MENU_TEXT, create_interaction_keyboard
+from .bot_init import get_async_bot
+from .outbound import send_message
+
+NEXT_OPERATIONS: list[str] = ['next', 'add_word', 'delete_word']
+
+
+async def show_interaction_menu(
+        chat_id: int,
+        button_labels: dict[str, str],
+        operations: list[str]
+) -> None:
+    """Shows an interaction menu with buttons.
+
+    Args:
+        chat_id (int): The ID of the chat to send the menu to.
+        button_labels (dict[str, str]): A dictionary of button labels.
+        operations (list[str]): A list of button operations.
+    """
+    keyboard = create_interaction_keyboard(button_labels, operations)
+    send_message(
+        chat_id, INTERACTION_MENU_TEXT, reply_markup=keyboard
+    )
+
+
+async def menu_btn_commands() -> None:
+    """Sets the bot's menu buttons"""
+    await get_async_bot().set_my_commands(convert_json_to_list())
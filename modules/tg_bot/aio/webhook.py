@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+
+from aiohttp import web
+from telebot import types
+
+from ..webhook import MAX_BODY_BYTES, SECRET_TOKEN_HEADER, WebhookIngress
+from .bot_init import get_async_bot
+from .outbound import get_async_outbound_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWebhookServer(WebhookIngress):
+    """Webhook endpoint of the asyncio bot built on aiohttp.
+
+    Works like the threaded WebhookServer: updates are spread over bounded
+    per-worker queues by chat ID and a full queue is answered with 503.
+    """
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.host: str = config['host']
+        self.port: int = int(config['port'])
+        self.queues: list[asyncio.Queue] = []
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Accepts an update request."""
+        started_at: float = time.perf_counter()
+        try:
+            return await self._receive(request)
+        finally:
+            self.request_latency.observe(time.perf_counter() - started_at)
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Returns the ingress and outbound counters and latencies as JSON."""
+        return web.json_response({
+            **self.stats(self.queue_depths()),
+            'outbound': get_async_outbound_dispatcher().stats(),
+        })
+
+    def queue_depths(self) -> list[int]:
+        """Returns the number of waiting updates per worker."""
+        return [worker_queue.qsize() for worker_queue in self.queues]
+
+    async def serve(self) -> None:
+        """Starts the workers and serves HTTP requests until cancelled."""
+        self.queues = [
+            asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)
+        ]
+        workers = [
+            asyncio.create_task(self._work(worker_queue))
+            for worker_queue in self.queues
+        ]
+        app = web.Application(client_max_size=MAX_BODY_BYTES)
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get(self.stats_path, self.handle_stats)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        logger.info('Webhook server listening on %s:%s%s',
+                    self.host, self.port, self.path)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await runner.cleanup()
+
+    async def _receive(self, request: web.Request) -> web.Response:
+        if not self.is_authorized(request.headers.get(SECRET_TOKEN_HEADER)):
+            self.count('unauthorized')
+            return web.Response(status=403)
+
+        update_json: dict | None = self.parse_update(await request.read())
+        if update_json is None:
+            self.count('malformed')
+            return web.Response(status=400)
+
+        try:
+            self.queues[self.shard_of(update_json)].put_nowait(
+                (update_json, time.perf_counter())
+            )
+        except asyncio.QueueFull:
+            self.count('rejected')
+            return web.Response(status=503, headers={'Retry-After': '1'})
+
+        self.count('accepted')
+        return web.Response(status=200)
+
+    async def _work(self, worker_queue: asyncio.Queue) -> None:
+        while True:
+            update_json, received_at = await worker_queue.get()
+            try:
+                update = types.Update.de_json(update_json)
+                await get_async_bot().process_new_updates([update])
+                self.count('processed')
+            except Exception:
+                self.count('failed')
+                logger.exception('Failed to process update %s',
+                                 update_json.get('update_id'))
+            finally:
+                self.processing_latency.observe(
+                    time.perf_counter() - received_at
+                )
+                worker_queue.task_done()
+
+
+async def run_async_webhook(config: dict) -> None:
+    """Registers the webhook with Telegram and serves updates.
+
+    Args:
+        config (dict): The WEBHOOK section of the config.
+    """
+    server = AsyncWebhookServer(config)
+
+    if config['url']:
+        await get_async_bot().remove_webhook()
+        await get_async_bot().set_webhook(
+            url=config['url'],
+            secret_token=config['secret_token'],
+            max_connections=int(config['max_connections'])
+        )
+
+    await server.serve()
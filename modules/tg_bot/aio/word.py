@@ -0,0 +1,206 @@
+from sqlalchemy.orm import Session
+from telebot import types
+
+from ..bot_config import (
+    CHATBOT_BTNS, CHATBOT_ERRORS, CHATBOT_MESSAGE, CHATBOT_REGEX
+)
+from ..cache import get_user_id_cache
+from ..db import find_similar_words, get_user_id, register_user
+from ..query_budget import query_budget
+from ..response_handlers import get_word_change_message
+from ..word.input_validation import split_user_input
+from ..word.word_add import add_user_word, add_user_words
+from ..word.word_bulk import (
+    MAX_WORD_LINES,
+    WordLine,
+    check_word_list_document,
+    decode_word_list,
+    format_add_report,
+    is_word_list,
+    parse_word_lines
+)
+from ..word.word_del import delete_or_hide_word, get_word_not_found_text
+from ..word.word_format import check_word_format
+from .bot_init import get_async_bot, open_async_session
+from .outbound import send_message
+from .states import WordStates
+from .ui import NEXT_OPERATIONS, show_interaction_menu
+
+
+@query_budget(1)
+async def handle_add_word(user_message: types.Message) -> None:
+    """Handles the command to add a word.
+
+    Sends the prompt to add a user word and waits for the word in the
+    add_word state.
+    """
+    await ensure_user(user_message)
+    chat_id: int = user_message.chat.id
+    send_message(chat_id, CHATBOT_MESSAGE['add_user_word'])
+    await get_async_bot().set_state(chat_id, WordStates.add_word, chat_id)
+
+
+@query_budget(7)
+async def handle_add_word_request(user_message: types.Message) -> None:
+    """Handles the request to add a new word to the user's word list.
+
+    A text of several lines or an uploaded document is added as a word
+    list.
+    """
+    chat_id: int = user_message.chat.id
+    await get_async_bot().delete_state(chat_id, chat_id)
+
+    if is_word_list(user_message):
+        await handle_add_words_request(user_message)
+        return
+
+    user_input_parts: list = split_user_input(user_message)
+    if len(user_input_parts) != 2:
+        send_message(
+            chat_id, get_word_change_message('add_word_value')
+        )
+        return
+
+    word, translation = (part.strip().title() for part in user_input_parts)
+    if not word or not translation:
+        return
+
+    if not check_word_format(
+            CHATBOT_REGEX['eng'], CHATBOT_REGEX['rus'], word, translation
+    ):
+        send_message(
+            chat_id, get_word_change_message('add_word_value')
+        )
+        return
+
+    async with open_async_session() as session:
+        is_added: bool = await session.run_sync(
+            add_word_for_user, user_message, word, translation
+        )
+
+    if is_added:
+        send_message(
+            chat_id, get_word_change_message('add', word)
+        )
+    await show_interaction_menu(chat_id, CHATBOT_BTNS, NEXT_OPERATIONS)
+
+
+async def handle_add_words_request(user_message: types.Message) -> None:
+    """Adds a word list to the user's word list and reports every line."""
+    chat_id: int = user_message.chat.id
+    text: str | None = await read_word_list(user_message)
+    if text is None:
+        return
+
+    lines: list[WordLine] = parse_word_lines(text)
+    if not lines or len(lines) > MAX_WORD_LINES:
+        send_message(chat_id, CHATBOT_ERRORS['word_list_value'])
+        return
+
+    async with open_async_session() as session:
+        lines = await session.run_sync(add_words_for_user, user_message, lines)
+
+    for report in format_add_report(lines):
+        send_message(chat_id, report)
+    await show_interaction_menu(chat_id, CHATBOT_BTNS, NEXT_OPERATIONS)
+
+
+async def read_word_list(user_message: types.Message) -> str | None:
+    """Returns the text of the word list, downloading an uploaded document.
+
+    Returns:
+        str | None: The word list, or None if the document cannot be read;
+            the user is told why.
+    """
+    if user_message.content_type != 'document':
+        return user_message.text
+
+    error: str | None = check_word_list_document(user_message.document)
+    if error is not None:
+        send_message(user_message.chat.id, CHATBOT_ERRORS[error])
+        return None
+
+    async_bot = get_async_bot()
+    file_info: types.File = await async_bot.get_file(
+        user_message.document.file_id
+    )
+    return decode_word_list(await async_bot.download_file(file_info.file_path))
+
+
+@query_budget(1)
+async def handle_delete_word(user_message: types.Message) -> None:
+    """Handles the command to delete a word from the user's word list.
+
+    Sends the prompt to delete a word and waits for the word in the
+    delete_word state.
+    """
+    await ensure_user(user_message)
+    chat_id: int = user_message.chat.id
+    send_message(chat_id, CHATBOT_MESSAGE['delete_user_word'])
+    await get_async_bot().set_state(chat_id, WordStates.delete_word, chat_id)
+
+
+@query_budget(10)
+async def handle_delete_word_request(user_message: types.Message) -> None:
+    """Handles the request to delete a word from the user's word list.
+
+    If there is no such word, the user's words spelt similarly are
+    suggested.
+    """
+    chat_id: int = user_message.chat.id
+    await get_async_bot().delete_state(chat_id, chat_id)
+
+    async with open_async_session() as session:
+        operation, word, suggestions = await session.run_sync(
+            delete_word_for_user, user_message, user_message.text.title()
+        )
+
+    if operation == 'word_not_found':
+        send_message(chat_id, get_word_not_found_text(suggestions))
+    else:
+        send_message(
+            chat_id, get_word_change_message(operation, word)
+        )
+    await show_interaction_menu(chat_id, CHATBOT_BTNS, NEXT_OPERATIONS)
+
+
+async def ensure_user(message: types.Message) -> None:
+    """Adds the user to the database unless they are already known."""
+    if get_user_id_cache().get(message.chat.id) is not None:
+        return
+
+    async with open_async_session() as session:
+        await session.run_sync(register_user, message)
+
+
+def add_word_for_user(
+        session: Session, message: types.Message, word: str, translation: str
+) -> bool:
+    """Adds the word to the word list of the message's user."""
+    user_id: int = get_user_id(session, message)
+    return add_user_word(session, user_id, word, translation)
+
+
+def add_words_for_user(
+        session: Session, message: types.Message, lines: list[WordLine]
+) -> list[WordLine]:
+    """Adds the word list to the word list of the message's user."""
+    user_id: int = get_user_id(session, message)
+    return add_user_words(session, user_id, lines)
+
+
+def delete_word_for_user(
+        session: Session, message: types.Message, word: str
+) -> tuple[str, str, list[str]]:
+    """Deletes or hides the word for the message's user.
+
+    Returns:
+        tuple[str, str, list[str]]: The performed operation, the affected
+            word and, if the word was not found, the suggested words.
+    """
+    user_id: int = get_user_id(session, message)
+    operation, word = delete_or_hide_word(session, user_id, word)
+    if operation != 'word_not_found':
+        return operation, word, []
+
+    return operation, word, find_similar_words(session, user_id, word)
@@ -0,0 +1,150 @@
+import configparser
+import contextlib
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from typing import Any, Callable
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import sessionmaker
+
+from ..db.db_session import POOL_DEFAULTS, create_session_factory
+from ..db.pool_metrics import PoolMetrics
+from ..fs_tools.read_config import read_section
+from ..fs_tools.read_file import read_file
+
+
+class AppContext:
+    """Configuration and shared resources of the bot, created on first use.
+
+    Importing the bot's modules only creates the context. The config file is
+    parsed on the first access to a section, the message catalog is loaded
+    on the first access to a message, and the engine, the bots and other
+    resources are created when they are first needed. The duration of every
+    initialisation phase is recorded in ``phases``.
+
+    Attributes:
+        config_path (str): The path to settings.ini.
+        data_path (str): The path to chatbot.json.
+        phases (dict[str, float]): Initialisation phases and their duration
+            in seconds, in the order they ran.
+        phase_notes (dict[str, str]): Short descriptions of the outcome of
+            some phases, e.g. what they skipped.
+    """
+
+    def __init__(self, config_path: str, data_path: str) -> None:
+        self.config_path = config_path
+        self.data_path = data_path
+        self.phases: dict[str, float] = {}
+        self.phase_notes: dict[str, str] = {}
+        self._resources: dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Records the duration of an initialisation phase."""
+        started_at: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started_at
+
+    def note_phase(self, name: str, note: str) -> None:
+        """Describes the outcome of a phase in the startup report."""
+        self.phase_notes[name] = note
+
+    def resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Returns the named resource, creating it on first use.
+
+        The resource is created once even if several threads ask for it at
+        the same time; its creation is recorded as a phase.
+        """
+        try:
+            return self._resources[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._resources:
+                with self.phase(name):
+                    self._resources[name] = factory()
+            return self._resources[name]
+
+    @property
+    def config(self) -> configparser.ConfigParser:
+        """The parsed settings.ini."""
+        def parse() -> configparser.ConfigParser:
+            config = configparser.ConfigParser()
+            config.read(self.config_path)
+            return config
+
+        return self.resource('config', parse)
+
+    def section(
+            self, name: str, defaults: dict[str, str] | None = None
+    ) -> dict[str, str]:
+        """Reads a section of settings.ini, see ``read_config``."""
+        return read_section(self.config, name, defaults)
+
+    @property
+    def chatbot_data(self) -> dict:
+        """The messages, buttons and other data of chatbot.json."""
+        return self.resource('chatbot_data', lambda: read_file(self.data_path))
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        """The session factory bound to the engine."""
+        return self._database[0]
+
+    @property
+    def engine(self) -> Engine:
+        """The one engine shared by the bot and the database bootstrap."""
+        return self._database[1]
+
+    @property
+    def pool_metrics(self) -> PoolMetrics:
+        """The connection pool counters of the engine."""
+        return self.resource('pool_metrics', lambda: PoolMetrics(self.engine))
+
+    def release_database(self) -> None:
+        """Closes the pooled connections of the engine, if it was created,
+        e.g. once the process leaves the database to other processes."""
+        database: tuple[sessionmaker, Engine] | None = \
+            self._resources.get('engine')
+        if database is not None:
+            database[1].dispose()
+
+    @property
+    def _database(self) -> tuple[sessionmaker, Engine]:
+        return self.resource('engine', lambda: create_session_factory(
+            self.section('DB'), self.section('POOL', POOL_DEFAULTS)
+        ))
+
+
+class LazyMapping(Mapping):
+    """A read-only mapping loaded on first access.
+
+    Lets modules import config sections and message catalogs by name
+    without reading any file at import time.
+    """
+
+    def __init__(self, load: Callable[[], Mapping]) -> None:
+        self._load = load
+        self._loaded: Mapping | None = None
+
+    def _data(self) -> Mapping:
+        if self._loaded is None:
+            self._loaded = self._load()
+        return self._loaded
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data()[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({dict(self._data())!r})'
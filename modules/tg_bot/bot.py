@@ -1,42 +1,88 @@
+import logging
+from datetime import date, timedelta
+
+import telebot
 from telebot import types
 
-from .bot_config import CHATBOT_BTNS, CHATBOT_COMMANDS, CHATBOT_MESSAGE, SESSION
-from .bot_init import bot
+from ..db import UserStats, start_pool_reporter
+from .bot_config import (
+    APP, BOT, CHATBOT_BTNS, CHATBOT_COMMANDS, CHATBOT_MESSAGE, CLUSTER,
+    METRICS, POOL, WEBHOOK
+)
+from .bot_init import get_bot
+from .cluster import start_cluster
 from .db import (
-    get_all_user_words, get_hidden_word_settings, get_user_id,
-    handle_new_user
+    get_all_user_words, get_user_id, get_user_stats, handle_new_user
+)
+from .instrumentation import instrument_bot_api, start_metrics
+from .outbound import get_outbound_dispatcher, send_message
+from .query_budget import query_budget
+from .quiz import (
+    handle_quiz, show_quiz_categories, validate_and_feedback_user_answer
 )
-from .quiz import handle_quiz
 from .ui import menu_btn_commands, show_interaction_menu
-from .word import handle_add_word, handle_delete_word
+from .webhook import start_webhook
+from .word import (
+    find_command,
+    load_word_search,
+    handle_add_word,
+    handle_add_word_request,
+    handle_delete_word,
+    handle_delete_word_request,
+    handle_find_callback,
+    handle_hidden_words_callback,
+    handle_inline_query,
+    hidden_words_command
+)
+
+logger = logging.getLogger(__name__)
+
+# Functions that handle the user's next message after a prompt. Pending steps
+# are stored by name, so only these can be scheduled
+CONVERSATION_STEPS = (
+    validate_and_feedback_user_answer,
+    handle_add_word_request,
+    handle_delete_word_request
+)
 
 
-@bot.message_handler(commands=['start'])
+@query_budget(1)
 def start_message(message: types.Message) -> None:
     """ Start message handler """
-    bot.send_message(message.chat.id, CHATBOT_MESSAGE['start_message'])
+    send_message(message.chat.id, CHATBOT_MESSAGE['start_message'])
     show_interaction_menu(
         message,
         CHATBOT_BTNS,
-        ['test_knowledge', 'add_word', 'delete_word']
+        ['test_knowledge', 'quiz_categories', 'add_word', 'delete_word']
         )
 
     handle_new_user(message)
 
 
-@bot.callback_query_handler(func=lambda call: True)
+@query_budget(7)
 def handle_callback_query(call: types.CallbackQuery) -> None:
     """Handles the callback query from the bot."""
-    match call.data:
-        case 'test_knowledge' | 'next':
+    match call.data.split(':'):
+        case ['test_knowledge' | 'next']:
             handle_quiz(call.message)
-        case 'add_word':
+        case ['quiz' | 'next', category_id]:
+            handle_quiz(call.message, int(category_id))
+        case ['quiz_categories']:
+            show_quiz_categories(call.message)
+        case ['add_word']:
             handle_add_word(call.message)
-        case 'delete_word':
+        case ['delete_word']:
             handle_delete_word(call.message)
+        case ['hidden' | 'unhide' as action, *args]:
+            handle_hidden_words_callback(call, action, *args)
+        case ['find', direction, anchor_id, *prefix]:
+            # The prefix may itself contain colons
+            handle_find_callback(
+                call, direction, anchor_id, ':'.join(prefix)
+            )
 
 
-@bot.message_handler(commands=['help'])
+@query_budget(1)
 def help_message(message: types.Message) -> None:
     """Handles the /help command and sends the user a list of available commands
 
@@ -47,9 +93,14 @@ def help_message(message: types.Message) -> None:
         None
     """
     handle_new_user(message)
+    send_message(message.chat.id, get_help_text())
+
+
+def get_help_text() -> str:
+    """Returns the text listing all available bot commands."""
     commands_list = get_all_bot_commands()
     commands = convert_command_list_to_text(commands_list)
-    bot.send_message(message.chat.id, "Доступные команды:\n" + commands)
+    return "Доступные команды:\n" + commands
 
 
 def get_all_bot_commands() -> list:
@@ -65,7 +116,7 @@ def convert_command_list_to_text(commands: list) -> str:
     return '\n'.join(commands)
 
 
-@bot.message_handler(commands=['about'])
+@query_budget(1)
 def about_bot_command(message: types.Message) -> None:
     """Handles the /about command and sends the user information about the bot.
 
@@ -76,37 +127,132 @@ def about_bot_command(message: types.Message) -> None:
         None
     """
     handle_new_user(message)
-    bot.send_message(message.chat.id, CHATBOT_MESSAGE['about'])
+    send_message(message.chat.id, CHATBOT_MESSAGE['about'])
 
 
-@bot.message_handler(commands=['hidden_words'])
-def hidden_words_command(message: types.Message) -> None:
-    """Handles the /hidden_words command and sends the user a list of hidden
-    words."""
-    handle_new_user(message)
-    with SESSION as session:
-        user_id: int = get_user_id(session, message)
-        user_words = get_hidden_word_settings(session, user_id)
-        msg_title = 'Все ваши скрытые слова:\n'
-        msg_body = ''.join([
-            f'\n🇺🇸 {word.word.word} - 🇷🇺 {word.word.translation}'
-            for word in user_words
-        ])
+@query_budget(9)
+def stats_command(message: types.Message) -> None:
+    """Handles the /stats command and sends the user their progress.
+
+    The progress is read from the user's aggregates, which are kept up to
+    date by the quiz and the word changes.
+    """
+    with APP.session_factory() as session:
+        user_stats: UserStats = get_user_stats(
+            session, get_user_id(session, message)
+        )
+        text: str = get_stats_text(user_stats, date.today())
+
+    send_message(message.chat.id, text)
+
+
+def get_stats_text(user_stats: UserStats, today: date) -> str:
+    """Returns the text describing the user's progress.
+
+    The streak is over if the user has not answered today or yesterday.
+    """
+    last_answer_on: date | None = user_stats.last_answer_on
+    streak_days: int = user_stats.streak_days if (
+        last_answer_on is not None
+        and today - last_answer_on <= timedelta(days=1)
+    ) else 0
+    answers_today: int = (
+        user_stats.answers_today if last_answer_on == today else 0
+    )
+    accuracy: str = (
+        f'{user_stats.correct_answers / user_stats.answers:.0%}'
+        if user_stats.answers else '-'
+    )
+    answers_per_day: float = (
+        user_stats.answers / user_stats.active_days
+        if user_stats.active_days else 0
+    )
 
-        if not msg_body:
-            msg_title = 'Скрытых слов нет'
+    return (
+        'Ваш прогресс:\n'
+        f'\n🎓 Выучено слов: {user_stats.words_learned}'
+        f'\n📖 Слов в изучении: {user_stats.words_in_progress}'
+        f'\n➕ Добавлено своих слов: {user_stats.words_added}'
+        f'\n🎯 Правильных ответов: {accuracy} '
+        f'({user_stats.correct_answers} из {user_stats.answers})'
+        f'\n🔥 Дней подряд: {streak_days}'
+        f'\n📅 Ответов сегодня: {answers_today}, '
+        f'в среднем за день: {answers_per_day:.1f}'
+    )
 
-        bot.send_message(message.chat.id, msg_title + msg_body)
+
+def register_handlers(bot: telebot.TeleBot) -> None:
+    """Registers the command, callback query and inline query handlers of
+    the threaded bot."""
+    bot.register_message_handler(
+        handle_quiz, commands=['test_knowledge', 'next']
+    )
+    bot.register_message_handler(handle_add_word, commands=['add_word'])
+    bot.register_message_handler(
+        handle_delete_word, commands=['delete_word']
+    )
+    bot.register_message_handler(start_message, commands=['start'])
+    bot.register_message_handler(help_message, commands=['help'])
+    bot.register_message_handler(about_bot_command, commands=['about'])
+    bot.register_message_handler(
+        hidden_words_command, commands=['hidden_words']
+    )
+    bot.register_message_handler(stats_command, commands=['stats'])
+    bot.register_message_handler(find_command, commands=['find'])
+    bot.register_message_handler(
+        show_quiz_categories, commands=['categories']
+    )
+    bot.register_callback_query_handler(
+        handle_callback_query, func=lambda call: True
+    )
+    bot.register_inline_handler(handle_inline_query, func=lambda query: True)
+
+
+def log_startup_phases() -> None:
+    """Logs how long each initialisation phase took and what it did, if
+    noted."""
+    logger.info('Startup phases: %s', ', '.join(
+        f'{name} {seconds * 1000:.1f} ms'
+        + (f' ({APP.phase_notes[name]})' if name in APP.phase_notes else '')
+        for name, seconds in APP.phases.items()
+    ))
 
 
 def start_bot() -> None:
     """Starts the bot's polling process.
 
     This function initiates the bot's main loop, where it continuously checks
-    for incoming updates and messages.
+    for incoming updates and messages. The asyncio bot is started instead
+    when MODE in the BOT section of the config is 'async', and updates are
+    received by the webhook endpoint when INGRESS is 'webhook'. With more
+    than one PROCESSES in the CLUSTER section, this process only receives
+    the updates and hands them to worker processes. Handler, Bot API and
+    query metrics are served as configured in METRICS.
 
     Returns:
         None
     """
+    if BOT['mode'] == 'async':
+        # Imported here so the sync mode does not need the asyncio drivers
+        from .aio import start_async_bot
+        start_async_bot()
+        return
+
+    instrument_bot_api()
+    if int(CLUSTER['processes']) > 1:
+        start_cluster(CLUSTER)
+        return
+
+    start_metrics(
+        METRICS, APP.engine, APP.pool_metrics, get_outbound_dispatcher()
+    )
+    bot: telebot.TeleBot = get_bot()
+    load_word_search()
+    log_startup_phases()
     menu_btn_commands()
-    bot.polling()
+    start_pool_reporter(APP.pool_metrics, float(POOL['report_interval']))
+
+    if BOT['ingress'] == 'webhook':
+        start_webhook(bot, WEBHOOK)
+    else:
+        bot.polling()
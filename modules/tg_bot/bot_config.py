@@ -1,17 +1,88 @@
-from ..db.db_session import create_db_session
+from ..db.db_session import POOL_DEFAULTS
 from ..fs_tools.path_utils import get_absolute_path
-from ..fs_tools.read_file import read_file
-from ..fs_tools.read_config import read_config
+from .app_context import AppContext, LazyMapping
 
 path_to_config: str = get_absolute_path(['settings.ini'])
 path_to_json: str = get_absolute_path(['data', 'chatbot.json'])
 
-TG_TOKEN = read_config(path_to_config, 'TG')['token']
-DB = read_config(path_to_config, 'DB')
-CHATBOT_DATA = read_file(path_to_json)
-CHATBOT_MESSAGE = CHATBOT_DATA['messages']
-CHATBOT_BTNS = CHATBOT_DATA['buttons']
-CHATBOT_ERRORS = CHATBOT_DATA['error']
-CHATBOT_REGEX = CHATBOT_DATA['regex_patterns']
-CHATBOT_COMMANDS = CHATBOT_DATA['commands']
-SESSION = create_db_session(DB)[0]
+# Nothing is read here: the sections and catalogs below are loaded on first
+# access, the engine and the bots are created by APP when first needed
+APP = AppContext(path_to_config, path_to_json)
+
+
+def config_section(name: str, defaults: dict[str, str] | None = None) \
+        -> LazyMapping:
+    """Returns a section of settings.ini loaded on first access."""
+    return LazyMapping(lambda: APP.section(name, defaults))
+
+
+def catalog(name: str) -> LazyMapping:
+    """Returns a part of chatbot.json loaded on first access."""
+    return LazyMapping(lambda: APP.chatbot_data[name])
+
+
+DB = config_section('DB')
+BOT = config_section('BOT', {
+    'mode': 'sync',
+    'ingress': 'polling',
+})
+WEBHOOK = config_section('WEBHOOK', {
+    'host': '127.0.0.1',
+    'port': '8080',
+    'path': '/webhook',
+    'stats_path': '/webhook/stats',
+    'url': '',
+    'secret_token': '',
+    'queue_size': '1000',
+    'workers': '4',
+    'max_connections': '40',
+})
+POOL = config_section('POOL', POOL_DEFAULTS)
+CACHE = config_section('CACHE', {
+    'vocabulary_max_bytes': str(64 * 1024 * 1024),
+    'vocabulary_max_entry_bytes': str(4 * 1024 * 1024),
+    'user_ids_max_entries': '100000',
+    'exhausted_users_max_entries': '100000',
+})
+OUTBOUND = config_section('OUTBOUND', {
+    'chat_rate': '1',
+    'global_rate': '30',
+    'senders': '4',
+    'linger': '0.05',
+    'max_attempts': '3',
+})
+METRICS = config_section('METRICS', {
+    'host': '127.0.0.1',
+    'port': '9464',
+    'slow_query_ms': '200',
+})
+CONVERSATION = config_section('CONVERSATION', {
+    'backend': 'memory',
+    'ttl': str(24 * 60 * 60),
+    'max_entries': '100000',
+    'path': get_absolute_path(['conversations.db']),
+})
+CLUSTER = config_section('CLUSTER', {
+    'processes': '1',
+    'queue_size': '1000',
+    'restart_delay': '1',
+    'report_interval': '60',
+})
+PREFETCH = config_section('PREFETCH', {
+    'workers': '2',
+    'max_age': '300',
+    'max_users': '10000',
+})
+FUZZY = config_section('FUZZY', {
+    'max_distance': '2',
+    'suggestions': '3',
+    'answer_max_distance': '0',
+    'backend': 'memory',
+})
+CHATBOT_DATA = LazyMapping(lambda: APP.chatbot_data)
+CHATBOT_MESSAGE = catalog('messages')
+CHATBOT_BTNS = catalog('buttons')
+CHATBOT_ERRORS = catalog('error')
+CHATBOT_REGEX = catalog('regex_patterns')
+CHATBOT_COMMANDS = catalog('commands')
+CHATBOT_CATEGORIES = catalog('categories')
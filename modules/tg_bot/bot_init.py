@@ -1,4 +1,37 @@
-import telebot
-from .bot_config import TG_TOKEN
+from .bot_config import APP, CONVERSATION
+from .conversation import (
+    ConversationHandlerBackend, ConversationStore, create_conversation_store
+)
+from .instrumentation import InstrumentedTeleBot, instrument_handler
 
-bot = telebot.TeleBot(TG_TOKEN)
+
+def create_bot() -> InstrumentedTeleBot:
+    """Creates the threaded bot and registers its handlers.
+
+    Pending next steps are kept as compact records in the conversation
+    store configured in the CONVERSATION section.
+    """
+    # Imported here because the handler modules use get_bot()
+    from .bot import CONVERSATION_STEPS, register_handlers
+
+    backend = ConversationHandlerBackend(get_conversation_store(), {
+        step.__name__: instrument_handler(step, 'next_step')
+        for step in CONVERSATION_STEPS
+    })
+    bot = InstrumentedTeleBot(
+        APP.section('TG')['token'], next_step_backend=backend
+    )
+    register_handlers(bot)
+    return bot
+
+
+def get_bot() -> InstrumentedTeleBot:
+    """Returns the threaded bot, creating it on first use."""
+    return APP.resource('bot', create_bot)
+
+
+def get_conversation_store() -> ConversationStore:
+    """Returns the conversation store, creating it on first use."""
+    return APP.resource(
+        'conversations', lambda: create_conversation_store(CONVERSATION)
+    )
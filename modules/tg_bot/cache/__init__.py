@@ -0,0 +1,23 @@
+from .exhausted import get_exhausted_users_cache
+from .lru import LRUCache
+from .users import get_user_id_cache
+from .vocabulary import (
+    BaseVocabulary, UserVocabulary, VocabularyCache, get_vocabulary_cache
+)
+from .word_search import (
+    FoundWord, WordSearch, WordSearchPage, get_word_search
+)
+
+__all__ = [
+    'BaseVocabulary',
+    'LRUCache',
+    'get_exhausted_users_cache',
+    'UserVocabulary',
+    'VocabularyCache',
+    'get_user_id_cache',
+    'get_vocabulary_cache',
+    'FoundWord',
+    'WordSearch',
+    'WordSearchPage',
+    'get_word_search'
+]
@@ -0,0 +1,27 @@
+from ..bot_config import APP, CACHE
+from .lru import LRUCache
+from .vocabulary import get_vocabulary_cache
+
+
+def create_exhausted_users_cache() -> LRUCache:
+    """Creates the cache of exhausted users and subscribes it to the changes
+    of the users' words."""
+    cache = LRUCache(max_entries=int(CACHE['exhausted_users_max_entries']))
+    get_vocabulary_cache().add_listener(
+        lambda user_id: cache.clear() if user_id is None
+        else cache.pop(user_id)
+    )
+    return cache
+
+
+def get_exhausted_users_cache() -> LRUCache:
+    """Returns the cache of users without new words, creating it on first
+    use.
+
+    The cache maps internal user IDs to the frozenset of the categories
+    (None for the whole dictionary) in which the user has been asked every
+    word. An entry is dropped whenever the user's words change, and all of
+    them when the dictionary does, so the user gets new words as soon as
+    there are any.
+    """
+    return APP.resource('exhausted_users_cache', create_exhausted_users_cache)
@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by the number of entries and/or by
+    a memory budget.
+
+    Attributes:
+        max_entries (int | None): The maximum number of entries.
+        max_bytes (int | None): The memory budget for all entries in bytes.
+        hits (int): The number of successful lookups.
+        misses (int): The number of failed lookups.
+        evictions (int): The number of entries evicted to respect the limits.
+    """
+
+    def __init__(
+            self,
+            max_entries: int | None = None,
+            max_bytes: int | None = None,
+            sizeof: Callable[[Any], int] = lambda value: 1
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value and marks it as recently used."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value without touching counters or LRU order."""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """Caches the value and evicts the least recently used entries.
+
+        Returns:
+            bool: False if the value alone does not fit into the budget and
+                was not cached, True otherwise.
+        """
+        size: int = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+            return True
+
+    def resize(self, key: Hashable) -> None:
+        """Recalculates the size of an entry that was changed in place."""
+        with self._lock:
+            if key not in self._entries:
+                return
+
+            size: int = self._sizeof(self._entries[key])
+            self._bytes += size - self._sizes[key]
+            self._sizes[key] = size
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes the entry and returns its value."""
+        with self._lock:
+            value = self._entries.get(key, default)
+            self._discard(key)
+            return value
+
+    def clear(self) -> None:
+        """Removes all entries. Counters are preserved."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns the cache counters and current occupancy."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+    def _discard(self, key: Hashable) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            self._bytes -= self._sizes.pop(key)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            (self.max_entries is not None
+             and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key)
+            self.evictions += 1
@@ -0,0 +1,13 @@
+from ..bot_config import APP, CACHE
+from .lru import LRUCache
+
+
+def get_user_id_cache() -> LRUCache:
+    """Returns the cache of internal user IDs, creating it on first use.
+
+    The cache maps Telegram IDs to internal user IDs. Users are never
+    deleted, so an entry stays valid until it is evicted.
+    """
+    return APP.resource('user_id_cache', lambda: LRUCache(
+        max_entries=int(CACHE['user_ids_max_entries'])
+    ))
@@ -0,0 +1,493 @@
+import heapq
+import itertools
+import random
+import sys
+import threading
+from typing import Callable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...db import UserWordSetting, Word
+from ...search import DistractorIndex, FuzzyWordIndex, IndexedIdSet
+from ..bot_config import APP, CACHE
+from .lru import LRUCache
+
+# Approximate cost of the dict, list and tuple slots of one cached word,
+# including its entries in the distractor and fuzzy indexes
+WORD_OVERHEAD_BYTES = 560
+# Approximate cost of one ID in the set of the user's scheduled words
+SCHEDULED_ID_BYTES = 72
+# Base words reloaded per query after a dictionary sync
+RELOAD_CHUNK_SIZE = 1000
+
+
+class BaseVocabulary:
+    """The base dictionary shared by the vocabularies of all the users.
+
+    The base words and their distractor and fuzzy indexes are kept once per
+    process instead of once per user. They are loaded from the database on
+    first use; afterwards the words changed by a dictionary sync are
+    reloaded and the deleted ones removed.
+
+    Attributes:
+        words (dict[int, tuple[str, str]]): Word ID to word and translation.
+        ids (dict[str, int]): The words to their IDs.
+        all_ids (IndexedIdSet): IDs of all the base words.
+        distractors (DistractorIndex): Plausible wrong answers for the
+            words, preferring the same category.
+        fuzzy (FuzzyWordIndex): The words by their letter pairs, for
+            lookups of misspelt words.
+        loaded (bool): Whether the words have been loaded.
+    """
+    __slots__ = (
+        'words', 'ids', 'all_ids', 'distractors', 'fuzzy', 'loaded', 'lock'
+    )
+
+    def __init__(self) -> None:
+        self.words: dict[int, tuple[str, str]] = {}
+        self.ids: dict[str, int] = {}
+        self.all_ids = IndexedIdSet()
+        self.distractors = DistractorIndex()
+        self.fuzzy = FuzzyWordIndex()
+        self.loaded: bool = False
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def load(self, session: Session) -> None:
+        """Loads the base words from the database unless they are loaded."""
+        if self.loaded:
+            return
+
+        with self.lock:
+            if self.loaded:
+                return
+
+            rows = session.execute(
+                select(
+                    Word.id, Word.word, Word.translation, Word.category_id
+                )
+                .where(Word.user_id.is_(None))
+                .execution_options(yield_per=1000)
+            )
+            for word_id, word, translation, category_id in rows:
+                self.put_word(word_id, word, translation, category_id)
+            self.loaded = True
+
+    def reload_words(self, session: Session, words: Iterable[str]) -> None:
+        """Reloads the given base words from the database.
+
+        Words still in the database are added or updated, the others
+        removed. Nothing is done before the first load, which reads the
+        words anyway.
+        """
+        if not self.loaded:
+            return
+
+        with self.lock:
+            words = iter(words)
+            while chunk := list(itertools.islice(words, RELOAD_CHUNK_SIZE)):
+                found: set[str] = set()
+                for word_id, word, translation, category_id in \
+                        session.execute(
+                            select(
+                                Word.id, Word.word, Word.translation,
+                                Word.category_id
+                            )
+                            .where(Word.user_id.is_(None),
+                                   Word.word.in_(chunk))
+                        ):
+                    self.put_word(word_id, word, translation, category_id)
+                    found.add(word)
+
+                for word in set(chunk) - found:
+                    if word in self.ids:
+                        self.remove_word(self.ids[word])
+
+    def put_word(
+            self, word_id: int, word: str, translation: str,
+            category_id: int | None
+    ) -> None:
+        """Adds the word or replaces its text, translation and category."""
+        with self.lock:
+            self.remove_word(word_id)
+            self.words[word_id] = (word, translation)
+            self.ids[word] = word_id
+            self.all_ids.add(word_id)
+            self.distractors.add(word_id, word, category_id)
+            self.fuzzy.add(word_id, word)
+
+    def remove_word(self, word_id: int) -> None:
+        """Removes the word from the base vocabulary."""
+        with self.lock:
+            word, _ = self.words.pop(word_id, (None, None))
+            if word is None:
+                return
+
+            if self.ids.get(word) == word_id:
+                del self.ids[word]
+            self.all_ids.discard(word_id)
+            self.distractors.discard(word_id)
+            self.fuzzy.discard(word_id)
+
+
+class UserVocabulary:
+    """The vocabulary of a single user kept in the cache.
+
+    Only what is the user's own is stored here: the user's words with their
+    indexes and the IDs of the words already scheduled or hidden. The base
+    words are read from the shared BaseVocabulary, so a vocabulary costs
+    memory in proportion to the user's activity, not to the dictionary.
+
+    Attributes:
+        base (BaseVocabulary): The shared base dictionary.
+        words (dict[int, tuple[str, str]]): The user's own words by ID.
+        user_words (dict[str, int]): The user's own words (lowercase) to IDs.
+        scheduled_ids (set[int]): IDs of the words the user has a setting
+            for, i.e. words in the review queue or hidden.
+        scheduled_base (int): How many of the scheduled words are base
+            words.
+        new_ids (IndexedIdSet): IDs of the user's own words never asked
+            yet.
+        all_ids (IndexedIdSet): IDs of the user's own words.
+        distractors (DistractorIndex): Plausible wrong answers for the
+            user's own words.
+        fuzzy (FuzzyWordIndex): The user's own words by their letter pairs.
+        nbytes (int): The approximate memory footprint of the vocabulary.
+    """
+    __slots__ = (
+        'base', 'words', 'user_words', 'scheduled_ids', 'scheduled_base',
+        'new_ids', 'all_ids', 'distractors', 'fuzzy', 'nbytes', 'lock'
+    )
+
+    def __init__(self, base: BaseVocabulary, scheduled_ids: set[int]) \
+            -> None:
+        self.base = base
+        self.words: dict[int, tuple[str, str]] = {}
+        self.user_words: dict[str, int] = {}
+        self.scheduled_ids: set[int] = scheduled_ids
+        self.scheduled_base: int = sum(
+            1 for word_id in scheduled_ids if word_id in base.words
+        )
+        self.new_ids = IndexedIdSet()
+        self.all_ids = IndexedIdSet()
+        self.distractors = DistractorIndex()
+        self.fuzzy = FuzzyWordIndex()
+        self.nbytes: int = SCHEDULED_ID_BYTES * len(scheduled_ids)
+        self.lock = threading.RLock()
+
+    def add_word(self, word_id: int, word: str, translation: str) -> None:
+        """Adds the user's own word to the vocabulary."""
+        with self.lock:
+            if word_id in self.words:
+                return
+
+            self.words[word_id] = (word, translation)
+            self.all_ids.add(word_id)
+            self.distractors.add(word_id, word)
+            self.fuzzy.add(word_id, word)
+            self.user_words[word.lower()] = word_id
+            if word_id not in self.scheduled_ids:
+                self.new_ids.add(word_id)
+
+            self.nbytes += (
+                WORD_OVERHEAD_BYTES
+                + sys.getsizeof(word) + sys.getsizeof(translation or '')
+            )
+
+    def remove_word(self, word_id: int) -> None:
+        """Removes the user's own word from the vocabulary."""
+        with self.lock:
+            word, translation = self.words.pop(word_id, (None, None))
+            if word is None:
+                return
+
+            if self.user_words.get(word.lower()) == word_id:
+                del self.user_words[word.lower()]
+            self.all_ids.discard(word_id)
+            self.distractors.discard(word_id)
+            self.fuzzy.discard(word_id)
+            self.new_ids.discard(word_id)
+            if word_id in self.scheduled_ids:
+                self.scheduled_ids.discard(word_id)
+                self.nbytes -= SCHEDULED_ID_BYTES
+            self.nbytes -= (
+                WORD_OVERHEAD_BYTES
+                + sys.getsizeof(word) + sys.getsizeof(translation or '')
+            )
+
+    def schedule(self, word_id: int) -> None:
+        """Marks the word as having a setting, so it is no longer new."""
+        with self.lock:
+            if word_id in self.scheduled_ids:
+                return
+
+            self.scheduled_ids.add(word_id)
+            self.nbytes += SCHEDULED_ID_BYTES
+            self.new_ids.discard(word_id)
+            if word_id in self.base.words:
+                self.scheduled_base += 1
+
+    def find_user_word(self, word: str) -> int | None:
+        """Returns the ID of the user's own word (case-insensitive)."""
+        return self.user_words.get(word.lower())
+
+    def find_similar_words(
+            self, word: str, max_distance: int, limit: int
+    ) -> list[str]:
+        """Returns up to ``limit`` words within ``max_distance`` edits of
+        the word, closest first."""
+        with self.lock, self.base.lock:
+            matches: list[tuple[int, int]] = heapq.nsmallest(limit, [
+                *self.base.fuzzy.search(word, max_distance, limit),
+                *self.fuzzy.search(word, max_distance, limit)
+            ])
+            return [self._word(word_id)[0] for _, word_id in matches]
+
+    def pick_new_card(self, distractors_count: int = 3) \
+            -> tuple[int, str, str, list[str]] | None:
+        """Picks a random new word and its distractors.
+
+        The user's own and the base new words are chosen in proportion to
+        their numbers; a new base word is a base word the user has no
+        setting for.
+
+        Returns:
+            tuple | None: The word ID, word, translation and distractors, or
+                None if there are no new words.
+        """
+        with self.lock, self.base.lock:
+            new_base: int = len(self.base) - self.scheduled_base
+            if len(self.new_ids) + max(new_base, 0) <= 0:
+                return None
+
+            target_id: int | None = None
+            if new_base > 0 and random.randrange(
+                    len(self.new_ids) + new_base
+            ) >= len(self.new_ids):
+                target_id = self.base.all_ids.choice_excluding(
+                    self.scheduled_ids
+                )
+            if target_id is None:
+                target_id = self.new_ids.choice()
+            if target_id is None:
+                return None
+
+            word, translation = self._word(target_id)
+            return (
+                target_id, word, translation,
+                self.sample_distractors(target_id, distractors_count)
+            )
+
+    def sample_distractors(self, word_id: int, count: int = 3) -> list[str]:
+        """Returns up to ``count`` wrong answers for the word.
+
+        Words similar to the given one are preferred; random words fill in
+        when it has too few neighbours.
+        """
+        with self.lock, self.base.lock:
+            index: DistractorIndex = (
+                self.distractors if word_id in self.words
+                else self.base.distractors
+            )
+            distractor_ids: list[int] = index.choose(word_id, count)
+            for distractor_id in itertools.chain(
+                    self.base.all_ids.sample(count, word_id),
+                    self.all_ids.sample(count, word_id)
+            ):
+                if len(distractor_ids) >= count:
+                    break
+                if distractor_id not in distractor_ids:
+                    distractor_ids.append(distractor_id)
+
+            return [
+                self._word(distractor_id)[0]
+                for distractor_id in distractor_ids
+            ]
+
+    def _word(self, word_id: int) -> tuple[str, str]:
+        return self.words.get(word_id) or self.base.words[word_id]
+
+
+class VocabularyCache:
+    """Per-user vocabulary cache with LRU eviction and a memory budget.
+
+    The base dictionary is shared by all the vocabularies and is not
+    counted against the budget. Vocabularies larger than
+    ``max_entry_bytes`` are not cached; callers fall back to querying the
+    database for such users. Listeners are told about every change of a
+    user's words, whether the user's vocabulary is cached or not.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        self.max_entry_bytes = max_entry_bytes
+        self.base = BaseVocabulary()
+        self._entries = LRUCache(
+            max_bytes=max_bytes, sizeof=lambda entry: entry.nbytes
+        )
+        self._oversized = LRUCache(max_entries=4096)
+        self._listeners: list[Callable[[int | None], None]] = []
+
+    def add_listener(self, listener: Callable[[int | None], None]) -> None:
+        """Calls the listener with the user ID whenever the user's words
+        change; None means that the words of every user have changed.
+        """
+        self._listeners.append(listener)
+
+    def lookup(self, session: Session, user_id: int) -> UserVocabulary | None:
+        """Returns the user's cached vocabulary, loading it on a miss.
+
+        The shared base dictionary is loaded by the first lookup.
+
+        Returns:
+            UserVocabulary | None: The vocabulary, or None if it exceeds the
+                per-user budget and must be queried from the database.
+        """
+        vocabulary: UserVocabulary | None = self._entries.get(user_id)
+        if vocabulary is not None:
+            return vocabulary
+
+        if user_id in self._oversized:
+            return None
+
+        self.base.load(session)
+        vocabulary = load_user_vocabulary(
+            session, user_id, self.base, self.max_entry_bytes
+        )
+        if vocabulary is None or not self._entries.put(user_id, vocabulary):
+            self._oversized.put(user_id, True)
+            return None
+
+        return vocabulary
+
+    def add_word(
+            self, user_id: int, word_id: int, word: str, translation: str
+    ) -> None:
+        """Adds the user's new word to the cached vocabulary."""
+        vocabulary: UserVocabulary | None = self._entries.peek(user_id)
+        if vocabulary is not None:
+            vocabulary.add_word(word_id, word, translation)
+            self._entries.resize(user_id)
+        self._notify(user_id)
+
+    def remove_word(self, user_id: int | None, word_id: int) -> None:
+        """Removes a deleted word from the cached vocabularies.
+
+        A base word (``user_id`` is None) is removed from the shared base
+        dictionary, and the users' vocabularies are dropped, as they count
+        their settings of base words.
+        """
+        if user_id is None:
+            self.base.remove_word(word_id)
+            self.clear()
+            return
+
+        vocabulary: UserVocabulary | None = self._entries.peek(user_id)
+        if vocabulary is not None:
+            vocabulary.remove_word(word_id)
+            self._entries.resize(user_id)
+        self._notify(user_id)
+
+    def sync_base_words(
+            self, session: Session, words: list[str],
+            affected_users: list[int]
+    ) -> None:
+        """Applies a dictionary sync to the shared base dictionary.
+
+        Args:
+            session (Session): The database session the sync was committed
+                in.
+            words (list[str]): The base words inserted, updated or removed.
+            affected_users (list[int]): The users who lost settings of the
+                removed words; their vocabularies are dropped.
+        """
+        self.base.reload_words(session, words)
+        for user_id in affected_users:
+            self._entries.pop(user_id)
+            self._oversized.pop(user_id)
+        if words:
+            self._notify(None)
+
+    def change_word_visibility(self, user_id: int, word_id: int) -> None:
+        """Tells the listeners that the user has hidden or unhidden the word.
+
+        A hidden word keeps its setting, so it stays in the cached
+        vocabulary as a scheduled word either way.
+        """
+        self._notify(user_id)
+
+    def schedule_word(self, user_id: int, word_id: int) -> None:
+        """Marks that the user has got a setting for the word."""
+        vocabulary: UserVocabulary | None = self._entries.peek(user_id)
+        if vocabulary is not None:
+            vocabulary.schedule(word_id)
+            self._entries.resize(user_id)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drops the user's cached vocabulary."""
+        self._entries.pop(user_id)
+        self._oversized.pop(user_id)
+        self._notify(user_id)
+
+    def clear(self) -> None:
+        """Drops all cached user vocabularies; the base dictionary stays."""
+        self._entries.clear()
+        self._oversized.clear()
+        self._notify(None)
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit, miss and eviction counters, the occupancy and the
+        size of the base dictionary."""
+        return {**self._entries.stats(), 'base_words': len(self.base)}
+
+    def _notify(self, user_id: int | None) -> None:
+        for listener in self._listeners:
+            listener(user_id)
+
+
+def load_user_vocabulary(
+        session: Session, user_id: int, base: BaseVocabulary, max_bytes: int
+) -> UserVocabulary | None:
+    """Loads the user's own words and scheduled word IDs from the database.
+
+    Loading stops as soon as the vocabulary grows beyond ``max_bytes``.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        base (BaseVocabulary): The loaded shared base dictionary.
+        max_bytes (int): The per-user memory budget.
+
+    Returns:
+        UserVocabulary | None: The vocabulary, or None if it is too large.
+    """
+    scheduled_ids: set[int] = set(session.scalars(
+        select(UserWordSetting.word_id)
+        .where(UserWordSetting.user_id == user_id)
+    ))
+    vocabulary = UserVocabulary(base, scheduled_ids)
+    if vocabulary.nbytes > max_bytes:
+        return None
+
+    rows = session.execute(
+        select(Word.id, Word.word, Word.translation)
+        .where(Word.user_id == user_id)
+        .execution_options(yield_per=1000)
+    )
+    for word_id, word, translation in rows:
+        vocabulary.add_word(word_id, word, translation)
+        if vocabulary.nbytes > max_bytes:
+            rows.close()
+            return None
+
+    return vocabulary
+
+
+def get_vocabulary_cache() -> VocabularyCache:
+    """Returns the cache of user vocabularies, creating it on first use."""
+    return APP.resource('vocabulary_cache', lambda: VocabularyCache(
+        max_bytes=int(CACHE['vocabulary_max_bytes']),
+        max_entry_bytes=int(CACHE['vocabulary_max_entry_bytes'])
+    ))
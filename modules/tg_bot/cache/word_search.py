@@ -0,0 +1,180 @@
+import heapq
+import itertools
+import threading
+from typing import Callable, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...db import Word
+from ...search import PrefixIndex
+from ..bot_config import APP
+
+
+class FoundWord(NamedTuple):
+    """A word found by prefix search.
+
+    Attributes:
+        id (int): The ID of the word.
+        word (str): The English word.
+        translation (str): Its translation.
+    """
+    id: int
+    word: str
+    translation: str
+
+
+class WordSearchPage(NamedTuple):
+    """A page of prefix search results in key order.
+
+    Attributes:
+        words (list[FoundWord]): The words of the page.
+        has_more (bool): Whether there are more words in the direction the
+            page was read.
+    """
+    words: list[FoundWord]
+    has_more: bool
+
+
+class WordSearch:
+    """Prefix search over the words and translations of the dictionary.
+
+    The base words share one PrefixIndex and every user's own words have a
+    small one, so a user's search merges two sorted scans and costs the
+    same however many words and users there are. The indexes are loaded
+    from the database once; afterwards the added and deleted words are
+    applied to them, and the changes made before the load are ignored, as
+    the load reads them from the database.
+    """
+
+    def __init__(self) -> None:
+        self._words: dict[int, tuple[str, str]] = {}
+        self._base = PrefixIndex()
+        self._users: dict[int, PrefixIndex] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the indexes have been loaded from the database."""
+        return self._loaded
+
+    def load(self, session_factory: Callable[[], Session]) -> None:
+        """Loads the indexes from the database unless they are loaded."""
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+
+            words: dict[int | None, list[tuple[int, tuple[str, str]]]] = {}
+            with session_factory() as session:
+                rows = session.execute(
+                    select(Word.id, Word.word, Word.translation, Word.user_id)
+                    .execution_options(yield_per=1000)
+                )
+                for word_id, word, translation, user_id in rows:
+                    self._words[word_id] = (word, translation or '')
+                    words.setdefault(user_id, []).append(
+                        (word_id, (word, translation))
+                    )
+
+            for user_id, user_words in words.items():
+                index: PrefixIndex = (
+                    self._base if user_id is None
+                    else self._user_index(user_id)
+                )
+                index.extend(user_words)
+            self._loaded = True
+
+    def add_word(
+            self, user_id: int, word_id: int, word: str, translation: str
+    ) -> None:
+        """Adds the user's new word to the index."""
+        with self._lock:
+            if not self._loaded:
+                return
+
+            self._words[word_id] = (word, translation or '')
+            self._user_index(user_id).add(word_id, (word, translation))
+
+    def remove_word(self, user_id: int | None, word_id: int) -> None:
+        """Removes a deleted word from the index."""
+        with self._lock:
+            if not self._loaded:
+                return
+
+            self._words.pop(word_id, None)
+            index: PrefixIndex | None = (
+                self._base if user_id is None else self._users.get(user_id)
+            )
+            if index is not None:
+                index.discard(word_id)
+
+    def search(
+            self,
+            user_id: int | None,
+            prefix: str,
+            anchor_id: int | None = None,
+            direction: str = 'after',
+            limit: int = 10
+    ) -> WordSearchPage:
+        """Returns a page of the base words and the user's own words starting
+        with the prefix in the word or in the translation.
+
+        Args:
+            user_id (int | None): The ID of the user; None for the base
+                words only.
+            prefix (str): The prefix, case-insensitive.
+            anchor_id (int | None): The word the page continues from; the
+                first page if None.
+            direction (str): 'after' or 'before' the anchor word.
+            limit (int): The number of words per page.
+
+        Returns:
+            WordSearchPage: The page in key order; empty if the anchor word
+                is gone or no longer matches the prefix.
+        """
+        with self._lock:
+            indexes: list[PrefixIndex] = [self._base]
+            if user_id in self._users:
+                indexes.append(self._users[user_id])
+
+            anchor: tuple[str, int] | None = None
+            if anchor_id is not None:
+                anchor = next(filter(None, (
+                    index.anchor(anchor_id, prefix) for index in indexes
+                )), None)
+                if anchor is None:
+                    return WordSearchPage([], False)
+            reverse: bool = anchor is not None and direction == 'before'
+
+            entries: list[tuple[str, int]] = list(itertools.islice(
+                heapq.merge(
+                    *(index.scan(prefix, anchor, reverse)
+                      for index in indexes),
+                    reverse=reverse
+                ),
+                limit + 1
+            ))
+            words: list[FoundWord] = [
+                FoundWord(word_id, *self._words[word_id])
+                for _, word_id in entries[:limit]
+            ]
+
+        if reverse:
+            words.reverse()
+        return WordSearchPage(words, len(entries) > limit)
+
+    def _user_index(self, user_id: int) -> PrefixIndex:
+        return self._users.setdefault(user_id, PrefixIndex())
+
+
+def get_word_search() -> WordSearch:
+    """Returns the word search index, creating it on first use.
+
+    The index is empty until it is loaded; the added and deleted words are
+    ignored until then.
+    """
+    return APP.resource('word_search', WordSearch)
@@ -0,0 +1,377 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from telebot import apihelper, types
+
+from ..db import start_pool_reporter
+from .bot_config import APP, BOT, METRICS, OUTBOUND, POOL, WEBHOOK
+from .bot_init import get_bot
+from .instrumentation import (
+    REGISTRY, collect_cluster, instrument_bot_api, start_metrics,
+    start_metrics_server
+)
+from .outbound import get_outbound_dispatcher
+from .ui import menu_btn_commands
+from .webhook import WebhookEndpoint, get_update_chat_id, serve_webhook
+from .word import load_word_search
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of the updates handed to the workers
+OUTCOMES = ('processed', 'failed', 'lost')
+# How often a supervisor checks that its worker is alive, in seconds
+SUPERVISE_INTERVAL = 0.5
+# Long polling timeout of the ingress and its delay after a failed request
+POLLING_TIMEOUT = 20
+POLLING_RETRY_DELAY = 3
+
+
+class WorkerProcess:
+    """A worker process and the ingress end of its pipe."""
+
+    def __init__(self, context, index: int, processes: int) -> None:
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(
+            target=run_worker,
+            args=(index, processes, worker_connection,
+                  logging.getLogger().level),
+            name=f'bot-worker-{index}',
+            daemon=True
+        )
+        self.process.start()
+        worker_connection.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def handle(self, update_json: dict) -> tuple[str, int]:
+        """Hands the update to the worker and waits until it is handled.
+
+        Returns:
+            tuple[str, int]: The outcome and the handling time in
+                microseconds; the outcome is 'lost' if the worker exited.
+        """
+        try:
+            self.connection.send(update_json)
+            while not self.connection.poll(SUPERVISE_INTERVAL):
+                if not self.process.is_alive():
+                    return 'lost', 0
+            return self.connection.recv()
+        except (EOFError, OSError):
+            return 'lost', 0
+
+    def terminate(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+        self.connection.close()
+
+
+class WorkerCluster:
+    """Worker processes, each handling a fixed share of the chats.
+
+    An update goes to worker ``chat_id % processes``, so all updates of a
+    chat are handled by one process in the order they arrived, and the
+    chat's next steps, conversation records and cached data stay in that
+    process. Each worker creates its own bot, engine with a connection pool
+    and caches; the ingress only parses the updates and routes them by chat
+    ID. Workers are spawned rather than forked, so they share no
+    connections or threads with the ingress process.
+
+    The waiting updates are kept in the ingress process. A supervisor
+    thread per worker hands them to the worker one at a time and restarts
+    the worker ``restart_delay`` seconds after it exits, so a crash loses
+    only the update being handled.
+
+    Args:
+        processes (int): The number of worker processes.
+        queue_size (int): The number of waiting updates of all workers.
+        restart_delay (float): The delay before an exited worker is
+            restarted, in seconds.
+        report_interval (float): How often the per-worker throughput is
+            measured and logged, in seconds; 0 disables it.
+    """
+
+    def __init__(
+            self,
+            processes: int,
+            queue_size: int,
+            restart_delay: float,
+            report_interval: float
+    ) -> None:
+        self.size = processes
+        self.queue_size = max(1, queue_size // processes)
+        self.restart_delay = restart_delay
+        self.report_interval = report_interval
+        self.queues: list[queue.Queue] = [
+            queue.Queue(maxsize=self.queue_size) for _ in range(processes)
+        ]
+        self.counters: list[dict[str, int]] = [
+            dict.fromkeys(('dispatched', *OUTCOMES, 'busy_us', 'restarts'), 0)
+            for _ in range(processes)
+        ]
+        self.rates: list[float] = [0.0] * processes
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: list[WorkerProcess | None] = [None] * processes
+        self._lock = threading.Lock()
+
+    def shard_of(self, update_json: dict) -> int:
+        """Returns the index of the worker of the update's chat."""
+        return get_update_chat_id(update_json) % self.size
+
+    def dispatch(self, update_json: dict, block: bool = True) -> bool:
+        """Queues the update for the worker of its chat.
+
+        Args:
+            update_json (dict): The update as received from Telegram.
+            block (bool): Whether to wait while the worker's queue is full.
+
+        Returns:
+            bool: False if the queue is full and ``block`` is False.
+        """
+        index: int = self.shard_of(update_json)
+        try:
+            self.queues[index].put(update_json, block=block)
+        except queue.Full:
+            return False
+
+        self._count(index, 'dispatched')
+        return True
+
+    def start(self) -> None:
+        """Starts the workers with their supervisors and the reporter."""
+        for index in range(self.size):
+            self._workers[index] = WorkerProcess(
+                self._context, index, self.size
+            )
+            threading.Thread(
+                target=self._supervise, args=(index,),
+                name=f'worker-supervisor-{index}', daemon=True
+            ).start()
+
+        if self.report_interval > 0:
+            threading.Thread(
+                target=self._report, name='worker-reporter', daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        """Terminates the workers."""
+        for worker in self._workers:
+            if worker is not None:
+                worker.terminate()
+
+    def queue_depths(self) -> list[int]:
+        """Returns the number of waiting updates per worker."""
+        return [worker_queue.qsize() for worker_queue in self.queues]
+
+    def stats(self) -> list[dict]:
+        """Returns the state, counters and throughput of every worker."""
+        queue_depths: list[int] = self.queue_depths()
+        with self._lock:
+            counters: list[dict[str, int]] = [
+                dict(worker_counters) for worker_counters in self.counters
+            ]
+
+        return [
+            {
+                'worker': index,
+                'pid': worker.process.pid if worker is not None else None,
+                'alive': worker is not None and worker.is_alive(),
+                'queue_depth': queue_depths[index],
+                **counters[index],
+                'updates_per_second': self.rates[index],
+            }
+            for index, worker in enumerate(self._workers)
+        ]
+
+    def _count(self, index: int, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[index][counter] += amount
+
+    def _supervise(self, index: int) -> None:
+        while True:
+            try:
+                update_json: dict | None = self.queues[index].get(
+                    timeout=SUPERVISE_INTERVAL
+                )
+            except queue.Empty:
+                update_json = None
+
+            while not self._workers[index].is_alive():
+                self._restart(index)
+
+            if update_json is None:
+                continue
+
+            outcome, busy_us = self._workers[index].handle(update_json)
+            if outcome == 'lost':
+                logger.error('Update %s was lost with worker %s',
+                             update_json.get('update_id'), index)
+            self._count(index, outcome)
+            self._count(index, 'busy_us', busy_us)
+
+    def _restart(self, index: int) -> None:
+        worker: WorkerProcess = self._workers[index]
+        logger.error('Worker %s (pid %s) exited with code %s',
+                     index, worker.process.pid, worker.process.exitcode)
+        worker.terminate()
+        time.sleep(self.restart_delay)
+        self._workers[index] = WorkerProcess(self._context, index, self.size)
+        self._count(index, 'restarts')
+
+    def _report(self) -> None:
+        processed: list[int] = [0] * self.size
+        while True:
+            time.sleep(self.report_interval)
+            for index, worker in enumerate(self.stats()):
+                self.rates[index] = (
+                    (worker['processed'] - processed[index])
+                    / self.report_interval
+                )
+                processed[index] = worker['processed']
+            logger.info('Workers, updates/s: %s', ', '.join(
+                f'{index}: {rate:.1f}' for index, rate in enumerate(self.rates)
+            ))
+
+
+class ClusterWebhookServer(WebhookEndpoint):
+    """Webhook endpoint handing the updates to the worker processes."""
+
+    def __init__(self, cluster: WorkerCluster, config: dict) -> None:
+        super().__init__(config)
+        self.cluster = cluster
+        self.workers = cluster.size
+        self.queue_size = cluster.queue_size
+
+    def shard_of(self, update_json: dict) -> int:
+        return self.cluster.shard_of(update_json)
+
+    def enqueue(self, update_json: dict) -> bool:
+        return self.cluster.dispatch(update_json, block=False)
+
+    def queue_depths(self) -> list[int]:
+        return self.cluster.queue_depths()
+
+    def report(self) -> dict:
+        return {**super().report(), 'workers': self.cluster.stats()}
+
+
+def run_worker(
+        index: int, processes: int, connection, log_level: int
+) -> None:
+    """Handles the updates the ingress sends until it closes the pipe.
+
+    The worker gets its share of the global outbound rate, and its metrics
+    are served on the METRICS port plus one plus the worker index. The
+    first worker also sets the bot's menu buttons; a failure to set them
+    is only logged.
+
+    Args:
+        index (int): The index of the worker.
+        processes (int): The number of workers in the cluster.
+        connection: The worker end of the pipe to the ingress.
+        log_level (int): The log level of the ingress process.
+    """
+    logging.basicConfig(
+        level=log_level, format=f'%(asctime)s [worker {index}] %(message)s'
+    )
+    instrument_bot_api()
+    get_outbound_dispatcher().set_global_rate(
+        float(OUTBOUND['global_rate']) / processes
+    )
+    metrics: dict = dict(METRICS)
+    if int(metrics['port']):
+        metrics['port'] = str(int(metrics['port']) + 1 + index)
+    start_metrics(
+        metrics, APP.engine, APP.pool_metrics, get_outbound_dispatcher()
+    )
+    bot = get_bot()
+    bot.threaded = False
+    if index == 0:
+        try:
+            menu_btn_commands()
+        except Exception:
+            # Restarting the worker would not help, the buttons are optional
+            logger.exception('Failed to set the menu buttons')
+    load_word_search()
+    start_pool_reporter(APP.pool_metrics, float(POOL['report_interval']))
+
+    while True:
+        try:
+            update_json: dict = connection.recv()
+        except EOFError:
+            return
+
+        started_at: float = time.perf_counter()
+        try:
+            bot.process_new_updates([types.Update.de_json(update_json)])
+            outcome: str = 'processed'
+        except Exception:
+            outcome = 'failed'
+            logger.exception('Failed to process update %s',
+                             update_json.get('update_id'))
+
+        connection.send(
+            (outcome, int((time.perf_counter() - started_at) * 1_000_000))
+        )
+
+
+def poll_updates(cluster: WorkerCluster, token: str) -> None:
+    """Long-polls Telegram and hands the updates to the workers.
+
+    A full worker queue blocks the ingress, so polling slows down to the
+    pace of the slowest worker instead of piling updates up in memory.
+    """
+    offset: int | None = None
+    while True:
+        try:
+            updates: list[dict] = apihelper.get_updates(
+                token, offset, timeout=POLLING_TIMEOUT,
+                long_polling_timeout=POLLING_TIMEOUT
+            )
+        except Exception:
+            logger.exception('Failed to get updates')
+            time.sleep(POLLING_RETRY_DELAY)
+            continue
+
+        for update_json in updates:
+            cluster.dispatch(update_json)
+            offset = update_json['update_id'] + 1
+
+
+def start_cluster(config: dict) -> None:
+    """Runs the bot as worker processes behind a single ingress.
+
+    The ingress receives the updates by long polling or by the webhook, as
+    INGRESS in the BOT section says, and serves the workers' counters with
+    the metrics. It creates no bot and uses no database connections: the
+    pool of the database bootstrap is closed before the workers start.
+
+    Args:
+        config (dict): The CLUSTER section of the config.
+    """
+    cluster = WorkerCluster(
+        int(config['processes']),
+        int(config['queue_size']),
+        float(config['restart_delay']),
+        float(config['report_interval'])
+    )
+    REGISTRY.add_collector(collect_cluster(cluster))
+    if int(METRICS['port']):
+        start_metrics_server(METRICS['host'], int(METRICS['port']))
+
+    APP.release_database()
+    cluster.start()
+    token: str = APP.section('TG')['token']
+    try:
+        if BOT['ingress'] == 'webhook':
+            serve_webhook(
+                ClusterWebhookServer(cluster, WEBHOOK), token, WEBHOOK
+            )
+        else:
+            poll_updates(cluster, token)
+    finally:
+        cluster.stop()
@@ -0,0 +1,15 @@
+from .backend import ConversationHandlerBackend
+from .store import (
+    ConversationStore,
+    MemoryConversationStore,
+    SQLiteConversationStore,
+    create_conversation_store
+)
+
+__all__ = [
+    'ConversationHandlerBackend',
+    'ConversationStore',
+    'MemoryConversationStore',
+    'SQLiteConversationStore',
+    'create_conversation_store'
+]
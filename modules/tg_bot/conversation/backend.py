@@ -0,0 +1,73 @@
+import json
+from typing import Callable
+
+from telebot import Handler
+from telebot.handler_backends import HandlerBackend
+
+from .store import ConversationStore
+
+
+class ConversationHandlerBackend(HandlerBackend):
+    """Next step handler backend keeping compact records in a store.
+
+    Instead of the handler object, the backend stores the name of the step
+    and its arguments as JSON, so the arguments must be IDs and plain
+    values. Only the registered steps can be scheduled; a record is turned
+    back into a handler of the step when the user's next message arrives.
+
+    Args:
+        store (ConversationStore): The store of the records.
+        steps (dict[str, Callable]): The step functions by name.
+    """
+
+    def __init__(
+            self, store: ConversationStore, steps: dict[str, Callable]
+    ) -> None:
+        super().__init__()
+        self.store = store
+        self.steps = steps
+
+    def register_handler(self, handler_group_id: int, handler: Handler) \
+            -> None:
+        """Schedules the step for the chat's next message.
+
+        Raises:
+            ValueError: If the callback is not a registered step.
+            TypeError: If the arguments cannot be serialised to JSON.
+        """
+        callback: Callable = getattr(
+            handler.callback, '__wrapped__', handler.callback
+        )
+        if self.steps.get(callback.__name__) is None:
+            raise ValueError(
+                f'{callback.__name__} is not a registered conversation step'
+            )
+
+        records: list[dict] = self._load(self.store.get(handler_group_id))
+        records.append({
+            'step': callback.__name__,
+            'args': list(handler.args),
+            'kwargs': handler.kwargs,
+        })
+        self.store.set(
+            handler_group_id,
+            json.dumps(records, ensure_ascii=False, separators=(',', ':'))
+        )
+
+    def clear_handlers(self, handler_group_id: int) -> None:
+        self.store.delete(handler_group_id)
+
+    def get_handlers(self, handler_group_id: int) -> list[Handler] | None:
+        """Removes the chat's pending steps and returns them as handlers."""
+        records: list[dict] = self._load(self.store.pop(handler_group_id))
+        handlers: list[Handler] = [
+            Handler(self.steps[record['step']], *record['args'],
+                    **record['kwargs'])
+            for record in records
+            if record['step'] in self.steps
+        ]
+        return handlers or None
+
+    @staticmethod
+    def _load(record: str | None) -> list[dict]:
+        return json.loads(record) if record else []
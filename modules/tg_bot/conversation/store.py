@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from ..cache.lru import LRUCache
+
+# Expired and surplus rows of the SQLite store are purged once per this
+# many writes
+PURGE_EVERY = 1000
+
+
+class ConversationStore(ABC):
+    """Pending conversation steps by chat ID.
+
+    A record is a compact serialised string with a time to live; a record
+    that has not been read before it expires is dropped, so abandoned
+    conversations do not accumulate.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, chat_id: int) -> str | None:
+        """Returns the record of the chat, or None."""
+
+    @abstractmethod
+    def set(self, chat_id: int, record: str) -> None:
+        """Stores the record of the chat and restarts its time to live."""
+
+    @abstractmethod
+    def pop(self, chat_id: int) -> str | None:
+        """Removes and returns the record of the chat, or None."""
+
+    def delete(self, chat_id: int) -> None:
+        """Removes the record of the chat."""
+        self.pop(chat_id)
+
+
+class MemoryConversationStore(ConversationStore):
+    """Keeps the records in process memory.
+
+    At most ``max_entries`` chats are kept; the least recently used ones are
+    evicted first. Records are lost on restart.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        super().__init__(ttl)
+        self._records = LRUCache(max_entries=max_entries)
+
+    def get(self, chat_id: int) -> str | None:
+        entry: tuple[float, str] | None = self._records.get(chat_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._records.pop(chat_id)
+            return None
+
+        return entry[1]
+
+    def set(self, chat_id: int, record: str) -> None:
+        self._records.put(chat_id, (time.monotonic() + self.ttl, record))
+
+    def pop(self, chat_id: int) -> str | None:
+        entry: tuple[float, str] | None = self._records.pop(chat_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+
+        return entry[1]
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Keeps the records in a SQLite file, so they survive restarts.
+
+    Expired records and records beyond ``max_entries`` (the ones closest to
+    expiry) are purged periodically.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, path: str) -> None:
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS conversations ('
+            'chat_id INTEGER PRIMARY KEY, record TEXT NOT NULL, '
+            'expires_at REAL NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS ix_conversations_expires_at '
+            'ON conversations (expires_at)'
+        )
+
+    def get(self, chat_id: int) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT record FROM conversations '
+                'WHERE chat_id = ? AND expires_at > ?',
+                (chat_id, time.time())
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set(self, chat_id: int, record: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO conversations '
+                '(chat_id, record, expires_at) VALUES (?, ?, ?)',
+                (chat_id, record, time.time() + self.ttl)
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                self._purge()
+
+    def pop(self, chat_id: int) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT record, expires_at FROM conversations '
+                'WHERE chat_id = ?',
+                (chat_id,)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    'DELETE FROM conversations WHERE chat_id = ?', (chat_id,)
+                )
+
+        if row is None or row[1] <= time.time():
+            return None
+
+        return row[0]
+
+    def _purge(self) -> None:
+        self._connection.execute(
+            'DELETE FROM conversations WHERE expires_at <= ?', (time.time(),)
+        )
+        self._connection.execute(
+            'DELETE FROM conversations WHERE chat_id IN ('
+            'SELECT chat_id FROM conversations ORDER BY expires_at DESC '
+            'LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+
+def create_conversation_store(config: dict) -> ConversationStore:
+    """Creates the store configured in the CONVERSATION section.
+
+    Raises:
+        ValueError: If BACKEND is not memory or sqlite.
+    """
+    ttl: float = float(config['ttl'])
+    match config['backend']:
+        case 'memory':
+            return MemoryConversationStore(ttl, int(config['max_entries']))
+        case 'sqlite':
+            return SQLiteConversationStore(
+                ttl, int(config['max_entries']), config['path']
+            )
+
+    raise ValueError(f'Unknown conversation backend: {config["backend"]}')
@@ -1,31 +1,71 @@
 from .user_db_utils import (
     check_user_in_db,
     handle_new_user,
-    get_user_id
+    find_user_id,
+    get_user_id,
+    register_user
 )
 from .word_db_utils import (
     get_word_by_user_id,
     word_exists_in_db,
+    find_user_words,
     get_all_user_words,
-    get_hidden_word_settings,
-    get_user_word_setting
+    get_hidden_words_page,
+    get_user_word_setting,
+    HiddenWordsPage
+)
+from .quiz_db_utils import (
+    QuizCard,
+    get_quiz_card,
+    get_quiz_categories,
+    select_quiz_card
+)
+from .fuzzy_db_utils import find_similar_words
+from .hot_queries import BOT_HOT_QUERIES
+from .stats_db_utils import (
+    WordProgress,
+    change_user_stats,
+    get_user_stats,
+    get_word_progress,
+    rebuild_user_stats,
+    record_answer_stats
 )
 from .word_db_crud import (
     add_word_to_db,
+    add_words_to_db,
     remove_word_from_view,
+    return_word_to_view,
     delete_word_from_db
 )
 
 __all__ = [
     'check_user_in_db',
     'handle_new_user',
+    'find_user_id',
     'get_user_id',
+    'register_user',
     'get_word_by_user_id',
     'word_exists_in_db',
+    'find_user_words',
     'add_word_to_db',
+    'add_words_to_db',
     'remove_word_from_view',
+    'return_word_to_view',
     'delete_word_from_db',
     'get_all_user_words',
-    'get_hidden_word_settings',
-    'get_user_word_setting'
+    'get_hidden_words_page',
+    'HiddenWordsPage',
+    'get_user_word_setting',
+    'get_quiz_card',
+    'get_quiz_categories',
+    'select_quiz_card',
+    'QuizCard',
+    'WordProgress',
+    'change_user_stats',
+    'get_user_stats',
+    'get_word_progress',
+    'rebuild_user_stats',
+    'record_answer_stats',
+    'find_similar_words',
+    'BOT_HOT_QUERIES'
 ]
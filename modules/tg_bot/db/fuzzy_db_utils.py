@@ -0,0 +1,83 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ...db import Word
+from ...search import allowed_edits, edit_distance
+from ..bot_config import FUZZY
+from ..cache import UserVocabulary, get_vocabulary_cache
+from .quiz_db_utils import user_scope_condition
+
+# Candidates fetched per suggestion by the trigram query; they are ranked
+# by edit distance afterwards
+TRIGRAM_CANDIDATES = 4
+
+
+def find_similar_words(
+        session: Session, user_id: int, word: str, limit: int | None = None
+) -> list[str]:
+    """Returns the user's words closest to a misspelt word.
+
+    The cached vocabulary of the user is searched in memory. Vocabularies
+    too large for the cache are searched by the trigram index on
+    PostgreSQL if the ``pg_trgm`` backend is configured, or by comparing
+    the words of close lengths otherwise.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        word (str): The misspelt word.
+        limit (int | None): The number of words to return; the configured
+            number of suggestions if None.
+
+    Returns:
+        list[str]: The words within the allowed edit distance, closest
+            first.
+    """
+    max_distance: int = allowed_edits(word, int(FUZZY['max_distance']))
+    limit = limit or int(FUZZY['suggestions'])
+    if not max_distance:
+        return []
+
+    vocabulary: UserVocabulary | None = get_vocabulary_cache().lookup(
+        session, user_id
+    )
+    if vocabulary is not None:
+        return vocabulary.find_similar_words(word, max_distance, limit)
+
+    if FUZZY['backend'] == 'pg_trgm' \
+            and session.get_bind().dialect.name == 'postgresql':
+        candidates = select(Word.word).where(
+            user_scope_condition(user_id),
+            func.lower(Word.word).op('%')(word.lower())
+        ).order_by(
+            func.similarity(func.lower(Word.word), word.lower()).desc()
+        ).limit(limit * TRIGRAM_CANDIDATES)
+    else:
+        candidates = select(Word.word).where(
+            user_scope_condition(user_id),
+            func.length(Word.word).between(
+                len(word) - max_distance, len(word) + max_distance
+            )
+        ).execution_options(yield_per=1000)
+
+    return rank_similar_words(
+        session.scalars(candidates), word, max_distance, limit
+    )
+
+
+def rank_similar_words(
+        candidates, word: str, max_distance: int, limit: int
+) -> list[str]:
+    """Returns up to ``limit`` candidates within ``max_distance`` edits of
+    the word, closest first."""
+    lowered: str = word.lower()
+    scored: list[tuple[int, str]] = []
+    for candidate in candidates:
+        distance: int = edit_distance(
+            lowered, candidate.lower(), max_distance
+        )
+        if distance <= max_distance:
+            scored.append((distance, candidate))
+
+    scored.sort()
+    return [candidate for _, candidate in scored[:limit]]
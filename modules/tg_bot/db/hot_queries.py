@@ -0,0 +1,23 @@
+from ...srs import next_review_query
+from .quiz_db_utils import build_distractors_query, build_quiz_card_query
+from .word_db_utils import hidden_words_page_query
+
+# The statements the bot sends on every quiz or page, checked for full table
+# scans together with modules.db.explain.HOT_QUERIES
+BOT_HOT_QUERIES: dict = {
+    'next review of user': next_review_query(1),
+    'next review of user in a category': next_review_query(1, 1),
+    'quiz card': build_quiz_card_query(1, 0.5, [0.25, 0.5, 0.75]),
+    'quiz card of a category': build_quiz_card_query(
+        1, 0.5, [0.25, 0.5, 0.75], category_id=1
+    ),
+    'distractors of a category': build_distractors_query(
+        1, 1, [0.25, 0.5, 0.75], category_id=1
+    ),
+    'first page of hidden words': hidden_words_page_query(
+        1, None, 'after', 10
+    ),
+    'page of hidden words before a word': hidden_words_page_query(
+        1, 1, 'before', 10
+    ),
+}
@@ -0,0 +1,376 @@
+import itertools
+import random
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import exists, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from ...db import Category, UserWordSetting, Word
+from ...srs import next_review_query
+from ..cache import (
+    LRUCache, get_exhausted_users_cache, get_vocabulary_cache
+)
+from .word_db_utils import get_user_word_setting
+
+DISTRACTORS_COUNT = 3
+
+
+class QuizCard(NamedTuple):
+    """A ready-to-ask quiz card.
+
+    Attributes:
+        word_id (int): The ID of the target word.
+        word (str): The English word the user has to pick.
+        translation (str): The translation shown to the user.
+        distractors (list[str]): Wrong answer options for the card.
+    """
+    word_id: int
+    word: str
+    translation: str
+    distractors: list[str]
+
+
+def user_scope_condition(user_id: int):
+    """Returns the condition selecting base words and the user's own words."""
+    return or_(Word.user_id.is_(None), Word.user_id == user_id)
+
+
+def quiz_scope_condition(user_id: int, category_id: int | None = None):
+    """Returns the condition selecting the words the user is quizzed on.
+
+    With a category, only the words of the category are selected; with
+    the ``(category_id, id)`` index the samples of ``sample_run`` read the
+    category's words in id order.
+    """
+    if category_id is None:
+        return user_scope_condition(user_id)
+
+    return (Word.category_id == category_id) & user_scope_condition(user_id)
+
+
+def scheduled_for_user_condition(user_id: int):
+    """Returns the condition for words the user already has a setting for.
+
+    Negated, it is an anti-join selecting the words new to the user.
+    """
+    return (
+        exists()
+        .where(
+            UserWordSetting.word_id == Word.id,
+            UserWordSetting.user_id == user_id
+        )
+    )
+
+
+def words_id_range(category_id: int | None = None):
+    """Returns a CTE with the lowest and highest words.id.
+
+    MIN and MAX over the primary key are answered from the index, so the
+    range costs O(log n) regardless of the dictionary size; each is a
+    subquery of its own, since a database reads both ends of an index only
+    for a single MIN or MAX. With a category the range is that of the
+    category's words, read from the ``(category_id, id)`` index.
+    """
+    low_id = select(func.min(Word.id))
+    high_id = select(func.max(Word.id))
+    if category_id is not None:
+        low_id = low_id.where(Word.category_id == category_id)
+        high_id = high_id.where(Word.category_id == category_id)
+
+    return select(
+        low_id.scalar_subquery().label('low_id'),
+        high_id.scalar_subquery().label('high_id')
+    ).cte('id_range')
+
+
+def random_id_pivot(id_range, fraction: float):
+    """Returns an SQL expression for a random point in the id range."""
+    return select(
+        id_range.c.low_id + (id_range.c.high_id - id_range.c.low_id) * fraction
+    ).scalar_subquery()
+
+
+def sample_run(condition, pivot, limit: int):
+    """Builds an indexed pick of words matching the condition.
+
+    Rows are taken in primary key order starting at the pivot and wrap
+    around to the beginning of the range when there are not enough of them.
+
+    The first row follows a gap in the ids left by other users' words or
+    deleted words, and is picked with a probability proportional to that
+    gap, so the pick is uniform only for densely numbered words. The bias
+    is the price of reading the index from one point instead of counting
+    the words.
+    """
+    columns = (Word.id, Word.word, Word.translation)
+    after_pivot = (
+        select(*columns, literal(0).label('pass_no'))
+        .where(condition, Word.id >= pivot)
+        .order_by(Word.id)
+        .limit(limit)
+        .subquery()
+    )
+    before_pivot = (
+        select(*columns, literal(1).label('pass_no'))
+        .where(condition, Word.id < pivot)
+        .order_by(Word.id)
+        .limit(limit)
+        .subquery()
+    )
+    candidates = union_all(
+        select(after_pivot), select(before_pivot)
+    ).subquery()
+
+    return (
+        select(
+            candidates.c.id, candidates.c.word, candidates.c.translation,
+            candidates.c.pass_no
+        )
+        .order_by(candidates.c.pass_no, candidates.c.id)
+        .limit(limit)
+    )
+
+
+def sample_words(condition, id_range, fractions: list[float], limit: int):
+    """Builds an indexed random sample of words matching the condition.
+
+    Every fraction gives an independent pivot with a run of up to ``limit``
+    words, numbered by ``slot``. The caller takes the first word of every
+    run before the second ones (see ``interleave_words``), so the sample is
+    not a run of neighbouring ids of one import or one user's batch, and
+    runs fill in for pivots that picked the same word.
+    """
+    runs = [
+        sample_run(condition, random_id_pivot(id_range, fraction), limit)
+        .subquery()
+        for fraction in fractions
+    ]
+    return union_all(*(
+        select(
+            run.c.id, run.c.word, run.c.translation, run.c.pass_no,
+            literal(slot).label('slot')
+        )
+        for slot, run in enumerate(runs)
+    ))
+
+
+def random_fractions(count: int) -> list[float]:
+    """Returns the fractions of the pivots of ``count`` words."""
+    return [random.random() for _ in range(count)]
+
+
+def interleave_words(rows, count: int) -> list[str]:
+    """Returns up to ``count`` distinct words of the sampled runs.
+
+    The runs are read in turns: the first words of all of them, then the
+    second ones and so on.
+    """
+    runs: dict[int, list] = {}
+    for row in rows:
+        runs.setdefault(row.slot, []).append(row)
+
+    ordered_runs: list[list] = [
+        sorted(run, key=lambda row: (row.pass_no, row.id))
+        for _, run in sorted(runs.items())
+    ]
+    words: dict[str, None] = {}
+    for position_rows in itertools.zip_longest(*ordered_runs):
+        for row in position_rows:
+            if row is not None:
+                words.setdefault(row.word)
+
+    return list(words)[:count]
+
+
+def build_quiz_card_query(
+        user_id: int, target_fraction: float,
+        distractor_fractions: list[float], category_id: int | None = None
+):
+    """Builds the single statement returning a quiz card.
+
+    The first row (``is_target`` is true) is a random word new to the
+    user, the remaining rows are runs of random distractors from the
+    user's scope, or from the category if one is given, one run per
+    fraction.
+    """
+    scope = quiz_scope_condition(user_id, category_id)
+    id_range = words_id_range(category_id)
+    target = sample_run(
+        scope & ~scheduled_for_user_condition(user_id),
+        random_id_pivot(id_range, target_fraction),
+        1
+    ).cte('target')
+    distractors = sample_words(
+        scope & (Word.id != select(target.c.id).scalar_subquery()),
+        id_range,
+        distractor_fractions,
+        len(distractor_fractions)
+    ).subquery('distractors')
+
+    return union_all(
+        select(
+            target.c.id, target.c.word, target.c.translation,
+            target.c.pass_no, literal(0).label('slot'),
+            literal(True).label('is_target')
+        ),
+        select(
+            distractors.c.id, distractors.c.word, distractors.c.translation,
+            distractors.c.pass_no, distractors.c.slot,
+            literal(False).label('is_target')
+        )
+    )
+
+
+def build_distractors_query(
+        user_id: int, word_id: int, fractions: list[float],
+        category_id: int | None = None
+):
+    """Builds the query of runs of random distractors for the user's word,
+    one run per fraction."""
+    return sample_words(
+        quiz_scope_condition(user_id, category_id) & (Word.id != word_id),
+        words_id_range(category_id),
+        fractions,
+        len(fractions)
+    )
+
+
+def get_quiz_card(
+        session: Session, user_id: int, category_id: int | None = None
+) -> QuizCard | None:
+    """Selects a quiz card for the user.
+
+    The word due for review first is taken from the user's review queue.
+    If nothing is due yet, a new word is introduced; when there are no new
+    words either, the user reviews the next word ahead of time.
+
+    New words and distractors are picked from the cached vocabulary when
+    the user has one, otherwise from the database in one round trip. The
+    new words of a category are always picked in the database, by the
+    ``(category_id, id)`` index of the words. The review queue of a
+    category is read from the ``(user_id, category_id, due_at)`` index of
+    the settings.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        category_id (int | None): The category to quiz the user on; all
+            the user's words if None.
+
+    Returns:
+        QuizCard | None: The card, or None if the user has no words left.
+    """
+    next_review = session.execute(
+        next_review_query(user_id, category_id)
+    ).first()
+    if next_review is not None and next_review.due_at <= datetime.now():
+        return get_review_card(session, user_id, next_review, category_id)
+
+    new_card: QuizCard | None = get_new_card(session, user_id, category_id)
+    if new_card is not None or next_review is None:
+        return new_card
+
+    return get_review_card(session, user_id, next_review, category_id)
+
+
+def get_review_card(
+        session: Session, user_id: int, review, category_id: int | None = None
+) -> QuizCard:
+    """Builds the card of a word from the review queue.
+
+    The cached distractor index prefers the words of the same category, so
+    it serves the cards of a category too.
+    """
+    vocabulary = get_vocabulary_cache().lookup(session, user_id)
+    if vocabulary is not None:
+        distractors: list[str] = vocabulary.sample_distractors(review.id)
+    else:
+        distractors = interleave_words(
+            session.execute(build_distractors_query(
+                user_id, review.id, random_fractions(DISTRACTORS_COUNT),
+                category_id
+            )),
+            DISTRACTORS_COUNT
+        )
+
+    return QuizCard(review.id, review.word, review.translation, distractors)
+
+
+def get_new_card(
+        session: Session, user_id: int, category_id: int | None = None
+) -> QuizCard | None:
+    """Selects a card of a random word the user has never been asked.
+
+    A user the database found no new words for is remembered, so the
+    following presses skip the search, which has to scan the user's whole
+    scope to find nothing, until the user's words change.
+    """
+    if category_id is None:
+        vocabulary = get_vocabulary_cache().lookup(session, user_id)
+        if vocabulary is not None:
+            card: tuple | None = vocabulary.pick_new_card()
+            return QuizCard(*card) if card else None
+
+    exhausted_users: LRUCache = get_exhausted_users_cache()
+    exhausted: frozenset = exhausted_users.get(user_id, frozenset())
+    if category_id in exhausted:
+        return None
+
+    rows = session.execute(build_quiz_card_query(
+        user_id, random.random(), random_fractions(DISTRACTORS_COUNT),
+        category_id
+    )).all()
+    target = next((row for row in rows if row.is_target), None)
+
+    if target is None:
+        exhausted_users.put(user_id, exhausted | {category_id})
+        return None
+
+    return QuizCard(
+        word_id=target.id,
+        word=target.word,
+        translation=target.translation,
+        distractors=interleave_words(
+            (row for row in rows if not row.is_target), DISTRACTORS_COUNT
+        )
+    )
+
+
+def select_quiz_card(
+        session: Session, user_id: int, category_id: int | None = None
+) -> tuple[QuizCard, int] | None:
+    """Selects a quiz card and gets or creates the user's word setting.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        category_id (int | None): The category to quiz the user on; all
+            the user's words if None.
+
+    Returns:
+        tuple[QuizCard, int] | None: The card and the ID of the user's word
+            setting, or None if the user has no visible words.
+    """
+    quiz_card: QuizCard | None = get_quiz_card(session, user_id, category_id)
+    if quiz_card is None:
+        return None
+
+    user_word_setting_id: int = get_user_word_setting(
+        session, user_id, quiz_card.word_id
+    ).id
+
+    return quiz_card, user_word_setting_id
+
+
+def get_quiz_categories(session: Session) -> list[tuple[int, str]]:
+    """Returns the IDs and names of the categories that have words, by
+    name."""
+    return [
+        (category_id, name)
+        for category_id, name in session.execute(
+            select(Category.id, Category.name)
+            .where(exists().where(Word.category_id == Category.id))
+            .order_by(Category.name)
+        )
+    ]
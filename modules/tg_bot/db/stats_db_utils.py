@@ -0,0 +1,254 @@
+from datetime import date, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import and_, case, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from ...db import User, UserDailyAnswers, UserStats, UserWordSetting, Word
+from ...db.db_operations import increment_counters, insert_ignoring_conflicts
+from ..bot_config import CHATBOT_DATA
+
+# Rows inserted by one statement when the aggregates are rebuilt
+REBUILD_CHUNK_SIZE = 500
+
+
+class WordProgress(NamedTuple):
+    """What a user's word setting counts towards in the aggregates.
+
+    Attributes:
+        in_progress (int): 1 if the word is visible and has been answered
+            correctly at least once.
+        learned (int): 1 if the word has been hidden after being learned.
+    """
+    in_progress: int = 0
+    learned: int = 0
+
+
+def get_learned_interval_days() -> float:
+    """Returns the interval from which the scheduler considers a word
+    learned."""
+    return float(CHATBOT_DATA['scheduler']['learned_interval_days'])
+
+
+def get_word_progress(user_word_setting: UserWordSetting | None) \
+        -> WordProgress:
+    """Returns what the setting counts towards in the user's aggregates.
+
+    A hidden word is learned if the scheduler hid it, i.e. its interval
+    reached the learned interval; otherwise the user hid it.
+    """
+    if user_word_setting is None:
+        return WordProgress()
+
+    if user_word_setting.is_hidden:
+        return WordProgress(learned=int(
+            (user_word_setting.interval_days or 0)
+            >= get_learned_interval_days()
+        ))
+
+    return WordProgress(
+        in_progress=int((user_word_setting.correct_answers or 0) > 0)
+    )
+
+
+def change_user_stats(
+        session: Session,
+        user_id: int,
+        words_added: int = 0,
+        before: WordProgress = WordProgress(),
+        after: WordProgress = WordProgress()
+) -> None:
+    """Updates the user's aggregates after a change of their words.
+
+    The update is part of the caller's transaction. Users without
+    aggregates are skipped, their aggregates are built on the first read.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        words_added (int): The number of added (or, if negative, deleted)
+            words of the user.
+        before (WordProgress): The progress of the changed setting before
+            the change.
+        after (WordProgress): Its progress after the change.
+    """
+    in_progress: int = after.in_progress - before.in_progress
+    learned: int = after.learned - before.learned
+    if not (words_added or in_progress or learned):
+        return
+
+    session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(
+            words_added=UserStats.words_added + words_added,
+            words_in_progress=UserStats.words_in_progress + in_progress,
+            words_learned=UserStats.words_learned + learned
+        )
+    )
+
+
+def record_answer_stats(
+        session: Session,
+        user_id: int,
+        is_correct: bool,
+        before: WordProgress,
+        after: WordProgress,
+        today: date | None = None
+) -> None:
+    """Counts the user's answer in the daily answers and the aggregates.
+
+    Both are updated in place by single statements of the caller's
+    transaction, so concurrent answers are not lost.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        is_correct (bool): Whether the answer was correct.
+        before (WordProgress): The progress of the word before the answer.
+        after (WordProgress): Its progress after the answer.
+        today (date | None): The day of the answer; today by default.
+    """
+    today = today or date.today()
+    increment_counters(
+        session,
+        UserDailyAnswers.__table__,
+        {'user_id': user_id, 'day': today},
+        {'answers': 1, 'correct_answers': int(is_correct)}
+    )
+
+    answered_today = UserStats.last_answer_on == today
+    session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(
+            words_in_progress=(
+                UserStats.words_in_progress
+                + after.in_progress - before.in_progress
+            ),
+            words_learned=(
+                UserStats.words_learned + after.learned - before.learned
+            ),
+            answers=UserStats.answers + 1,
+            correct_answers=UserStats.correct_answers + int(is_correct),
+            active_days=UserStats.active_days + case(
+                (answered_today, 0), else_=1
+            ),
+            streak_days=case(
+                (answered_today, UserStats.streak_days),
+                (UserStats.last_answer_on == today - timedelta(days=1),
+                 UserStats.streak_days + 1),
+                else_=1
+            ),
+            answers_today=case(
+                (answered_today, UserStats.answers_today + 1), else_=1
+            ),
+            last_answer_on=today
+        )
+    )
+
+
+def get_user_stats(session: Session, user_id: int) -> UserStats:
+    """Returns the user's aggregates, building them on the first read."""
+    user_stats: UserStats | None = session.get(UserStats, user_id)
+    if user_stats is None:
+        rebuild_user_stats(session, [user_id])
+        session.commit()
+        user_stats = session.get(UserStats, user_id)
+
+    return user_stats
+
+
+def rebuild_user_stats(
+        session: Session, user_ids: list[int] | None = None
+) -> int:
+    """Recomputes the aggregates from the words, settings and daily answers.
+
+    Each source is read with one grouped query, so the rebuild does not
+    depend on the number of users. The caller commits.
+
+    Args:
+        session (Session): The database session.
+        user_ids (list[int] | None): The users to rebuild; all users if
+            None.
+
+    Returns:
+        int: The number of rebuilt users.
+    """
+    def of_users(query, column):
+        return query if user_ids is None else query.where(
+            column.in_(user_ids)
+        )
+
+    rows: dict[int, dict] = {
+        user_id: {
+            'user_id': user_id, 'words_added': 0, 'words_in_progress': 0,
+            'words_learned': 0, 'answers': 0, 'correct_answers': 0,
+            'active_days': 0, 'streak_days': 0, 'answers_today': 0,
+            'last_answer_on': None,
+        }
+        for user_id in session.scalars(of_users(select(User.id), User.id))
+    }
+
+    for user_id, words_added in session.execute(of_users(
+            select(Word.user_id, func.count())
+            .where(Word.user_id.is_not(None))
+            .group_by(Word.user_id),
+            Word.user_id
+    )):
+        rows[user_id]['words_added'] = words_added
+
+    is_hidden = UserWordSetting.is_hidden.is_(True)
+    for user_id, in_progress, learned in session.execute(of_users(
+            select(
+                UserWordSetting.user_id,
+                func.sum(case((and_(
+                    UserWordSetting.is_hidden.is_not(True),
+                    UserWordSetting.correct_answers > 0
+                ), 1), else_=0)),
+                func.sum(case((and_(
+                    is_hidden,
+                    UserWordSetting.interval_days
+                    >= get_learned_interval_days()
+                ), 1), else_=0))
+            )
+            .group_by(UserWordSetting.user_id),
+            UserWordSetting.user_id
+    )):
+        rows[user_id]['words_in_progress'] = in_progress
+        rows[user_id]['words_learned'] = learned
+
+    # The streak counts consecutive days back from the last answer day
+    streak_day: dict[int, date | None] = {}
+    for user_id, day, answers, correct_answers in session.execute(of_users(
+            select(
+                UserDailyAnswers.user_id, UserDailyAnswers.day,
+                UserDailyAnswers.answers, UserDailyAnswers.correct_answers
+            )
+            .order_by(UserDailyAnswers.user_id, UserDailyAnswers.day.desc()),
+            UserDailyAnswers.user_id
+    )):
+        row: dict = rows[user_id]
+        row['answers'] += answers
+        row['correct_answers'] += correct_answers
+        row['active_days'] += 1
+
+        if user_id not in streak_day:
+            row.update(last_answer_on=day, answers_today=answers,
+                       streak_days=1)
+            streak_day[user_id] = day
+        elif streak_day[user_id] == day + timedelta(days=1):
+            row['streak_days'] += 1
+            streak_day[user_id] = day
+        else:
+            streak_day[user_id] = None
+
+    session.execute(of_users(delete(UserStats), UserStats.user_id))
+    values: list[dict] = list(rows.values())
+    for start in range(0, len(values), REBUILD_CHUNK_SIZE):
+        insert_ignoring_conflicts(
+            session, UserStats.__table__,
+            values[start:start + REBUILD_CHUNK_SIZE], ['user_id']
+        )
+
+    return len(values)
@@ -1,31 +1,100 @@
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from telebot import types
+from ...db.db_operations import ON_CONFLICT_DIALECTS
 from ...db.models import User
-from ..bot_config import SESSION
+from ..bot_config import APP
+from ..cache import get_user_id_cache
+
+logger = logging.getLogger(__name__)
 
 
-def check_user_in_db(session: SESSION, message: types.Message) -> User | None:
+def check_user_in_db(session: Session, message: types.Message) -> User | None:
     """Checks if the user is already in the database"""
     return session.query(User).filter_by(tg_id=message.chat.id).first()
 
 
-def get_user_id(session: SESSION, message: types.Message) -> int | None:
-    """Retrieve the user ID from the database based on the provided message."""
-    user: User = check_user_in_db(session, message)
-    return user.id if user else None
+def get_user_id(session: Session, message: types.Message) -> int:
+    """Resolves the internal user ID of the message's user.
+
+    Known users are answered from memory, unknown ones are registered.
+    """
+    user_id: int | None = get_user_id_cache().get(message.chat.id)
+    return user_id if user_id is not None else register_user(session, message)
+
+
+def find_user_id(session: Session, tg_id: int) -> int | None:
+    """Returns the internal ID of a known user without registering them.
+
+    Returns:
+        int | None: The ID of the user; None if they have not started the
+            bot.
+    """
+    user_id: int | None = get_user_id_cache().get(tg_id)
+    if user_id is None:
+        user_id = session.scalar(select(User.id).where(User.tg_id == tg_id))
+        if user_id is not None:
+            get_user_id_cache().put(tg_id, user_id)
+
+    return user_id
+
 
+def register_user(session: Session, message: types.Message) -> int:
+    """Registers the message's user unless they exist and caches their ID.
 
-def add_new_user(session: SESSION, message: types.Message) -> None:
-    """Add a new user to the database"""
-    new_user = User(tg_id=message.chat.id)
-    session.merge(new_user)
+    Returns:
+        int: The internal ID of the user.
+    """
+    user_id: int = upsert_user(session, message.chat.id)
     session.commit()
+    get_user_id_cache().put(message.chat.id, user_id)
+
+    return user_id
+
+
+def upsert_user(session: Session, tg_id: int) -> int:
+    """Adds the user unless they exist and returns their ID.
+
+    PostgreSQL and SQLite do it atomically with
+    ``INSERT ... ON CONFLICT (tg_id) DO UPDATE ... RETURNING id``; the no-op
+    update makes the statement return the ID of an existing user too.
+    """
+    insert = ON_CONFLICT_DIALECTS.get(session.get_bind().dialect.name)
+    if insert is not None:
+        statement = insert(User).values(tg_id=tg_id)
+        return session.scalar(
+            statement
+            .on_conflict_do_update(
+                index_elements=[User.tg_id],
+                set_={'tg_id': statement.excluded.tg_id}
+            )
+            .returning(User.id)
+        )
+
+    user_id: int | None = session.scalar(
+        select(User.id).where(User.tg_id == tg_id)
+    )
+    if user_id is None:
+        user = User(tg_id=tg_id)
+        session.add(user)
+        session.flush()
+        user_id = user.id
+
+    return user_id
 
 
 def handle_new_user(message: types.Message) -> None:
-    """Handles the case when a new user is added to the database."""
+    """Handles the case when a new user is added to the database.
+
+    A session is only opened for users who are not known yet.
+    """
+    if get_user_id_cache().get(message.chat.id) is not None:
+        return
+
     try:
-        with SESSION as session:
-            check_user_in_db(session, message) or \
-             add_new_user(session, message)
-    except Exception as e:
-        print(e)
+        with APP.session_factory() as session:
+            register_user(session, message)
+    except Exception:
+        logger.exception('Failed to register user %s', message.chat.id)
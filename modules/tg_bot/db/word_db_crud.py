@@ -1,40 +1,133 @@
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from telebot import types
 
+from ...db.db_operations import ON_CONFLICT_DIALECTS
 from ...db.models import UserWordSetting, Word
-from ..bot_config import SESSION
-from ..bot_init import bot
-from ..db import word_exists_in_db
+from ..cache import get_vocabulary_cache, get_word_search
+from ..db import get_user_word_setting, word_exists_in_db
+from .stats_db_utils import WordProgress, change_user_stats, get_word_progress
+from ..outbound import send_message
 
 
 def add_word_to_db(
-        session: SESSION,
+        session: Session,
         word: str,
         translation: str,
         user_id: int,
-        message: types.Message
-) -> None:
-    """Add a word to the database"""
+        message: types.Message | None = None
+) -> bool:
+    """Add a word to the database
+
+    Returns:
+        bool: True if the word was added, False if it is already in the
+            user's dictionary. The user is told about the latter when the
+            message is given.
+    """
     try:
-        word_obj: Word = Word(
-            word=word, user_id=user_id, translation=translation
+        added: bool = bool(
+            add_words_to_db(session, user_id, [(word, translation)])
         )
-        user_word_setting_obj: UserWordSetting = UserWordSetting(
-            user_id=user_id, word=word_obj
+    except IntegrityError:
+        added = False
+
+    if not added and message is not None:
+        send_message(
+            message.chat.id,
+            f'Слово {word} уже добавлено в вашем словаре.'
         )
+    return added
+
+
+def add_words_to_db(
+        session: Session, user_id: int, words: list[tuple[str, str]]
+) -> set[str]:
+    """Adds the words with their settings to the user's dictionary.
+
+    The words are inserted with one batched statement and their settings
+    with another, in one transaction. On PostgreSQL and SQLite the insert
+    skips the words the user already has by the unique
+    ``(user_id, lower(word))`` index with ``ON CONFLICT DO NOTHING`` and
+    returns the IDs of the inserted ones; other databases read the IDs
+    back with one query on the index.
 
-        session.add_all([word_obj, user_word_setting_obj])
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        words (list[tuple[str, str]]): The words and their translations.
+
+    Returns:
+        set[str]: The inserted words in lowercase; the others were already
+            in the user's dictionary or repeated in the list.
+
+    Raises:
+        IntegrityError: If the words cannot be inserted on a database
+            without ``ON CONFLICT``; the transaction is rolled back.
+    """
+    if not words:
+        return set()
+
+    rows: list[dict] = [
+        {'word': word, 'translation': translation, 'user_id': user_id}
+        for word, translation in words
+    ]
+    try:
+        upsert = ON_CONFLICT_DIALECTS.get(session.get_bind().dialect.name)
+        if upsert is not None:
+            word_ids: dict[str, int] = {
+                word.lower(): word_id
+                for word_id, word in session.execute(
+                    upsert(Word).values(rows)
+                    .on_conflict_do_nothing(
+                        index_elements=[Word.user_id, func.lower(Word.word)]
+                    )
+                    .returning(Word.id, Word.word)
+                )
+            }
+        else:
+            session.execute(insert(Word), rows)
+            word_ids = dict(session.execute(
+                select(func.lower(Word.word), Word.id).where(
+                    Word.user_id == user_id,
+                    func.lower(Word.word).in_(
+                        {word.lower() for word, _ in words}
+                    )
+                )
+            ).all())
+
+        if word_ids:
+            session.execute(insert(UserWordSetting), [
+                {'user_id': user_id, 'word_id': word_id}
+                for word_id in word_ids.values()
+            ])
+            change_user_stats(session, user_id, words_added=len(word_ids))
         session.commit()
     except IntegrityError:
         session.rollback()
-        bot.send_message(
-            message.chat.id,
-            f'Слово {word} уже добавлено в вашем словаре.'
-        )
+        raise
 
+    # The first of the words repeated in the list is the inserted one
+    first: dict[str, tuple[str, str]] = {}
+    for word, translation in words:
+        first.setdefault(word.lower(), (word, translation))
+    for key, (word, translation) in first.items():
+        if key in word_ids:
+            get_vocabulary_cache().add_word(
+                user_id, word_ids[key], word, translation
+            )
+            get_word_search().add_word(
+                user_id, word_ids[key], word, translation
+            )
 
-def delete_word_from_db(session: SESSION, word_obj: Word) -> None:
+    return set(word_ids)
+
+
+def delete_word_from_db(session: Session, word_obj: Word) -> None:
     """Delete a word from the database"""
+    word_id, owner_id = word_obj.id, word_obj.user_id
     user_word_setting_obj: UserWordSetting = (
         session
         .query(UserWordSetting)
@@ -46,25 +139,72 @@ def delete_word_from_db(session: SESSION, word_obj: Word) -> None:
         session.delete(user_word_setting_obj)
 
     session.delete(word_obj)
+    change_user_stats(
+        session, owner_id, words_added=-1,
+        before=get_word_progress(user_word_setting_obj)
+    )
     session.commit()
+    get_vocabulary_cache().remove_word(owner_id, word_id)
+    get_word_search().remove_word(owner_id, word_id)
 
 
-def remove_word_from_view(session: SESSION, user_id: int, word: str) -> None:
+def remove_word_from_view(session: Session, user_id: int, word: str) -> None:
     """Remove a word from the view"""
     word_id: int = word_exists_in_db(session, word).id
-    existing_setting: UserWordSetting = (
-        session
-        .query(UserWordSetting)
-        .filter_by(user_id=user_id, word_id=word_id)
-        .first()
+    existing_setting: UserWordSetting = get_user_word_setting(
+        session, user_id, word_id
+    )
+    progress: WordProgress = get_word_progress(existing_setting)
+    existing_setting.is_hidden = True
+    existing_setting.due_at = None
+    change_user_stats(
+        session, user_id,
+        before=progress, after=get_word_progress(existing_setting)
     )
 
-    if existing_setting:
-        existing_setting.is_hidden = True
-    else:
-        hidden_setting: UserWordSetting = UserWordSetting(
-            user_id=user_id, word_id=word_id, is_hidden=True
-        )
-        session.add(hidden_setting)
+    session.commit()
+    get_vocabulary_cache().change_word_visibility(user_id, word_id)
+
+
+def return_word_to_view(
+        session: Session, user_id: int, user_word_setting_id: int
+) -> str | None:
+    """Makes the user's hidden word visible and due for review right away.
+
+    The word starts its review schedule over; its ease is kept.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        user_word_setting_id (int): The ID of the user's word setting.
+
+    Returns:
+        str | None: The word, or None if the setting is not a hidden word
+            of the user.
+    """
+    row = session.execute(
+        select(UserWordSetting, Word.word)
+        .join(Word, Word.id == UserWordSetting.word_id)
+        .where(UserWordSetting.id == user_word_setting_id,
+               UserWordSetting.user_id == user_id,
+               UserWordSetting.is_hidden.is_(True))
+    ).first()
+    if row is None:
+        return None
+
+    user_word_setting, word = row
+    progress: WordProgress = get_word_progress(user_word_setting)
+    user_word_setting.is_hidden = False
+    user_word_setting.due_at = datetime.now()
+    user_word_setting.repetitions = 0
+    user_word_setting.interval_days = 0
+    change_user_stats(
+        session, user_id,
+        before=progress, after=get_word_progress(user_word_setting)
+    )
 
     session.commit()
+    get_vocabulary_cache().change_word_visibility(
+        user_id, user_word_setting.word_id
+    )
+    return word
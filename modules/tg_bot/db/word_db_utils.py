@@ -1,9 +1,28 @@
-from sqlalchemy import func, or_
+from typing import NamedTuple
+
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.orm import Session
 from ...db import UserWordSetting, Word
-from ..bot_config import SESSION
+from ...db.db_operations import insert_ignoring_conflicts
+from ...db.models import word_category
+from ..cache import get_vocabulary_cache
+
+HIDDEN_WORDS_PAGE_SIZE = 10
+
+
+class HiddenWordsPage(NamedTuple):
+    """A page of the user's hidden words.
+
+    Attributes:
+        words (list): Rows with the setting ID, word and translation.
+        has_more (bool): Whether there are more words beyond the page in
+            the direction it was fetched.
+    """
+    words: list
+    has_more: bool
 
 
-def word_exists_in_db(session: SESSION, word: str) -> Word | None:
+def word_exists_in_db(session: Session, word: str) -> Word | None:
     """Checks if a word exists in the database.
 
     Args:
@@ -17,11 +36,14 @@ def word_exists_in_db(session: SESSION, word: str) -> Word | None:
 
 
 def get_word_by_user_id(
-        session: SESSION, word: str, user_id: int
+        session: Session, word: str, user_id: int
 ) -> Word | None:
     """Retrieves a Word object from the database based on the provided word
     and user ID.
 
+    The user's cached vocabulary answers misses without a query and turns
+    hits into a primary key lookup.
+
     Args:
         session: The database session to use for the query.
         word (str): The word to search for in the database.
@@ -30,6 +52,11 @@ def get_word_by_user_id(
     Returns:
         Word | None: The Word object if found, otherwise None.
     """
+    vocabulary = get_vocabulary_cache().lookup(session, user_id)
+    if vocabulary is not None:
+        word_id: int | None = vocabulary.find_user_word(word)
+        return session.get(Word, word_id) if word_id else None
+
     filter_condition: tuple = (
         func.lower(Word.word) == func.lower(word),
         Word.user_id == user_id
@@ -37,14 +64,44 @@ def get_word_by_user_id(
     return session.query(Word).filter(*filter_condition).first()
 
 
-def get_all_user_words(session: SESSION, user_id: int) -> list[Word]:
+def find_user_words(session: Session, user_id: int, words: list[str]) \
+        -> set[str]:
+    """Returns which of the words are already in the user's own words.
+
+    The user's cached vocabulary answers without a query; otherwise all the
+    words are looked up in one query on the ``(user_id, lower(word))``
+    index.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        words (list[str]): The words to look up.
+
+    Returns:
+        set[str]: The lowercase words the user already has.
+    """
+    lowered: set[str] = {word.lower() for word in words}
+    if not lowered:
+        return set()
+
+    vocabulary = get_vocabulary_cache().lookup(session, user_id)
+    if vocabulary is not None:
+        return {word for word in lowered if vocabulary.find_user_word(word)}
+
+    return set(session.scalars(
+        select(func.lower(Word.word))
+        .where(Word.user_id == user_id, func.lower(Word.word).in_(lowered))
+    ))
+
+
+def get_all_user_words(session: Session, user_id: int) -> list[Word]:
     """Retrieves all words for a specific user.
 
     This function queries the database to retrieve all words that are
     assigned to a given user or have no user assigned.
 
     Args:
-        session (SESSION): The database session.
+        session (Session): The database session.
         user_id (int): The ID of the user.
 
     Returns:
@@ -55,55 +112,119 @@ def get_all_user_words(session: SESSION, user_id: int) -> list[Word]:
     return session.query(Word).filter(user_id_condition).all()
 
 
-def get_hidden_word_settings(session: SESSION, user_id: int) \
-        -> list[UserWordSetting]:
-    """Retrieves the hidden word settings for a specific user.
+def hidden_words_page_query(
+        user_id: int, anchor_id: int | None, direction: str, limit: int
+):
+    """Builds the keyset query of a page of the user's hidden words.
+
+    One extra row is selected to tell if there are more words; see
+    ``get_hidden_words_page``.
+    """
+    key = tuple_(Word.word, UserWordSetting.id)
+    query = (
+        select(UserWordSetting.id, Word.word, Word.translation)
+        .join(Word, Word.id == UserWordSetting.word_id)
+        .where(UserWordSetting.user_id == user_id,
+               UserWordSetting.is_hidden.is_(True))
+        .limit(limit + 1)
+    )
+
+    if anchor_id is not None:
+        anchor_key = tuple_(
+            select(Word.word)
+            .join(UserWordSetting, UserWordSetting.word_id == Word.id)
+            .where(UserWordSetting.id == anchor_id)
+            .scalar_subquery(),
+            anchor_id
+        )
+        query = query.where({
+            'after': key > anchor_key,
+            'before': key < anchor_key,
+            'from': key >= anchor_key,
+        }[direction])
+
+    if direction == 'before':
+        return query.order_by(Word.word.desc(), UserWordSetting.id.desc())
+
+    return query.order_by(Word.word, UserWordSetting.id)
+
+
+def get_hidden_words_page(
+        session: Session,
+        user_id: int,
+        anchor_id: int | None = None,
+        direction: str = 'after',
+        limit: int = HIDDEN_WORDS_PAGE_SIZE
+) -> HiddenWordsPage:
+    """Fetches a page of the user's hidden words ordered by word.
 
-    This function queries the database to retrieve the word settings that are
-    marked as hidden for a given user.
+    The page is found by keyset pagination on ``(word, setting ID)``
+    relative to the anchor setting, so deep pages cost the same as the
+    first one. The words, the anchor's key and one extra row telling if
+    there are more words are fetched in one joined query that selects only
+    the columns shown.
 
     Args:
-        session (SESSION): The database session.
+        session (Session): The database session.
         user_id (int): The ID of the user.
+        anchor_id (int | None): The setting the page starts from; None for
+            the first page.
+        direction (str): 'after' or 'before' the anchor, or 'from' it
+            inclusive.
+        limit (int): The maximum number of words on the page.
 
     Returns:
-        list[UserWordSetting]: A list of hidden word settings for the user.
+        HiddenWordsPage: The words in order and whether there are more in
+            the direction of the page.
     """
-    return (
-        session
-        .query(UserWordSetting)
-        .filter_by(user_id=user_id, is_hidden=True)
-    )
+    rows: list = session.execute(
+        hidden_words_page_query(user_id, anchor_id, direction, limit)
+    ).all()
+    words: list = rows[:limit]
+    if direction == 'before':
+        words.reverse()
+
+    return HiddenWordsPage(words, len(rows) > limit)
 
 
-def get_user_word_setting(session: SESSION, user_id: int, word_id: int) \
+def get_user_word_setting(session: Session, user_id: int, word_id: int) \
         -> UserWordSetting:
     """Retrieves or creates the user's word setting.
 
     This function retrieves the user's word setting for a given word.
-    If the setting does not exist, it creates a new one with default values.
+    If the setting does not exist, it creates a new one with default values
+    and the category of the word.
+    The insert skips the row on a unique conflict, so concurrent handlers
+    end up with the same setting instead of creating two.
 
     Args:
-        session (SESSION): The database session.
+        session (Session): The database session.
         user_id (int): The ID of the user.
         word_id (int): The ID of the word.
 
     Returns:
         UserWordSetting: The user's word setting.
     """
-    user_word_setting: UserWordSetting = (
+    settings_query = (
         session
         .query(UserWordSetting)
         .filter_by(user_id=user_id, word_id=word_id)
-        .first()
     )
+    user_word_setting: UserWordSetting | None = settings_query.first()
 
     if user_word_setting is None:
-        user_word_setting = UserWordSetting(
-            user_id=user_id, word_id=word_id,
-            correct_answers=0, is_hidden=False
+        insert_ignoring_conflicts(
+            session,
+            UserWordSetting.__table__,
+            [{
+                'user_id': user_id,
+                'word_id': word_id,
+                'category_id': word_category(word_id),
+            }],
+            ['user_id', 'word_id']
         )
-        session.add(user_word_setting)
         session.commit()
+        user_word_setting = settings_query.one()
+        get_vocabulary_cache().schedule_word(user_id, word_id)
 
     return user_word_setting
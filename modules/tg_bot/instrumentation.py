@@ -0,0 +1,386 @@
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import telebot
+from sqlalchemy import Engine, event
+from telebot import apihelper
+
+from ..db import PoolMetrics
+from .cache import get_vocabulary_cache
+from .metrics import (
+    REGISTRY, Counter, Histogram, MetricsRegistry, render_gauge
+)
+from .query_budget import QUERY_BUDGETS, count_handler_queries
+
+logger = logging.getLogger(__name__)
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+HANDLER_LATENCY = REGISTRY.register(Histogram(
+    'bot_handler_duration_seconds',
+    'Time spent in update handlers.',
+    ('handler', 'kind')
+))
+HANDLER_ERRORS = REGISTRY.register(Counter(
+    'bot_handler_errors_total',
+    'Update handlers that raised an exception.',
+    ('handler', 'kind')
+))
+API_LATENCY = REGISTRY.register(Histogram(
+    'bot_api_request_duration_seconds',
+    'Duration of Telegram Bot API requests.',
+    ('method',)
+))
+API_REQUESTS = REGISTRY.register(Counter(
+    'bot_api_requests_total',
+    'Telegram Bot API requests by result: ok, the error code or error.',
+    ('method', 'status')
+))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    'db_query_duration_seconds',
+    'Duration of SQL statements by their first keyword.',
+    ('statement',)
+))
+DB_SLOW_QUERIES = REGISTRY.register(Counter(
+    'db_slow_queries_total',
+    'SQL statements slower than the slow query threshold.',
+    ('statement',)
+))
+
+
+def instrument_handler(function: Callable, kind: str) -> Callable:
+    """Wraps a handler to record its latency, errors and SQL statements.
+
+    The statements are checked against the budget declared with
+    ``query_budget``.
+
+    Args:
+        function (Callable): The handler.
+        kind (str): The kind of the handler: 'message', 'callback_query',
+            'inline_query' or 'next_step'.
+
+    Returns:
+        Callable: The wrapper, which keeps the handler's signature so the
+            bot passes it the same arguments.
+    """
+    name: str = function.__name__
+    budget: int | None = getattr(function, 'query_budget', None)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started_at: float = time.perf_counter()
+        try:
+            with QUERY_BUDGETS.track(name, budget):
+                return function(*args, **kwargs)
+        except Exception:
+            HANDLER_ERRORS.inc(name, kind)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(
+                time.perf_counter() - started_at, name, kind
+            )
+
+    return wrapper
+
+
+class InstrumentedTeleBot(telebot.TeleBot):
+    """TeleBot recording the latency and errors of every handler.
+
+    Message, callback query and inline query handlers are wrapped when they
+    are registered; next step handlers are wrapped once, when the
+    conversation steps are registered with the next step backend.
+    """
+
+    def add_message_handler(self, handler_dict: dict) -> None:
+        handler_dict['function'] = instrument_handler(
+            handler_dict['function'], 'message'
+        )
+        super().add_message_handler(handler_dict)
+
+    def add_callback_query_handler(self, handler_dict: dict) -> None:
+        handler_dict['function'] = instrument_handler(
+            handler_dict['function'], 'callback_query'
+        )
+        super().add_callback_query_handler(handler_dict)
+
+    def add_inline_handler(self, handler_dict: dict) -> None:
+        handler_dict['function'] = instrument_handler(
+            handler_dict['function'], 'inline_query'
+        )
+        super().add_inline_handler(handler_dict)
+
+
+def observe_api_request(method: str, error: Exception | None,
+                        seconds: float) -> None:
+    """Records a Bot API request and its result.
+
+    Errors returned by Telegram are counted by their code, network and other
+    errors as 'error'.
+    """
+    if error is None:
+        status: str = 'ok'
+    elif getattr(error, 'error_code', None) is not None:
+        status = str(error.error_code)
+    else:
+        status = 'error'
+
+    API_REQUESTS.inc(method, status)
+    API_LATENCY.observe(seconds, method)
+
+
+def instrument_bot_api() -> None:
+    """Times every request of the sync Bot API client.
+
+    The client has no hook around its requests, so its request function is
+    wrapped. Calling this again has no effect.
+    """
+    make_request = apihelper._make_request
+    if getattr(make_request, 'instrumented', False):
+        return
+
+    @functools.wraps(make_request)
+    def timed_request(token, method_name, *args, **kwargs):
+        started_at: float = time.perf_counter()
+        error: Exception | None = None
+        try:
+            return make_request(token, method_name, *args, **kwargs)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            observe_api_request(
+                method_name, error, time.perf_counter() - started_at
+            )
+
+    timed_request.instrumented = True
+    apihelper._make_request = timed_request
+
+
+def statement_kind(statement: str) -> str:
+    """Returns the first keyword of an SQL statement."""
+    keyword: str = statement.lstrip().split(None, 1)[0].upper() \
+        if statement.strip() else ''
+    if keyword in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'):
+        return keyword
+
+    return 'OTHER'
+
+
+def instrument_engine(engine: Engine, slow_query_seconds: float) -> None:
+    """Records the duration of every statement executed by the engine.
+
+    Statements slower than ``slow_query_seconds`` are logged with their SQL
+    and counted.
+    """
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(connection, cursor, statement, *args) -> None:
+        connection.info.setdefault('query_started_at', []).append(
+            time.perf_counter()
+        )
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def finish_query(connection, cursor, statement, *args) -> None:
+        elapsed: float = (
+            time.perf_counter() - connection.info['query_started_at'].pop()
+        )
+        kind: str = statement_kind(statement)
+        DB_QUERY_LATENCY.observe(elapsed, kind)
+
+        if elapsed >= slow_query_seconds:
+            DB_SLOW_QUERIES.inc(kind)
+            logger.warning('Slow query (%.3f s): %s', elapsed, statement)
+
+    @event.listens_for(engine, 'handle_error')
+    def fail_query(context) -> None:
+        connection = context.connection
+        if connection is not None and connection.info.get(
+                'query_started_at'
+        ):
+            connection.info['query_started_at'].pop()
+
+
+def collect_outbound(dispatcher) -> Callable[[], list[str]]:
+    """Returns a collector of the outbound dispatcher counters."""
+    def collect() -> list[str]:
+        stats: dict = dispatcher.stats()
+        lines: list[str] = [
+            '# HELP bot_outbound_messages_total Outgoing messages by outcome.',
+            '# TYPE bot_outbound_messages_total counter',
+        ]
+        for outcome in dispatcher.counters:
+            lines.append(
+                f'bot_outbound_messages_total{{outcome="{outcome}"}} '
+                f'{stats[outcome]}'
+            )
+        lines += render_gauge(
+            'bot_outbound_queue_depth', 'Messages waiting to be sent.',
+            stats['queue_depth']
+        )
+        return lines
+
+    return collect
+
+
+def collect_cluster(cluster) -> Callable[[], list[str]]:
+    """Returns a collector of the worker process counters."""
+    def collect() -> list[str]:
+        lines: list[str] = [
+            '# HELP bot_worker_updates_total Updates handled by each worker '
+            'process by outcome.',
+            '# TYPE bot_worker_updates_total counter',
+        ]
+        busy: list[str] = [
+            '# HELP bot_worker_busy_seconds_total Time each worker process '
+            'spent handling updates.',
+            '# TYPE bot_worker_busy_seconds_total counter',
+        ]
+        restarts: list[str] = [
+            '# HELP bot_worker_restarts_total Restarts of each worker '
+            'process.',
+            '# TYPE bot_worker_restarts_total counter',
+        ]
+        queue_depth: list[str] = [
+            '# HELP bot_worker_queue_depth Updates waiting for each worker '
+            'process.',
+            '# TYPE bot_worker_queue_depth gauge',
+        ]
+        for worker in cluster.stats():
+            label: str = f'worker="{worker["worker"]}"'
+            for outcome in ('processed', 'failed', 'lost'):
+                lines.append(
+                    f'bot_worker_updates_total{{{label},outcome="{outcome}"}} '
+                    f'{worker[outcome]}'
+                )
+            busy.append(
+                f'bot_worker_busy_seconds_total{{{label}}} '
+                f'{worker["busy_us"] / 1_000_000:g}'
+            )
+            restarts.append(
+                f'bot_worker_restarts_total{{{label}}} {worker["restarts"]}'
+            )
+            queue_depth.append(
+                f'bot_worker_queue_depth{{{label}}} {worker["queue_depth"]}'
+            )
+
+        return lines + busy + restarts + queue_depth
+
+    return collect
+
+
+def collect_pool(pool_metrics: PoolMetrics) -> Callable[[], list[str]]:
+    """Returns a collector of the database connection pool occupancy."""
+    def collect() -> list[str]:
+        stats: dict[str, int] = pool_metrics.stats()
+        lines: list[str] = []
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            if name in stats:
+                lines += render_gauge(
+                    f'db_pool_{name}',
+                    f'Connection pool {name} of the bot engine.',
+                    stats[name]
+                )
+        return lines
+
+    return collect
+
+
+def collect_vocabulary_cache(cache) -> Callable[[], list[str]]:
+    """Returns a collector of the vocabulary cache counters and occupancy."""
+    def collect() -> list[str]:
+        stats: dict[str, int] = cache.stats()
+        lines: list[str] = [
+            '# HELP bot_vocabulary_cache_lookups_total Lookups of the user '
+            'vocabularies by result.',
+            '# TYPE bot_vocabulary_cache_lookups_total counter',
+            f'bot_vocabulary_cache_lookups_total{{result="hit"}} '
+            f'{stats["hits"]}',
+            f'bot_vocabulary_cache_lookups_total{{result="miss"}} '
+            f'{stats["misses"]}',
+            '# HELP bot_vocabulary_cache_evictions_total User vocabularies '
+            'evicted to respect the memory budget.',
+            '# TYPE bot_vocabulary_cache_evictions_total counter',
+            f'bot_vocabulary_cache_evictions_total {stats["evictions"]}',
+        ]
+        lines += render_gauge(
+            'bot_vocabulary_cache_entries', 'Cached user vocabularies.',
+            stats['entries']
+        )
+        lines += render_gauge(
+            'bot_vocabulary_cache_bytes',
+            'Approximate memory of the cached user vocabularies.',
+            stats['bytes']
+        )
+        lines += render_gauge(
+            'bot_vocabulary_base_words',
+            'Words of the base dictionary shared by the vocabularies.',
+            stats['base_words']
+        )
+        return lines
+
+    return collect
+
+
+def make_metrics_handler(registry: MetricsRegistry) \
+        -> type[BaseHTTPRequestHandler]:
+    """Creates the HTTP request handler class serving the registry."""
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+
+            body: bytes = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format, *args)
+
+    return MetricsRequestHandler
+
+
+def start_metrics_server(
+        host: str, port: int, registry: MetricsRegistry = REGISTRY
+) -> ThreadingHTTPServer:
+    """Serves ``/metrics`` in the Prometheus text format in a daemon
+    thread."""
+    httpd = ThreadingHTTPServer((host, port), make_metrics_handler(registry))
+    threading.Thread(
+        target=httpd.serve_forever, name='metrics-server', daemon=True
+    ).start()
+    logger.info('Metrics server listening on %s:%s/metrics',
+                *httpd.server_address[:2])
+    return httpd
+
+
+def start_metrics(
+        config: dict, engine: Engine, pool_metrics: PoolMetrics, dispatcher
+) -> None:
+    """Instruments the engine and serves the metrics.
+
+    The engine also counts the SQL statements of every handler run for the
+    query budgets.
+
+    Args:
+        config (dict): The METRICS section of the config. A PORT of 0
+            disables the metrics server; the metrics are still collected.
+        engine (Engine): The engine of the bot.
+        pool_metrics (PoolMetrics): The pool counters of the engine.
+        dispatcher: The outbound dispatcher of the bot.
+    """
+    instrument_engine(engine, float(config['slow_query_ms']) / 1000)
+    count_handler_queries(engine)
+    REGISTRY.add_collector(collect_outbound(dispatcher))
+    REGISTRY.add_collector(collect_pool(pool_metrics))
+    REGISTRY.add_collector(collect_vocabulary_cache(get_vocabulary_cache()))
+
+    if int(config['port']):
+        start_metrics_server(config['host'], int(config['port']))
@@ -0,0 +1,218 @@
+import threading
+from collections import deque
+from typing import Callable
+
+
+class LatencyStats:
+    """Collects latency samples and summarizes them.
+
+    Totals cover every observation, percentiles are computed over a sliding
+    window of the most recent samples.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._window: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Records one latency sample in seconds."""
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self._window.append(seconds)
+
+    def snapshot(self) -> dict[str, float]:
+        """Returns the count, mean, maximum and percentiles in seconds."""
+        with self._lock:
+            samples: list[float] = sorted(self._window)
+            count, total, maximum = self.count, self.total, self.max
+
+        return {
+            'count': count,
+            'avg': total / count if count else 0.0,
+            'max': maximum,
+            'p50': percentile(samples, 0.50),
+            'p95': percentile(samples, 0.95),
+            'p99': percentile(samples, 0.99),
+        }
+
+
+def percentile(sorted_samples: list[float], fraction: float) -> float:
+    """Returns the percentile of already sorted samples (nearest rank)."""
+    if not sorted_samples:
+        return 0.0
+
+    index: int = min(
+        len(sorted_samples) - 1, int(fraction * len(sorted_samples))
+    )
+    return sorted_samples[index]
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def format_labels(names: tuple[str, ...], values: tuple) -> str:
+    """Formats label pairs in the Prometheus text format."""
+    if not names:
+        return ''
+
+    pairs: list[str] = [
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n')
+        )
+        for name, value in zip(names, values)
+    ]
+    return '{' + ','.join(pairs) + '}'
+
+
+class Counter:
+    """A Prometheus counter with labels."""
+
+    def __init__(
+            self, name: str, documentation: str, labels: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        """Increments the counter of the label values."""
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount
+            )
+
+    def render(self) -> list[str]:
+        """Returns the counter in the Prometheus text format."""
+        with self._lock:
+            values: list[tuple[tuple, float]] = sorted(self._values.items())
+
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+            *(
+                f'{self.name}{format_labels(self.labels, label_values)} '
+                f'{value:g}'
+                for label_values, value in values
+            ),
+        ]
+
+
+class Histogram:
+    """A Prometheus histogram with labels and fixed buckets."""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # Label values to the per-bucket counts, the count and the sum
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values) -> None:
+        """Records one sample for the label values."""
+        with self._lock:
+            series: list = self._series.setdefault(
+                label_values, [[0] * len(self.buckets), 0, 0.0]
+            )
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += 1
+            series[2] += seconds
+
+    def render(self) -> list[str]:
+        """Returns the histogram in the Prometheus text format."""
+        with self._lock:
+            series: list[tuple[tuple, list]] = sorted(
+                (label_values, [list(counts), count, total])
+                for label_values, (counts, count, total)
+                in self._series.items()
+            )
+
+        lines: list[str] = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        bucket_labels: tuple[str, ...] = self.labels + ('le',)
+        for label_values, (counts, count, total) in series:
+            cumulative: int = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels: str = format_labels(
+                    bucket_labels, label_values + (f'{bound:g}',)
+                )
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(bucket_labels, label_values + ('+Inf',))
+            lines.append(f'{self.name}_bucket{labels} {count}')
+
+            labels = format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {total:g}')
+            lines.append(f'{self.name}_count{labels} {count}')
+
+        return lines
+
+
+def render_gauge(
+        name: str, documentation: str, value: float,
+        labels: tuple[str, ...] = (), label_values: tuple = ()
+) -> list[str]:
+    """Returns a single gauge sample in the Prometheus text format."""
+    return [
+        f'# HELP {name} {documentation}',
+        f'# TYPE {name} gauge',
+        f'{name}{format_labels(labels, label_values)} {value:g}',
+    ]
+
+
+class MetricsRegistry:
+    """Metrics exposed in the Prometheus text format.
+
+    Besides the registered counters and histograms, collectors are called
+    on every scrape to render values owned by other components, e.g. the
+    outbound queue depth.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def register(self, metric: Counter | Histogram) -> Counter | Histogram:
+        """Adds a metric to the registry and returns it."""
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        """Adds a function returning lines of the text format."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Returns all the metrics in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,486 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, NamedTuple
+
+from telebot.apihelper import ApiTelegramException
+
+from .bot_config import APP, OUTBOUND
+from .bot_init import get_bot
+from .metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+SEND_MESSAGE = 'send_message'
+# The description of the 400 response to an edit that changes nothing,
+# e.g. when a page button is pressed twice
+MESSAGE_NOT_MODIFIED = 'message is not modified'
+# How often the per-chat buckets of idle chats are dropped, in seconds
+BUCKET_SWEEP_INTERVAL = 60.0
+# Answers the user is waiting for with a spinner, sent ahead of the chats'
+# queues
+PRIORITY_METHODS = frozenset({'answer_callback_query', 'answer_inline_query'})
+
+
+class OutgoingMessage(NamedTuple):
+    """A message or another Bot API call waiting to be sent.
+
+    Attributes:
+        chat_id (int): The ID of the recipient chat.
+        text (str): The text of the message.
+        reply_markup (Any): The keyboard attached to the message.
+        enqueued_at (float): The monotonic time the message was queued at.
+        attempts (int): The number of failed send attempts.
+        method (str): The bot method making the call, ``send_message`` for
+            a message.
+        params (dict | None): The keyword arguments of a call other than
+            ``send_message``.
+    """
+    chat_id: int
+    text: str
+    reply_markup: Any = None
+    enqueued_at: float = 0.0
+    attempts: int = 0
+    method: str = SEND_MESSAGE
+    params: dict | None = None
+
+    @property
+    def is_message(self) -> bool:
+        """Whether the call sends a new message to the chat."""
+        return self.method == SEND_MESSAGE
+
+    @property
+    def is_priority(self) -> bool:
+        """Whether the call answers a callback or inline query."""
+        return self.method in PRIORITY_METHODS
+
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float): The maximum number of stored tokens (burst size).
+    """
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Returns how long to wait for a token, 0 if one is available."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        """Takes one token from the bucket."""
+        self.tokens -= 1
+
+
+def can_coalesce(first: OutgoingMessage, second: OutgoingMessage) -> bool:
+    """Checks if two consecutive messages to a chat can be sent as one.
+
+    A message with a keyboard closes the group, since the keyboard belongs to
+    its text; the merged text must fit into one Telegram message. Other API
+    calls are never merged.
+    """
+    return (
+        first.is_message and second.is_message
+        and first.reply_markup is None
+        and len(first.text) + len(second.text) + 2 <= MAX_MESSAGE_LENGTH
+    )
+
+
+def coalesce(first: OutgoingMessage, second: OutgoingMessage) \
+        -> OutgoingMessage:
+    """Merges two consecutive messages to the same chat."""
+    return first._replace(
+        text=f'{first.text}\n\n{second.text}',
+        reply_markup=second.reply_markup
+    )
+
+
+class OutboundQueue:
+    """Scheduling state of the outbound messages.
+
+    Messages are kept per chat in FIFO order. A chat is scheduled in a heap
+    by the time its next message may be sent; while a chat's message is in
+    flight the chat is not scheduled, so its messages are never reordered.
+    The class does no locking, the dispatchers guard it.
+
+    Edits keep their place among the chat's messages but are charged to
+    the global limit only, since Telegram's per-chat limit counts
+    messages; they do not linger either. Answers to callback and inline
+    queries go to a priority lane instead: the user's button or inline
+    query spins until they arrive, and they do not depend on the chat's
+    messages, so they are sent before any chat's queue, charged to the
+    global limit only. The buckets of the chats that are idle and have
+    refilled are dropped every ``BUCKET_SWEEP_INTERVAL`` seconds, as a
+    full bucket is the same as a new one.
+    """
+
+    def __init__(self, config: dict) -> None:
+        self.chat_rate = float(config['chat_rate'])
+        self.linger = float(config['linger'])
+        self.global_bucket = TokenBucket(
+            float(config['global_rate']), float(config['global_rate']),
+            time.monotonic()
+        )
+        self.depth = 0
+        self.coalesced = 0
+        self._pending: dict[int, deque[OutgoingMessage]] = {}
+        self._priority: list[tuple[float, int, OutgoingMessage]] = []
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._schedule: list[tuple[float, int, int]] = []
+        self._scheduled: set[int] = set()
+        self._sequence = itertools.count()
+        self._swept_at = time.monotonic()
+
+    def put(self, message: OutgoingMessage, now: float) -> None:
+        """Queues a message. The first message of an idle chat lingers for
+        a moment so that the following ones can be coalesced with it."""
+        if message.is_priority:
+            self._push_priority(message, now)
+            return
+
+        self._pending.setdefault(message.chat_id, deque()).append(message)
+        self.depth += 1
+
+        if message.chat_id not in self._scheduled:
+            self._push(
+                message.chat_id,
+                now + (self.linger if message.is_message else 0.0)
+            )
+
+    def take(self, now: float) -> OutgoingMessage | float | None:
+        """Takes the next message that may be sent now.
+
+        Returns:
+            OutgoingMessage | float | None: The message (possibly coalesced
+                from several queued ones), the seconds to wait before the
+                next message may be sent, or None if nothing is queued.
+        """
+        if now - self._swept_at >= BUCKET_SWEEP_INTERVAL:
+            self._sweep_buckets(now)
+
+        if self._priority and self._priority[0][0] <= now:
+            global_delay: float = self.global_bucket.delay(now)
+            if global_delay:
+                return global_delay
+
+            self.global_bucket.consume()
+            self.depth -= 1
+            return heapq.heappop(self._priority)[2]
+
+        item: OutgoingMessage | float | None = self._take_chat_message(now)
+        if self._priority and not isinstance(item, OutgoingMessage):
+            priority_delay: float = self._priority[0][0] - now
+            return priority_delay if item is None \
+                else min(item, priority_delay)
+        return item
+
+    def _take_chat_message(self, now: float) \
+            -> OutgoingMessage | float | None:
+        while self._schedule:
+            not_before, _, chat_id = self._schedule[0]
+            if not_before > now:
+                return not_before - now
+
+            is_message: bool = self._pending[chat_id][0].is_message
+            chat_bucket: TokenBucket | None = self._chat_buckets.get(chat_id)
+            if is_message and chat_bucket is None:
+                chat_bucket = self._chat_buckets[chat_id] = TokenBucket(
+                    self.chat_rate, 1, now
+                )
+            chat_delay: float = chat_bucket.delay(now) if is_message else 0.0
+            if chat_delay:
+                heapq.heapreplace(
+                    self._schedule,
+                    (now + chat_delay, next(self._sequence), chat_id)
+                )
+                continue
+
+            global_delay: float = self.global_bucket.delay(now)
+            if global_delay:
+                return global_delay
+
+            heapq.heappop(self._schedule)
+            if is_message:
+                chat_bucket.consume()
+            self.global_bucket.consume()
+            return self._pop_coalesced(chat_id)
+
+        return None
+
+    def done(self, message: OutgoingMessage, now: float) -> None:
+        """Marks the message as sent and schedules the chat's next one."""
+        if message.is_priority:
+            return
+
+        chat_id: int = message.chat_id
+        self._scheduled.discard(chat_id)
+        if self._pending.get(chat_id):
+            self._push(chat_id, now)
+        else:
+            self._pending.pop(chat_id, None)
+
+    def retry(self, message: OutgoingMessage, delay: float, now: float) \
+            -> None:
+        """Puts a failed message back in front of the chat's queue, or in
+        the priority lane."""
+        if message.is_priority:
+            self._push_priority(
+                message._replace(attempts=message.attempts + 1), now + delay
+            )
+            return
+
+        self._pending.setdefault(message.chat_id, deque()).appendleft(
+            message._replace(attempts=message.attempts + 1)
+        )
+        self.depth += 1
+        self._scheduled.discard(message.chat_id)
+        self._push(message.chat_id, now + delay)
+
+    def _sweep_buckets(self, now: float) -> None:
+        self._swept_at = now
+        for chat_id in [
+            chat_id for chat_id, bucket in self._chat_buckets.items()
+            if chat_id not in self._pending and not bucket.delay(now)
+        ]:
+            del self._chat_buckets[chat_id]
+
+    def _push_priority(self, message: OutgoingMessage, not_before: float) \
+            -> None:
+        heapq.heappush(
+            self._priority, (not_before, next(self._sequence), message)
+        )
+        self.depth += 1
+
+    def _push(self, chat_id: int, not_before: float) -> None:
+        self._scheduled.add(chat_id)
+        heapq.heappush(
+            self._schedule, (not_before, next(self._sequence), chat_id)
+        )
+
+    def _pop_coalesced(self, chat_id: int) -> OutgoingMessage:
+        pending: deque[OutgoingMessage] = self._pending[chat_id]
+        message: OutgoingMessage = pending.popleft()
+        self.depth -= 1
+
+        while pending and can_coalesce(message, pending[0]):
+            message = coalesce(message, pending.popleft())
+            self.depth -= 1
+            self.coalesced += 1
+
+        return message
+
+
+def classify_send_error(
+        error: Exception,
+        message: OutgoingMessage,
+        max_attempts: int,
+        api_error: type[Exception] = ApiTelegramException
+) -> tuple[str, float | None]:
+    """Decides what to do with a message whose sending failed.
+
+    A 429 response is retried after the ``retry_after`` the API asked for;
+    an edit that leaves the message as it is counts as sent; other API
+    errors (the bot was blocked, the chat was deleted) are final; network
+    errors are retried with exponential backoff up to ``max_attempts``
+    times.
+
+    Args:
+        error (Exception): The error raised by the send.
+        message (OutgoingMessage): The message or call that failed.
+        max_attempts (int): The number of attempts of a message.
+        api_error (type[Exception]): The class of Bot API errors of the
+            bot that sent the message.
+
+    Returns:
+        tuple[str, float | None]: The outcome counter name and the delay
+            before resending, or None if the message is dropped.
+    """
+    if isinstance(error, api_error):
+        if error.error_code == 429:
+            parameters: dict = (error.result_json or {}).get('parameters', {})
+            return 'rate_limited', float(parameters.get('retry_after', 1))
+        if MESSAGE_NOT_MODIFIED in error.description:
+            return 'sent', None
+    elif message.attempts + 1 < max_attempts:
+        return 'retried', 2.0 ** message.attempts
+
+    logger.warning(
+        'Call %s to chat %s dropped: %s',
+        message.method, message.chat_id, error
+    )
+    return 'failed', None
+
+
+class OutboundDispatcher:
+    """Central outbound message dispatcher of the threaded bot.
+
+    Handlers only queue messages and other Bot API calls; sender threads
+    deliver them respecting the per-chat and global rate limits, honour
+    retry_after of 429 responses and coalesce consecutive texts to the same
+    chat into one message.
+    """
+
+    def __init__(
+            self,
+            send_func: Callable[[OutgoingMessage], Any],
+            config: dict
+    ) -> None:
+        self.senders = int(config['senders'])
+        self.max_attempts = int(config['max_attempts'])
+        self.queue = OutboundQueue(config)
+        self.send_latency = LatencyStats()
+        self.api_latency = LatencyStats()
+        self.counters: dict[str, int] = dict.fromkeys(
+            ('queued', 'sent', 'rate_limited', 'retried', 'failed'), 0
+        )
+        self._send = send_func
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._started = False
+
+    def send_message(self, chat_id: int, text: str, reply_markup=None) \
+            -> None:
+        """Queues a message for sending."""
+        with self._condition:
+            self._start()
+            self.queue.put(
+                OutgoingMessage(chat_id, text, reply_markup, time.monotonic()),
+                time.monotonic()
+            )
+            self.counters['queued'] += 1
+            self._condition.notify()
+
+    def call(self, chat_id: int, method: str, /, **params) -> None:
+        """Queues a Bot API call other than sending a message.
+
+        Args:
+            chat_id (int): The chat the call belongs to; it is made after
+                the messages queued to the chat before it, except for the
+                answers to callback and inline queries, which go first.
+            method (str): The name of the bot method, e.g.
+                'edit_message_text'.
+            **params: The keyword arguments of the method.
+        """
+        with self._condition:
+            self._start()
+            now: float = time.monotonic()
+            self.queue.put(
+                OutgoingMessage(chat_id, '', None, now, 0, method, params),
+                now
+            )
+            self.counters['queued'] += 1
+            self._condition.notify()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Waits until all queued messages are sent.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self.queue.depth and not self._in_flight, timeout
+            )
+
+    def set_global_rate(self, rate: float) -> None:
+        """Changes the rate of messages to all chats, e.g. to share the bot
+        limit between several processes."""
+        with self._condition:
+            self.queue.global_bucket = TokenBucket(
+                rate, max(1.0, rate), time.monotonic()
+            )
+
+    def stats(self) -> dict:
+        """Returns the counters, queue depth and latency summaries."""
+        return {
+            **self.counters,
+            'coalesced': self.queue.coalesced,
+            'queue_depth': self.queue.depth,
+            'send_latency': self.send_latency.snapshot(),
+            'api_latency': self.api_latency.snapshot(),
+        }
+
+    def _start(self) -> None:
+        if self._started:
+            return
+
+        self._started = True
+        for index in range(self.senders):
+            threading.Thread(
+                target=self._run, name=f'outbound-{index}', daemon=True
+            ).start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                item = self.queue.take(time.monotonic())
+                while not isinstance(item, OutgoingMessage):
+                    self._condition.wait(item)
+                    item = self.queue.take(time.monotonic())
+                self._in_flight += 1
+
+            started_at: float = time.monotonic()
+            try:
+                self._send(item)
+                outcome, retry_after = 'sent', None
+            except Exception as e:
+                outcome, retry_after = classify_send_error(
+                    e, item, self.max_attempts
+                )
+            finished_at: float = time.monotonic()
+
+            with self._condition:
+                self._in_flight -= 1
+                self.counters[outcome] += 1
+                self.api_latency.observe(finished_at - started_at)
+                if retry_after is None:
+                    self.queue.done(item, finished_at)
+                else:
+                    self.queue.retry(item, retry_after, finished_at)
+                if outcome == 'sent':
+                    self.send_latency.observe(finished_at - item.enqueued_at)
+                self._condition.notify_all()
+
+
+def send_via_bot(message: OutgoingMessage) -> None:
+    """Sends the message or makes the API call with the threaded bot."""
+    if not message.is_message:
+        getattr(get_bot(), message.method)(**message.params)
+        return
+
+    get_bot().send_message(
+        message.chat_id, message.text, reply_markup=message.reply_markup
+    )
+
+
+def get_outbound_dispatcher() -> OutboundDispatcher:
+    """Returns the outbound dispatcher, creating it on first use."""
+    return APP.resource(
+        'outbound_dispatcher',
+        lambda: OutboundDispatcher(send_via_bot, OUTBOUND)
+    )
+
+
+def send_message(chat_id: int, text: str, reply_markup=None) -> None:
+    """Queues a message to the chat through the outbound dispatcher."""
+    get_outbound_dispatcher().send_message(chat_id, text, reply_markup)
+
+
+def call_bot_api(chat_id: int, method: str, /, **params) -> None:
+    """Queues a Bot API call of the chat through the outbound dispatcher."""
+    get_outbound_dispatcher().call(chat_id, method, **params)
@@ -0,0 +1,123 @@
+import contextlib
+import contextvars
+import logging
+from collections.abc import Iterator
+from typing import Callable
+
+from sqlalchemy import Engine, event
+
+from .metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+HANDLER_QUERIES = REGISTRY.register(Counter(
+    'bot_handler_queries_total',
+    'SQL statements issued by update handlers.',
+    ('handler',)
+))
+QUERY_BUDGET_BREACHES = REGISTRY.register(Counter(
+    'bot_query_budget_breaches_total',
+    'Handler runs that issued more SQL statements than their budget.',
+    ('handler',)
+))
+
+# The statements issued in the current handler run, None outside handlers
+_statements: contextvars.ContextVar[list[str] | None] = \
+    contextvars.ContextVar('handler_statements', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a handler exceeds its query budget."""
+
+
+class QueryBudgets:
+    """Checks the handler runs against their query budgets.
+
+    A budget is the number of SQL statements one run of the handler may
+    issue with cold caches, which makes N+1 queries visible: a handler
+    loading a relationship per row exceeds any fixed budget once the user
+    has enough rows. A breach is logged and counted; in strict mode, which
+    the budget check turns on, it also raises QueryBudgetExceeded.
+
+    Attributes:
+        strict (bool): Whether a breach raises.
+        peaks (dict[str, int]): The most statements a run of each handler
+            has issued.
+    """
+
+    def __init__(self) -> None:
+        self.strict = False
+        self.peaks: dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def track(self, name: str, limit: int | None) -> Iterator[list[str]]:
+        """Collects the statements issued while the handler runs.
+
+        The statements are checked against the budget when the handler
+        returns; a handler that raised is not checked.
+
+        Args:
+            name (str): The name of the handler.
+            limit (int | None): The budget; None only counts.
+
+        Yields:
+            list[str]: The statements issued so far.
+
+        Raises:
+            QueryBudgetExceeded: If the budget is exceeded in strict mode.
+        """
+        statements: list[str] = []
+        token: contextvars.Token = _statements.set(statements)
+        try:
+            yield statements
+        finally:
+            _statements.reset(token)
+            HANDLER_QUERIES.inc(name, amount=len(statements))
+            if len(statements) > self.peaks.get(name, 0):
+                self.peaks[name] = len(statements)
+
+        if limit is None or len(statements) <= limit:
+            return
+
+        QUERY_BUDGET_BREACHES.inc(name)
+        message: str = (
+            f'{name} issued {len(statements)} SQL statements, its budget is '
+            f'{limit}'
+        )
+        logger.warning('%s:\n%s', message, '\n'.join(statements))
+        if self.strict:
+            raise QueryBudgetExceeded(message)
+
+
+QUERY_BUDGETS = QueryBudgets()
+
+
+def query_budget(limit: int) -> Callable[[Callable], Callable]:
+    """Declares how many SQL statements a handler may issue per run.
+
+    The budget is enforced when the handler is registered with the
+    instrumented bot, which tracks its runs.
+    """
+    def decorator(function: Callable) -> Callable:
+        function.query_budget = limit
+        return function
+
+    return decorator
+
+
+def count_handler_queries(engine: Engine) -> None:
+    """Counts the statements the engine executes for the running handler.
+
+    Calling this again for the same engine has no effect.
+    """
+    if event.contains(engine, 'before_cursor_execute', record_statement):
+        return
+
+    event.listen(engine, 'before_cursor_execute', record_statement)
+
+
+def record_statement(connection, cursor, statement, *args) -> None:
+    """Adds the statement to those of the running handler, if any."""
+    statements: list[str] | None = _statements.get()
+    if statements is not None:
+        statements.append(statement)
@@ -1,4 +1,8 @@
-from .handle_quiz import handle_quiz
+from .handle_quiz import handle_quiz, show_quiz_categories
 from .quiz_validator import validate_and_feedback_user_answer
 
-__all__ = ['handle_quiz', 'validate_and_feedback_user_answer']
+__all__ = [
+    'handle_quiz',
+    'show_quiz_categories',
+    'validate_and_feedback_user_answer'
+]
@@ -1,153 +1,141 @@
-import random
-
 from telebot import types
 
-from ...db.models import Word, UserWordSetting
-from ..bot_config import SESSION
-from ..bot_init import bot
-from ..db import (
-    get_all_user_words,
-    get_hidden_word_settings,
-    get_user_word_setting,
-    get_user_id,
-    handle_new_user
-)
+from ..bot_config import APP, CHATBOT_BTNS, CHATBOT_CATEGORIES
+from ..bot_init import get_bot
+from ..db import QuizCard, get_quiz_categories, get_user_id
+from ..outbound import send_message
+from ..query_budget import query_budget
 from ..quiz.quiz_validator import validate_and_feedback_user_answer
-from ..ui import show_word_variant_menu
 from ..response_handlers import inform_user_of_word_change
+from ..ui import CATEGORY_PICKER_TEXT, create_category_keyboard
+from .prefetch import PrefetchedCard, prepare_card, take_prefetched_card
 
 
-@bot.message_handler(commands=['test_knowledge', 'next'])
-def handle_quiz(message: types.Message) -> None:
+@query_budget(7)
+def handle_quiz(message: types.Message, category_id: int | None = None) \
+        -> None:
     """Handles the 'test_knowledge' and 'next' commands.
 
     This function is responsible for testing the user's knowledge of words.
-    It selects a random word from the list of visible words for the user,
-    sends the word's translation to the user, and registers a callback
-    to handle the user's response.
+    It takes the card prefetched after the user's previous answer or, if
+    there is none, selects a visible word together with its answer options
+    in the database. Then it sends the word's translation to the user and
+    registers a callback to handle the user's response.
 
     Args:
         message (types.Message): The message that triggered this function.
+        category_id (int | None): The category picked by the user; all the
+            user's words if None.
 
     Returns:
         None
     """
-    session = SESSION
-    handle_new_user(message)
-    user_id: int = get_user_id(session, message)
-    all_user_words: list = get_all_user_words(session, user_id)
-    visible_words: list[Word] = get_visible_words(
-        session, user_id, all_user_words
+    card: PrefetchedCard | None = take_prefetched_card(
+        message.chat.id, category_id
     )
-
-    if not visible_words:
-        inform_user_of_word_change(message, 'learn_all_words')
+    if card is None:
+        with APP.session_factory() as session:
+            card = prepare_card(
+                session, get_user_id(session, message), category_id
+            )
+
+    if card is None:
+        inform_user_of_word_change(
+            message, get_no_words_operation(category_id)
+        )
         return
 
-    target_word: Word = get_random_word(visible_words)
-    user_word_setting = get_user_word_setting(
-        session, user_id, target_word.id
-    )
-
-    send_message_to_user(
-        message,
-        all_user_words,
-        target_word,
-        target_word.translation
-    )
+    send_message_to_user(message, card.quiz_card, card.reply_markup)
     register_validation_step(
         message,
-        user_word_setting,
-        target_word
+        card.user_word_setting_id,
+        card.quiz_card,
+        category_id
     )
 
 
-def get_random_word(visible_words: list[Word]) -> Word:
-    """Selects a random word from a list of visible words.
-
-    Args:
-        visible_words (list[Word]): A list of visible words.
-
-    Returns:
-        Word: A random word from the list of visible words.
-    """
-    return random.choice(visible_words)
+@query_budget(1)
+def show_quiz_categories(message: types.Message) -> None:
+    """Handles the /categories command and the 'quiz_categories' button
+    and offers the user the categories of the words to be quizzed on."""
+    with APP.session_factory() as session:
+        categories: list[tuple[int, str]] = get_quiz_categories(session)
 
+    send_message(
+        message.chat.id,
+        CATEGORY_PICKER_TEXT,
+        reply_markup=create_category_keyboard(
+            categories, CHATBOT_BTNS, CHATBOT_CATEGORIES
+        )
+    )
 
-def get_visible_words(session: SESSION, user_id: int, user_words: list[Word]) \
-        -> list[Word]:
-    """Retrieves a list of visible words for a specific user.
 
-    Parameters:
-        session (SESSION): The database session.
-        user_id (int): The ID of the user.
-        user_words (list[Word]): The list of user words.
+def get_no_words_operation(category_id: int | None) -> str:
+    """Returns the message operation telling the user that no words are
+    left to quiz on."""
+    return 'learn_all_words' if category_id is None \
+        else 'learn_all_category_words'
 
-    Returns:
-        list[Word]: A list of visible words for the user.
-    """
-    hidden_settings: list = get_hidden_word_settings(session, user_id)
-    hidden_word_ids: list[int] = [
-        setting.word_id
-        for setting in hidden_settings
-    ]
 
-    return [word for word in user_words if word.id not in hidden_word_ids]
+def get_quiz_question_text(translation: str) -> str:
+    """Returns the question asking the user to pick the translation."""
+    return f'Выбери перевод слова:\n🇷🇺 {translation}'
 
 
 def send_message_to_user(
-        message: types.Message, user_words: list[Word], target_word: Word,
-        translation: str
+        message: types.Message,
+        quiz_card: QuizCard,
+        markup: types.ReplyKeyboardMarkup
 ):
     """Sends a message to the user with the word's translation.
 
     This function sends a message to the user with the translation of the
-    target word. If the translation is available, it also includes a menu
-    with word variants. If the translation is not available, it sends a
-    corresponding error message.
+    target word and a menu with the answer options of the quiz card.
 
     Args:
         message (types.Message): The message that triggered this function.
-        user_words (list[Word]): The list of words for the user.
-        target_word (Word): The target word being tested.
-        translation (str): The translation of the target word.
+        quiz_card (QuizCard): The quiz card being asked.
+        markup (types.ReplyKeyboardMarkup): The menu with the answer
+            options.
 
     Returns:
         None
     """
-    markup: types.ReplyKeyboardMarkup = show_word_variant_menu(
-        user_words, target_word
-    )
-    bot.send_message(
+    send_message(
         message.chat.id,
-        f'Выбери перевод слова:\n🇷🇺 {translation}',
+        get_quiz_question_text(quiz_card.translation),
         reply_markup=markup
     )
 
 
 def register_validation_step(
         message: types.Message,
-        user_word_setting: UserWordSetting,
-        word: Word
+        user_word_setting_id: int,
+        quiz_card: QuizCard,
+        category_id: int | None = None
 ):
     """Registers the next step handler for the user's response.
 
     This function registers a callback to handle the user's response
-    to the word's translation. It uses the provided user word setting,
-    word, and translations to determine the correct response.
+    to the word's translation. Only IDs and plain values are passed to the
+    next step, which loads the setting in its own session: the step is
+    stored as a compact record in the conversation store.
 
     Args:
         message (types.Message): The message that triggered this function.
-        user_word_setting (UserWordSetting): The user's word setting.
-        word (Word): The word being tested.
+        user_word_setting_id (int): The ID of the user's word setting.
+        quiz_card (QuizCard): The quiz card being tested.
+        category_id (int | None): The category being quizzed, if any.
 
     Returns:
         None
     """
-    bot.register_next_step_handler(
+    get_bot().register_next_step_handler(
         message,
         validate_and_feedback_user_answer,
-        user_word_setting,
-        word,
-        word.translation
+        user_word_setting_id,
+        quiz_card.word,
+        quiz_card.translation,
+        quiz_card.distractors,
+        category_id
     )
@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+from telebot import types
+
+from ..bot_config import APP, PREFETCH
+from ..cache import LRUCache, get_user_id_cache, get_vocabulary_cache
+from ..db import QuizCard, select_quiz_card
+from ..metrics import REGISTRY, Counter
+from ..ui import show_word_variant_menu
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_REQUESTS = REGISTRY.register(Counter(
+    'bot_quiz_prefetch_total',
+    'Quiz requests by prefetch result: hit, stale or miss.',
+    ('result',)
+))
+
+
+class PrefetchedCard(NamedTuple):
+    """A quiz card ready to be sent.
+
+    Attributes:
+        user_word_setting_id (int): The ID of the user's word setting.
+        quiz_card (QuizCard): The card.
+        reply_markup (types.ReplyKeyboardMarkup): The answer options.
+        prepared_at (float): The monotonic time the card was prepared at.
+        category_id (int | None): The category the card was selected from;
+            None for all the user's words.
+    """
+    user_word_setting_id: int
+    quiz_card: QuizCard
+    reply_markup: types.ReplyKeyboardMarkup
+    prepared_at: float
+    category_id: int | None = None
+
+
+class QuizPrefetcher:
+    """Prepares the next quiz card of each user in the background.
+
+    After an answer, a worker selects the user's next card, gets or creates
+    its setting and builds the keyboard, so the following 'next' is served
+    from memory. One card per user is kept: until a card is answered the
+    scheduler keeps selecting the same due word, so further cards would
+    repeat it. A card older than ``max_age`` seconds is not served, since
+    other words may have become due meanwhile. A card of another category
+    than the one asked for is not served either.
+
+    Every fill gets a token, and its card is stored only if the token is
+    still the user's latest one. Taking a card and a change of the user's
+    words drop the token, which discards the results of fills in flight.
+
+    Args:
+        workers (int): The number of worker threads.
+        max_age (float): How long a card stays servable, in seconds.
+        max_users (int): The maximum number of users with a card.
+    """
+
+    def __init__(self, workers: int, max_age: float, max_users: int) -> None:
+        self.max_age = max_age
+        self._cards = LRUCache(max_entries=max_users)
+        self._tokens = LRUCache(max_entries=max_users)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            workers, thread_name_prefix='quiz-prefetch'
+        )
+
+    def schedule(self, user_id: int, category_id: int | None = None) -> None:
+        """Starts preparing the user's next card, replacing the current one.
+        """
+        token = object()
+        with self._lock:
+            self._cards.pop(user_id)
+            self._tokens.put(user_id, token)
+        self._executor.submit(self._fill, user_id, token, category_id)
+
+    def take(
+            self, user_id: int, category_id: int | None = None
+    ) -> PrefetchedCard | None:
+        """Removes and returns the user's card.
+
+        Returns:
+            PrefetchedCard | None: The card, or None if it is not ready, too
+                old or of another category; the caller selects a card itself
+                then.
+        """
+        with self._lock:
+            self._tokens.pop(user_id)
+            card: PrefetchedCard | None = self._cards.pop(user_id)
+
+        if card is None or card.category_id != category_id:
+            PREFETCH_REQUESTS.inc('miss')
+            return None
+        if time.monotonic() - card.prepared_at > self.max_age:
+            PREFETCH_REQUESTS.inc('stale')
+            return None
+
+        PREFETCH_REQUESTS.inc('hit')
+        return card
+
+    def invalidate(self, user_id: int | None) -> None:
+        """Drops the user's card, or every card if user_id is None."""
+        with self._lock:
+            if user_id is None:
+                self._cards.clear()
+                self._tokens.clear()
+            else:
+                self._cards.pop(user_id)
+                self._tokens.pop(user_id)
+
+    def _fill(
+            self, user_id: int, token: object, category_id: int | None
+    ) -> None:
+        try:
+            with APP.session_factory() as session:
+                card: PrefetchedCard | None = prepare_card(
+                    session, user_id, category_id
+                )
+        except Exception:
+            logger.exception('Failed to prefetch a quiz card for user %s',
+                             user_id)
+            return
+
+        with self._lock:
+            if self._tokens.peek(user_id) is not token:
+                return
+            self._tokens.pop(user_id)
+            if card is not None:
+                self._cards.put(user_id, card)
+
+
+def prepare_card(
+        session: Session, user_id: int, category_id: int | None = None
+) -> PrefetchedCard | None:
+    """Selects the user's next card and builds its keyboard.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        category_id (int | None): The category to select the card from;
+            all the user's words if None.
+
+    Returns:
+        PrefetchedCard | None: The card, or None if the user has no visible
+            words.
+    """
+    quiz: tuple[QuizCard, int] | None = select_quiz_card(
+        session, user_id, category_id
+    )
+    if quiz is None:
+        return None
+
+    quiz_card, user_word_setting_id = quiz
+    return PrefetchedCard(
+        user_word_setting_id,
+        quiz_card,
+        show_word_variant_menu(quiz_card.distractors, quiz_card.word),
+        time.monotonic(),
+        category_id
+    )
+
+
+def create_quiz_prefetcher() -> QuizPrefetcher:
+    """Creates the prefetcher configured in the PREFETCH section."""
+    prefetcher = QuizPrefetcher(
+        int(PREFETCH['workers']),
+        float(PREFETCH['max_age']),
+        int(PREFETCH['max_users'])
+    )
+    get_vocabulary_cache().add_listener(prefetcher.invalidate)
+    return prefetcher
+
+
+def get_quiz_prefetcher() -> QuizPrefetcher:
+    """Returns the quiz card prefetcher, creating it on first use."""
+    return APP.resource('quiz_prefetcher', create_quiz_prefetcher)
+
+
+def take_prefetched_card(
+        chat_id: int, category_id: int | None = None
+) -> PrefetchedCard | None:
+    """Takes the card prepared for the chat's user, if there is one.
+
+    Only users with a cached ID are looked up, so the check never queries
+    the database.
+    """
+    user_id: int | None = get_user_id_cache().get(chat_id)
+    if user_id is None:
+        return None
+
+    return get_quiz_prefetcher().take(user_id, category_id)
+
+
+def prefetch_next_card(chat_id: int, category_id: int | None = None) -> None:
+    """Starts preparing the next card of the chat's user."""
+    user_id: int | None = get_user_id_cache().get(chat_id)
+    if user_id is not None:
+        get_quiz_prefetcher().schedule(user_id, category_id)
@@ -1,35 +1,58 @@
 from datetime import datetime
 
+from sqlalchemy.orm import Session
 from telebot import types
 
-from ...db import UserWordSetting, Word
-from ..bot_config import CHATBOT_BTNS, CHATBOT_DATA, SESSION
-from ..bot_init import bot
+from ...db import UserWordSetting
+from ...search import allowed_edits, edit_distance
+from ...srs import ReviewState, Scheduler, create_scheduler
+from ..bot_config import APP, CHATBOT_BTNS, CHATBOT_DATA, FUZZY
+from ..db import WordProgress, get_word_progress, record_answer_stats
+from ..outbound import send_message
+from ..query_budget import query_budget
 from ..response_handlers import inform_user_of_word_change
-from ..ui import show_interaction_menu
+from ..ui import get_next_operations, show_interaction_menu
+from .prefetch import prefetch_next_card
 
+CONTINUE_QUESTION = 'Продолжим?'
 
+
+def get_scheduler() -> Scheduler:
+    """Returns the review scheduler configured in chatbot.json."""
+    return APP.resource(
+        'scheduler', lambda: create_scheduler(CHATBOT_DATA['scheduler'])
+    )
+
+
+@query_budget(4)
 def validate_and_feedback_user_answer(
     message: types.Message,
-    user_word_setting: UserWordSetting,
-    selected_word: Word,
-    translation: str
+    user_word_setting_id: int,
+    correct_answer: str,
+    translation: str,
+    distractors: list[str] | None = None,
+    category_id: int | None = None
 ) -> None:
     """Validates user's response and provides feedback based on its accuracy.
 
+    Once the answer is recorded, the user's next card is prepared in the
+    background, from the same category if one is being quizzed.
+
     Args:
         message (types.Message): The user's message to be validated.
-        user_word_setting (UserWordSetting): The user's word setting.
-        selected_word (Word): Selected word to be checked against
-            the user's response.
+        user_word_setting_id (int): The ID of the user's word setting.
+        correct_answer (str): The word the user had to pick.
         translation (str): The translation of the selected word.
+        distractors (list[str] | None): The wrong answer options of the
+            card.
+        category_id (int | None): The category being quizzed, if any.
 
     Returns:
         None
     """
-    session = SESSION
-    correct_answer: str = selected_word.word
-    is_correct: bool = message.text == correct_answer
+    is_correct: bool = is_answer_correct(
+        message.text, correct_answer, distractors or []
+    )
 
     send_feedback_message(
         message,
@@ -38,28 +61,88 @@ def validate_and_feedback_user_answer(
         translation
     )
 
-    if is_correct:
-        update_user_word_setting(user_word_setting)
-        if user_word_setting.is_hidden:
-            inform_user_of_word_change(
-                message, 'learned_word', correct_answer
-                )
+    with APP.session_factory() as session:
+        is_learned: bool = record_answer(
+            session, user_word_setting_id, is_correct
+        )
+    prefetch_next_card(message.chat.id, category_id)
 
-    session.add(user_word_setting)
-    session.commit()
+    if is_learned:
+        inform_user_of_word_change(
+            message, 'learned_word', correct_answer
+            )
 
-    bot.send_message(
+    send_message(
         message.chat.id,
-        'Продолжим?',
+        CONTINUE_QUESTION,
         reply_markup=types.ReplyKeyboardRemove()
     )
     show_interaction_menu(
         message,
         CHATBOT_BTNS,
-        ['next', 'add_word', 'delete_word']
+        get_next_operations(category_id)
         )
 
 
+def is_answer_correct(
+        answer: str | None, correct_answer: str, distractors: list[str]
+) -> bool:
+    """Checks the user's answer, tolerating typos in a typed answer.
+
+    An answer differing from the correct one by at most
+    ``answer_max_distance`` edits of the FUZZY section (fewer for short
+    words) is correct, unless it is as close to one of the wrong options.
+    Typos are not tolerated by default.
+    """
+    if answer == correct_answer:
+        return True
+
+    max_distance: int = allowed_edits(
+        correct_answer, int(FUZZY['answer_max_distance'])
+    )
+    if answer is None or not max_distance:
+        return False
+
+    typed: str = answer.strip().lower()
+    distance: int = edit_distance(typed, correct_answer.lower(), max_distance)
+    return distance <= max_distance and all(
+        distance < edit_distance(typed, distractor.lower())
+        for distractor in distractors
+    )
+
+
+def record_answer(
+        session: Session, user_word_setting_id: int, is_correct: bool
+) -> bool:
+    """Schedules the next review of the word after the user's answer and
+    counts the answer in the user's statistics.
+
+    Args:
+        session (Session): The database session.
+        user_word_setting_id (int): The ID of the user's word setting.
+        is_correct (bool): Whether the user's answer was correct.
+
+    Returns:
+        bool: True if the word has been learned and hidden.
+    """
+    user_word_setting: UserWordSetting | None = session.get(
+        UserWordSetting, user_word_setting_id
+    )
+    if user_word_setting is None:
+        return False
+
+    was_hidden: bool = bool(user_word_setting.is_hidden)
+    progress: WordProgress = get_word_progress(user_word_setting)
+    update_user_word_setting(user_word_setting, is_correct)
+    record_answer_stats(
+        session, user_word_setting.user_id, is_correct,
+        progress, get_word_progress(user_word_setting)
+    )
+    session.commit()
+
+    return bool(user_word_setting.is_hidden) and not was_hidden
+
+
 def get_feedback_message(
         is_correct: bool, correct_answer: str, translation: str
 ) -> str:
@@ -83,30 +166,45 @@ def send_feedback_message(
         correct_answer_text,
         translation
     )
-    result_icon: str = '✅' if is_answer_correct else '❌'
-    bot.send_message(user_message.chat.id, result_icon)
-    bot.send_message(user_message.chat.id, feedback_text)
+    result_icon: str = get_result_icon(is_answer_correct)
+    send_message(user_message.chat.id, result_icon)
+    send_message(user_message.chat.id, feedback_text)
 
 
-def should_hide_word(
-        user_word_setting: UserWordSetting, correct_answers: int
-) -> bool:
-    """Checks if a word should be hidden from the user.
+def get_result_icon(is_correct: bool) -> str:
+    """Returns the icon for the result of the answer."""
+    return '✅' if is_correct else '❌'
 
-    Determines whether a word should be hidden from the user based on
-    its status and the user's preferences.
-
-    Returns:
-        bool: True if the word should be hidden, False otherwise.
-    """
-    return user_word_setting.correct_answers >= correct_answers
 
+def update_user_word_setting(
+        user_word_setting: UserWordSetting, is_correct: bool
+) -> None:
+    """Updates the user's word setting with the scheduler's next review.
 
-def update_user_word_setting(user_word_setting: UserWordSetting) -> None:
-    """Updates the user's word settings based on their effectiveness."""
-    user_word_setting.correct_answers += 1
-    user_word_setting.last_shown_at = datetime.now()
-    user_word_setting.is_hidden = should_hide_word(
-        user_word_setting,
-        CHATBOT_DATA['correct_answers']
+    A learned word is hidden and gets no due time, which takes it out of
+    the user's review queue.
+    """
+    now: datetime = datetime.now()
+    state: ReviewState = get_scheduler().review(
+        ReviewState(
+            user_word_setting.repetitions,
+            user_word_setting.interval_days,
+            user_word_setting.ease,
+            user_word_setting.due_at
+        ),
+        is_correct,
+        now
     )
+
+    if is_correct:
+        user_word_setting.correct_answers += 1
+    user_word_setting.last_shown_at = now
+    user_word_setting.repetitions = state.repetitions
+    user_word_setting.interval_days = state.interval_days
+    user_word_setting.ease = state.ease
+
+    if get_scheduler().is_learned(state):
+        user_word_setting.is_hidden = True
+        user_word_setting.due_at = None
+    else:
+        user_word_setting.due_at = state.due_at
@@ -1,5 +1,5 @@
 from telebot import types
-from .bot_init import bot
+from .outbound import send_message
 from .bot_config import CHATBOT_ERRORS, CHATBOT_MESSAGE
 
 
@@ -18,14 +18,21 @@ def inform_user_of_word_change(
     Returns:
         None
     """
+    send_message(
+        user_message.chat.id, get_word_change_message(operation, word)
+    )
+
+
+def get_word_change_message(operation: str, word: str | None = None) -> str:
+    """Returns the text describing the change in the dictionary."""
     response_messages: dict[str, str] = {
         'add': f'Слово "{word}" и его перевод добавлены успешно!',
         'delete': f'Слово "{word}" и его переводы удалены успешно!',
         'remove': f'Слово "{word}" было скрыто из вашей выборки',
+        'unhide': f'Слово "{word}" снова будет в вашей выборке',
         'add_word_value': CHATBOT_ERRORS['add_word_value'],
         'learn_all_words': CHATBOT_ERRORS['learn_all_words'],
+        'learn_all_category_words': CHATBOT_ERRORS['learn_all_category_words'],
         'learned_word': f'Слово "{word}"' + CHATBOT_MESSAGE['learned_word']
     }
-    bot.send_message(
-        user_message.chat.id, response_messages.get(operation, 'Unknown action')
-    )
+    return response_messages.get(operation, 'Unknown action')
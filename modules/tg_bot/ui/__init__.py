@@ -1,8 +1,16 @@
 from .drop_down_menu import menu_btn_commands
 from .nav_menu import show_interaction_menu
-from .quiz_menu import show_word_variant_menu
+from .quiz_menu import (
+    CATEGORY_PICKER_TEXT,
+    create_category_keyboard,
+    get_next_operations,
+    show_word_variant_menu
+)
 
 __all__ = [
+    'CATEGORY_PICKER_TEXT',
+    'create_category_keyboard',
+    'get_next_operations',
     'menu_btn_commands',
     'show_interaction_menu',
     'show_word_variant_menu'
@@ -1,7 +1,7 @@
 import telebot
 
 from ..bot_config import CHATBOT_COMMANDS
-from ..bot_init import bot
+from ..bot_init import get_bot
 
 
 def convert_json_to_list() -> list[telebot.types.BotCommand]:
@@ -22,4 +22,4 @@ def convert_json_to_list() -> list[telebot.types.BotCommand]:
 def menu_btn_commands() -> None:
     """Sets the bot's menu buttons"""
     commands = convert_json_to_list()
-    bot.set_my_commands(commands)
+    get_bot().set_my_commands(commands)
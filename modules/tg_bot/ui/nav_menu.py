@@ -1,5 +1,7 @@
 from telebot import types
-from ..bot_init import bot
+from ..outbound import send_message
+
+INTERACTION_MENU_TEXT = 'Выберите действие:'
 
 
 def create_inline_keyboard(row_width: int) -> types.InlineKeyboardMarkup:
@@ -18,6 +20,9 @@ def create_buttons(button_labels: dict[str, str], operations: list[str]) \
         -> list[types.InlineKeyboardButton]:
     """Creates a list of inline keyboard buttons with labels and callback data.
 
+    An operation may carry an argument after a colon, e.g. 'next:3'; the
+    label is looked up by the operation name before it.
+
     Args:
         button_labels (dict[str, str]): A dictionary of button labels.
         operations (list[str]): A list of button operations.
@@ -26,7 +31,9 @@ def create_buttons(button_labels: dict[str, str], operations: list[str]) \
         list[types.InlineKeyboardButton]: The list of created buttons.
     """
     return [
-        types.InlineKeyboardButton(text=button_labels[op], callback_data=op)
+        types.InlineKeyboardButton(
+            text=button_labels[op.split(':', 1)[0]], callback_data=op
+        )
         for op in operations
     ]
 
@@ -43,7 +50,7 @@ def send_message_with_keyboard(
         keyboard (types.InlineKeyboardMarkup): The keyboard to send.
         text (str): The text to send.
     """
-    bot.send_message(user_message.chat.id, text, reply_markup=keyboard)
+    send_message(user_message.chat.id, text, reply_markup=keyboard)
 
 
 def show_interaction_menu(
@@ -58,9 +65,26 @@ def show_interaction_menu(
         button_labels (dict[str, str]): A dictionary of button labels.
         operations (list[str]): A list of button operations.
     """
+    keyboard = create_interaction_keyboard(button_labels, operations)
+    send_message_with_keyboard(
+        user_message, keyboard, INTERACTION_MENU_TEXT
+    )
+
+
+def create_interaction_keyboard(
+        button_labels: dict[str, str], operations: list[str]
+) -> types.InlineKeyboardMarkup:
+    """Creates the keyboard of the interaction menu.
+
+    Args:
+        button_labels (dict[str, str]): A dictionary of button labels.
+        operations (list[str]): A list of button operations.
+
+    Returns:
+        types.InlineKeyboardMarkup: The keyboard with the buttons.
+    """
     keyboard = create_inline_keyboard(2)
     buttons = create_buttons(button_labels, operations)
     keyboard.add(*buttons)
-    send_message_with_keyboard(
-        user_message, keyboard, 'Выберите действие:'
-    )
+
+    return keyboard
@@ -1,21 +1,16 @@
 import random
 from telebot import types
-from ...db import Word
-
-
-def generate_answer_options(word_list: list, target_word: Word) -> list:
-    """Generate answer options for a quiz based on the user's text input."""
-    other_words: list[str] = [
-        option.word
-        for option in word_list
-        if option.word != target_word.word
-    ]
-    answer_options: list[str] = random.sample(
-        other_words, min(3, len(other_words))
-    )
+
+CATEGORY_PICKER_TEXT = 'Выберите тему:'
+
+
+def generate_answer_options(distractors: list[str], target_word: str) -> list:
+    """Generate answer options for a quiz from the distractors and the target
+    word placed at a random position."""
+    answer_options: list[str] = list(distractors)
     answer_options.insert(
         random.randint(0, len(answer_options)),
-        target_word.word
+        target_word
     )
 
     return answer_options
@@ -32,10 +27,54 @@ def create_keyboard_markup(answer_options: list) -> types.ReplyKeyboardMarkup:
     return keyboard_markup
 
 
-def show_word_variant_menu(word_list: list, target_word: Word) \
+def show_word_variant_menu(distractors: list[str], target_word: str) \
         -> types.ReplyKeyboardMarkup:
     """Generate answer choices for a quiz based on the user's text input."""
-    answer_options = generate_answer_options(word_list, target_word)
+    answer_options = generate_answer_options(distractors, target_word)
     keyboard_markup = create_keyboard_markup(answer_options)
 
     return keyboard_markup
+
+
+def get_next_operations(category_id: int | None = None) -> list[str]:
+    """Returns the operations of the menu shown after an answer.
+
+    The 'next' button carries the category being quizzed, so the quiz stays
+    within it.
+    """
+    next_operation: str = 'next' if category_id is None \
+        else f'next:{category_id}'
+    return [next_operation, 'quiz_categories', 'add_word', 'delete_word']
+
+
+def create_category_keyboard(
+        categories: list[tuple[int, str]],
+        button_labels: dict[str, str],
+        category_names: dict[str, str]
+) -> types.InlineKeyboardMarkup:
+    """Creates the keyboard for picking the category of the quiz.
+
+    Args:
+        categories (list[tuple[int, str]]): The IDs and names of the
+            categories.
+        button_labels (dict[str, str]): A dictionary of button labels.
+        category_names (dict[str, str]): The display names of the
+            categories; a missing one is shown as the capitalised name.
+
+    Returns:
+        types.InlineKeyboardMarkup: A button per category and a button
+            quizzing all the words.
+    """
+    keyboard = types.InlineKeyboardMarkup(row_width=2)
+    keyboard.add(*(
+        types.InlineKeyboardButton(
+            text=category_names.get(name, name.capitalize()),
+            callback_data=f'quiz:{category_id}'
+        )
+        for category_id, name in categories
+    ))
+    keyboard.row(types.InlineKeyboardButton(
+        text=button_labels['all_categories'], callback_data='test_knowledge'
+    ))
+
+    return keyboard
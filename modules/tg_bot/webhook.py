@@ -0,0 +1,320 @@
+import hmac
+import json
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import telebot
+from telebot import apihelper, types
+
+from .metrics import LatencyStats
+from .outbound import get_outbound_dispatcher
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def get_update_chat_id(update_json: dict) -> int:
+    """Returns the ID of the chat (or user) an update belongs to.
+
+    Updates without a chat, e.g. inline queries, are keyed by the sender.
+    """
+    for key in ('message', 'edited_message', 'channel_post'):
+        if key in update_json:
+            return update_json[key]['chat']['id']
+
+    callback_query: dict | None = update_json.get('callback_query')
+    if callback_query and 'message' in callback_query:
+        return callback_query['message']['chat']['id']
+
+    for value in update_json.values():
+        if isinstance(value, dict) and 'from' in value:
+            return value['from']['id']
+
+    return 0
+
+
+class WebhookIngress:
+    """Transport-independent part of the webhook endpoint.
+
+    Checks the secret token, parses update bodies, picks the worker queue of
+    an update by its chat ID and keeps the counters and latency statistics.
+    """
+
+    def __init__(self, config: dict) -> None:
+        if not config['secret_token']:
+            raise ValueError('SECRET_TOKEN of the WEBHOOK section is not set')
+
+        self.path: str = config['path']
+        self.stats_path: str = config['stats_path']
+        self.workers: int = int(config['workers'])
+        self.queue_size: int = max(
+            1, int(config['queue_size']) // self.workers
+        )
+        self.request_latency = LatencyStats()
+        self.processing_latency = LatencyStats()
+        self.counters: dict[str, int] = dict.fromkeys(
+            ('accepted', 'rejected', 'unauthorized', 'malformed',
+             'processed', 'failed'),
+            0
+        )
+        self._secret_token: bytes = config['secret_token'].encode()
+        self._lock = threading.Lock()
+
+    def is_authorized(self, secret_token: str | None) -> bool:
+        """Checks the secret token sent by Telegram in constant time."""
+        return hmac.compare_digest(
+            (secret_token or '').encode(), self._secret_token
+        )
+
+    def parse_update(self, body: bytes) -> dict | None:
+        """Parses the update JSON, returns None if the body is malformed."""
+        try:
+            update_json = json.loads(body)
+        except ValueError:
+            return None
+
+        if not isinstance(update_json, dict) or 'update_id' not in update_json:
+            return None
+
+        return update_json
+
+    def shard_of(self, update_json: dict) -> int:
+        """Returns the worker index for the update's chat."""
+        return get_update_chat_id(update_json) % self.workers
+
+    def count(self, counter: str) -> None:
+        """Increments one of the counters."""
+        with self._lock:
+            self.counters[counter] += 1
+
+    def stats(self, queue_depths: list[int]) -> dict:
+        """Returns the queue depths, counters and latency summaries."""
+        return {
+            'queue_depth': sum(queue_depths),
+            'queue_capacity': self.queue_size * self.workers,
+            'worker_queue_depths': queue_depths,
+            **self.counters,
+            'request_latency': self.request_latency.snapshot(),
+            'processing_latency': self.processing_latency.snapshot(),
+        }
+
+
+class WebhookEndpoint(WebhookIngress, ABC):
+    """Built-in HTTP endpoint receiving updates.
+
+    Subclasses decide where an accepted update goes: ``enqueue`` hands it
+    to the worker of its chat and fails when that worker's queue is full,
+    in which case the request is answered with 503 and Telegram delivers
+    the update again later.
+    """
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.httpd = ThreadingHTTPServer(
+            (config['host'], int(config['port'])),
+            make_request_handler(self)
+        )
+
+    def receive(self, path: str, secret_token: str | None, body: bytes) \
+            -> int:
+        """Accepts an update request and returns the HTTP status code."""
+        if path != self.path:
+            return 404
+
+        if not self.is_authorized(secret_token):
+            self.count('unauthorized')
+            return 403
+
+        update_json: dict | None = self.parse_update(body)
+        if update_json is None:
+            self.count('malformed')
+            return 400
+
+        if not self.enqueue(update_json):
+            self.count('rejected')
+            return 503
+
+        self.count('accepted')
+        return 200
+
+    @abstractmethod
+    def enqueue(self, update_json: dict) -> bool:
+        """Queues the update, returns False if the queue is full."""
+
+    @abstractmethod
+    def queue_depths(self) -> list[int]:
+        """Returns the number of waiting updates per worker."""
+
+    def report(self) -> dict:
+        """Returns the statistics served at the stats path."""
+        return self.stats(self.queue_depths())
+
+    def start_workers(self) -> None:
+        """Starts whatever processes the queued updates."""
+
+    def serve_forever(self) -> None:
+        """Starts the workers and serves HTTP requests until shutdown."""
+        self.start_workers()
+        host, port = self.httpd.server_address[:2]
+        logger.info(
+            'Webhook server listening on %s:%s%s', host, port, self.path
+        )
+        self.httpd.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stops the HTTP server."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class WebhookServer(WebhookEndpoint):
+    """Webhook endpoint of the threaded bot.
+
+    Each worker thread owns a bounded queue and runs the handlers of its
+    chats one update at a time, so the updates of one chat keep their order.
+    """
+
+    def __init__(self, bot: telebot.TeleBot, config: dict) -> None:
+        super().__init__(config)
+        self.bot = bot
+        self.queues: list[queue.Queue] = [
+            queue.Queue(maxsize=self.queue_size) for _ in range(self.workers)
+        ]
+
+    def enqueue(self, update_json: dict) -> bool:
+        try:
+            self.queues[self.shard_of(update_json)].put_nowait(
+                (update_json, time.perf_counter())
+            )
+        except queue.Full:
+            return False
+
+        return True
+
+    def queue_depths(self) -> list[int]:
+        return [worker_queue.qsize() for worker_queue in self.queues]
+
+    def report(self) -> dict:
+        return {
+            **super().report(),
+            'outbound': get_outbound_dispatcher().stats()
+        }
+
+    def start_workers(self) -> None:
+        """Starts the worker threads."""
+        for index, worker_queue in enumerate(self.queues):
+            threading.Thread(
+                target=self._work, args=(worker_queue,),
+                name=f'webhook-worker-{index}', daemon=True
+            ).start()
+
+    def _work(self, worker_queue: queue.Queue) -> None:
+        while True:
+            update_json, received_at = worker_queue.get()
+            try:
+                update = types.Update.de_json(update_json)
+                self.bot.process_new_updates([update])
+                self.count('processed')
+            except Exception:
+                self.count('failed')
+                logger.exception('Failed to process update %s',
+                                 update_json.get('update_id'))
+            finally:
+                self.processing_latency.observe(
+                    time.perf_counter() - received_at
+                )
+                worker_queue.task_done()
+
+
+def make_request_handler(server: WebhookEndpoint) \
+        -> type[BaseHTTPRequestHandler]:
+    """Creates the HTTP request handler class bound to the webhook server."""
+
+    class WebhookRequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            started_at: float = time.perf_counter()
+            length: int = int(self.headers.get('Content-Length') or 0)
+
+            if length > MAX_BODY_BYTES:
+                status = 413
+            else:
+                status = server.receive(
+                    self.path,
+                    self.headers.get(SECRET_TOKEN_HEADER),
+                    self.rfile.read(length)
+                )
+
+            self.send_response(status)
+            if status == 503:
+                self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            server.request_latency.observe(time.perf_counter() - started_at)
+
+        def do_GET(self) -> None:
+            if self.path != server.stats_path:
+                self.send_error(404)
+                return
+
+            body: bytes = json.dumps(server.report()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            logger.debug(format, *args)
+
+    return WebhookRequestHandler
+
+
+def start_webhook(bot: telebot.TeleBot, config: dict) -> None:
+    """Registers the webhook with Telegram and serves updates.
+
+    Handlers run in the webhook workers instead of the bot's own thread
+    pool, which keeps the number of in-flight updates bounded by the queues.
+    The webhook is not registered when URL is empty, e.g. when recorded
+    updates are POSTed to the endpoint locally.
+
+    Args:
+        bot (telebot.TeleBot): The bot whose handlers process the updates.
+        config (dict): The WEBHOOK section of the config.
+    """
+    server = WebhookServer(bot, config)
+    bot.threaded = False
+    serve_webhook(server, bot.token, config)
+
+
+def serve_webhook(
+        server: WebhookEndpoint, token: str, config: dict
+) -> None:
+    """Registers the webhook unless URL is empty and serves the endpoint.
+
+    The webhook is registered by the bare Bot API client, so an ingress
+    that only routes the updates needs no bot with handlers.
+
+    Args:
+        server (WebhookEndpoint): The endpoint to serve.
+        token (str): The token of the bot the webhook is registered for.
+        config (dict): The WEBHOOK section of the config.
+    """
+    if config['url']:
+        apihelper.delete_webhook(token)
+        apihelper.set_webhook(
+            token,
+            url=config['url'],
+            secret_token=config['secret_token'],
+            max_connections=int(config['max_connections'])
+        )
+
+    try:
+        server.serve_forever()
+    finally:
+        server.shutdown()
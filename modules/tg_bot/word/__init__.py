@@ -1,11 +1,26 @@
 from .input_validation import validate_user_input
-from .word_add import handle_add_word
-from .word_del import handle_delete_word
+from .word_add import handle_add_word, handle_add_word_request
+from .word_del import handle_delete_word, handle_delete_word_request
+from .word_find import (
+    find_command,
+    load_word_search,
+    handle_find_callback,
+    handle_inline_query
+)
 from .word_format import check_word_format
+from .word_hidden import handle_hidden_words_callback, hidden_words_command
 
 __all__ = [
     'handle_add_word',
+    'handle_add_word_request',
     'handle_delete_word',
+    'handle_delete_word_request',
+    'find_command',
+    'load_word_search',
+    'handle_find_callback',
+    'handle_inline_query',
+    'handle_hidden_words_callback',
+    'hidden_words_command',
     'check_word_format',
     'validate_user_input'
 ]
@@ -1,19 +1,41 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from telebot import types
 
 from ..bot_config import (
-    SESSION, CHATBOT_MESSAGE, CHATBOT_BTNS, CHATBOT_REGEX
+    APP,
+    CHATBOT_MESSAGE,
+    CHATBOT_BTNS,
+    CHATBOT_ERRORS,
+    CHATBOT_REGEX
 )
-from ..bot_init import bot
+from ..bot_init import get_bot
 from ..db import (
-    add_word_to_db, get_user_id, handle_new_user, get_word_by_user_id
+    add_word_to_db,
+    add_words_to_db,
+    find_user_words,
+    get_user_id,
+    handle_new_user,
+    get_word_by_user_id
 )
+from ..outbound import send_message
+from ..query_budget import query_budget
 from ..response_handlers import inform_user_of_word_change
 from ..ui import show_interaction_menu
 from .input_validation import validate_user_input
+from .word_bulk import (
+    MAX_WORD_LINES,
+    WordLine,
+    check_word_list_document,
+    decode_word_list,
+    format_add_report,
+    is_word_list,
+    parse_word_lines
+)
 from .word_format import check_word_format
 
 
-@bot.message_handler(commands=['add_word'])
+@query_budget(1)
 def handle_add_word(user_message: types.Message) -> None:
     """Handles the command to add a word.
 
@@ -21,46 +43,160 @@ def handle_add_word(user_message: types.Message) -> None:
     registers the next step handler to process the request.
     """
     handle_new_user(user_message)
-    bot.send_message(user_message.chat.id, CHATBOT_MESSAGE['add_user_word'])
-    bot.register_next_step_handler(user_message, handle_add_word_request)
+    send_message(user_message.chat.id, CHATBOT_MESSAGE['add_user_word'])
+    get_bot().register_next_step_handler(user_message, handle_add_word_request)
 
 
+@query_budget(7)
 def handle_add_word_request(user_message: types.Message) -> None:
-    """Handles the request to add a new word to the user's word list."""
-    with SESSION as session:
+    """Handles the request to add a new word to the user's word list.
+
+    A text of several lines or an uploaded document is added as a word
+    list.
+    """
+    if is_word_list(user_message):
+        handle_add_words_request(user_message)
+        return
+
+    word, translation = validate_user_input(user_message)
+
+    if not word or not translation:
+        return
+
+    if not check_word_format(
+            CHATBOT_REGEX['eng'],
+            CHATBOT_REGEX['rus'],
+            word,
+            translation
+    ):
+        inform_user_of_word_change(
+            user_message, 'add_word_value'
+        )
+        return
+
+    with APP.session_factory() as session:
+        user_id: int = get_user_id(session, user_message)
+        is_added: bool = add_user_word(
+            session, user_id, word, translation, user_message
+        )
+
+    if is_added:
+        inform_user_of_word_change(
+            user_message, 'add', word
+        )
+
+    show_interaction_menu(
+        user_message,
+        CHATBOT_BTNS,
+        ['next', 'add_word', 'delete_word']
+        )
+
+
+def add_user_word(
+        session: Session,
+        user_id: int,
+        word: str,
+        translation: str,
+        user_message: types.Message | None = None
+) -> bool:
+    """Adds the word to the user's word list unless it is already there.
+
+    Returns:
+        bool: True if the word was added.
+    """
+    if get_word_by_user_id(session, word, user_id):
+        return False
+
+    return add_word_to_db(session, word, translation, user_id, user_message)
+
+
+def handle_add_words_request(user_message: types.Message) -> None:
+    """Adds a word list to the user's word list and reports every line."""
+    chat_id: int = user_message.chat.id
+    text: str | None = read_word_list(user_message)
+    if text is None:
+        return
+
+    lines: list[WordLine] = parse_word_lines(text)
+    if not lines or len(lines) > MAX_WORD_LINES:
+        send_message(chat_id, CHATBOT_ERRORS['word_list_value'])
+        return
+
+    with APP.session_factory() as session:
         user_id: int = get_user_id(session, user_message)
-        word, translation = validate_user_input(user_message)
-
-        if not word or not translation:
-            return
-
-        if not check_word_format(
-                CHATBOT_REGEX['eng'],
-                CHATBOT_REGEX['rus'],
-                word,
-                translation
-        ):
-            inform_user_of_word_change(
-                user_message, 'add_word_value'
-            )
-            return
-
-        word_obj = get_word_by_user_id(session, word, user_id)
-
-        if not word_obj:
-            add_word_to_db(
-                session,
-                word,
-                translation,
-                user_id,
-                user_message
-            )
-            inform_user_of_word_change(
-                user_message, 'add', word
-            )
-
-        show_interaction_menu(
-            user_message,
-            CHATBOT_BTNS,
-            ['next', 'add_word', 'delete_word']
-            )
+        lines = add_user_words(session, user_id, lines)
+
+    for report in format_add_report(lines):
+        send_message(chat_id, report)
+
+    show_interaction_menu(
+        user_message,
+        CHATBOT_BTNS,
+        ['next', 'add_word', 'delete_word']
+        )
+
+
+def read_word_list(user_message: types.Message) -> str | None:
+    """Returns the text of the word list, downloading an uploaded document.
+
+    Returns:
+        str | None: The word list, or None if the document cannot be read;
+            the user is told why.
+    """
+    if user_message.content_type != 'document':
+        return user_message.text
+
+    error: str | None = check_word_list_document(user_message.document)
+    if error is not None:
+        send_message(user_message.chat.id, CHATBOT_ERRORS[error])
+        return None
+
+    bot = get_bot()
+    file_info: types.File = bot.get_file(user_message.document.file_id)
+    return decode_word_list(bot.download_file(file_info.file_path))
+
+
+def add_user_words(
+        session: Session, user_id: int, lines: list[WordLine]
+) -> list[WordLine]:
+    """Adds the new words of the list the user does not have yet.
+
+    The words are checked against the user's words in one query and
+    inserted in one transaction, which skips the words added meanwhile by a
+    concurrent change. Where the database cannot skip them, a conflicting
+    batch is added word by word instead.
+
+    Returns:
+        list[WordLine]: The lines with the 'new' status replaced by 'added'
+            or 'exists'.
+    """
+    new_lines: list[WordLine] = [
+        line for line in lines if line.status == 'new'
+    ]
+    existing: set[str] = find_user_words(
+        session, user_id, [line.word for line in new_lines]
+    )
+    candidates: list[WordLine] = [
+        line for line in new_lines if line.word.lower() not in existing
+    ]
+
+    try:
+        inserted: set[str] = add_words_to_db(session, user_id, [
+            (line.word, line.translation) for line in candidates
+        ])
+        added: set[int] = set()
+        for line in candidates:
+            if line.word.lower() in inserted:
+                inserted.discard(line.word.lower())
+                added.add(line.number)
+    except IntegrityError:
+        added = {
+            line.number for line in candidates
+            if add_user_word(session, user_id, line.word, line.translation)
+        }
+
+    return [
+        line._replace(status='added' if line.number in added else 'exists')
+        if line.status == 'new' else line
+        for line in lines
+    ]
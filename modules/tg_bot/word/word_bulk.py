@@ -0,0 +1,176 @@
+import csv
+import os
+from typing import NamedTuple
+
+from telebot import types
+
+from ..bot_config import CHATBOT_REGEX
+from ..outbound import MAX_MESSAGE_LENGTH
+from .word_format import create_regex_patterns, is_valid_word
+
+MAX_WORD_LINES = 500
+MAX_DOCUMENT_BYTES = 256 * 1024
+DOCUMENT_EXTENSIONS = ('.csv', '.txt')
+DOCUMENT_ENCODINGS = ('utf-8-sig', 'cp1251')
+LINE_DELIMITERS = (',', ';', '\t')
+
+
+class WordLine(NamedTuple):
+    """A line of a word list sent by the user.
+
+    Attributes:
+        number (int): The number of the line in the list.
+        text (str): The line as it was sent.
+        word (str): The English word.
+        translation (str): The translation of the word.
+        status (str): 'new' until the line is processed, then 'added',
+            'exists' (already in the user's dictionary), 'duplicate'
+            (repeats an earlier line) or 'invalid'.
+    """
+    number: int
+    text: str
+    word: str
+    translation: str
+    status: str
+
+
+def is_word_list(user_message: types.Message) -> bool:
+    """Checks if the message is a document or a text of several lines."""
+    return (
+        user_message.content_type == 'document'
+        or '\n' in (user_message.text or '').strip()
+    )
+
+
+def check_word_list_document(document: types.Document) -> str | None:
+    """Checks that the uploaded document can be read as a word list.
+
+    Returns:
+        str | None: The key of the error in CHATBOT_ERRORS, or None if the
+            document is fine.
+    """
+    extension: str = os.path.splitext(document.file_name or '')[1].lower()
+    if extension not in DOCUMENT_EXTENSIONS:
+        return 'word_list_file_type'
+    if (document.file_size or 0) > MAX_DOCUMENT_BYTES:
+        return 'word_list_too_large'
+
+    return None
+
+
+def decode_word_list(content: bytes) -> str:
+    """Decodes an uploaded word list, trying UTF-8 before Windows-1251."""
+    for encoding in DOCUMENT_ENCODINGS[:-1]:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+
+    return content.decode(DOCUMENT_ENCODINGS[-1], errors='replace')
+
+
+def split_word_line(line: str) -> list[str]:
+    """Splits a CSV line by the first delimiter giving two fields."""
+    row: list[str] = []
+    for delimiter in LINE_DELIMITERS:
+        row = next(
+            csv.reader([line], delimiter=delimiter, skipinitialspace=True),
+            []
+        )
+        if len(row) == 2:
+            break
+
+    return row
+
+
+def parse_word_lines(text: str) -> list[WordLine]:
+    """Parses a word list of ``word, translation`` lines.
+
+    Fields are separated by a comma, a semicolon or a tab, as in CSV
+    files, and may be quoted. A ``word,translation`` header and empty lines
+    are skipped. Every line is checked against the precompiled patterns,
+    and lines repeating an earlier word are marked as duplicates.
+
+    Args:
+        text (str): The message text or the content of the document.
+
+    Returns:
+        list[WordLine]: The parsed lines in the 'new', 'duplicate' or
+            'invalid' status.
+    """
+    eng_regex, rus_regex = create_regex_patterns(
+        CHATBOT_REGEX['eng'], CHATBOT_REGEX['rus']
+    )
+    lines: list[WordLine] = []
+    seen_words: set[str] = set()
+    for number, raw_line in enumerate(text.splitlines(), 1):
+        row: list[str] = split_word_line(raw_line)
+        if not any(cell.strip() for cell in row):
+            continue
+        if number == 1 and [cell.strip().lower() for cell in row] == [
+            'word', 'translation'
+        ]:
+            continue
+
+        if len(row) != 2:
+            lines.append(WordLine(number, raw_line.strip(), '', '', 'invalid'))
+            continue
+
+        word, translation = (cell.strip().title() for cell in row)
+        if not is_valid_word(word, translation, eng_regex, rus_regex):
+            status: str = 'invalid'
+        elif word.lower() in seen_words:
+            status = 'duplicate'
+        else:
+            status = 'new'
+            seen_words.add(word.lower())
+
+        lines.append(
+            WordLine(number, raw_line.strip(), word, translation, status)
+        )
+
+    return lines
+
+
+def format_word_line(line: WordLine) -> str:
+    """Returns the report line describing the result of a word list line."""
+    line_reports: dict[str, str] = {
+        'added': f'✅ {line.number}. {line.word} - {line.translation}',
+        'exists': f'♻️ {line.number}. {line.word} - уже есть в словаре',
+        'duplicate': f'♻️ {line.number}. {line.word} - повтор в списке',
+        'invalid': f'❌ {line.number}. {line.text[:40]} - неверный формат',
+    }
+    return line_reports.get(line.status, f'{line.number}. {line.text[:40]}')
+
+
+def format_add_report(lines: list[WordLine]) -> list[str]:
+    """Builds the messages reporting the result of a word list.
+
+    The summary goes first, followed by a line per word; the report is
+    split into several messages when it exceeds the Telegram limit.
+    """
+    counts: dict[str, int] = {
+        status: sum(line.status == status for line in lines)
+        for status in ('added', 'exists', 'duplicate', 'invalid')
+    }
+    summary: str = (
+        f'Добавлено слов: {counts["added"]}\n'
+        f'Уже были в словаре: {counts["exists"] + counts["duplicate"]}\n'
+        f'С ошибками: {counts["invalid"]}'
+    )
+
+    messages: list[str] = [summary]
+    current: list[str] = []
+    current_length: int = 0
+    for line in lines:
+        report: str = format_word_line(line)
+        if current and current_length + len(report) + 1 > MAX_MESSAGE_LENGTH:
+            messages.append('\n'.join(current))
+            current, current_length = [], 0
+        current.append(report)
+        current_length += len(report) + 1
+
+    if current:
+        messages.append('\n'.join(current))
+
+    return messages
@@ -1,23 +1,27 @@
+from sqlalchemy.orm import Session
 from telebot import types
 
 from ...db.models import Word
 from ..bot_config import (
-    CHATBOT_BTNS, CHATBOT_ERRORS, CHATBOT_MESSAGE, SESSION
+    APP, CHATBOT_BTNS, CHATBOT_ERRORS, CHATBOT_MESSAGE
 )
-from ..bot_init import bot
+from ..bot_init import get_bot
 from ..db import (
     get_word_by_user_id,
     word_exists_in_db,
     handle_new_user,
     get_user_id,
     delete_word_from_db,
+    find_similar_words,
     remove_word_from_view
 )
+from ..outbound import send_message
+from ..query_budget import query_budget
 from ..response_handlers import inform_user_of_word_change
 from ..ui import show_interaction_menu
 
 
-@bot.message_handler(commands=['delete_word'])
+@query_budget(1)
 def handle_delete_word(user_message: types.Message) -> None:
     """Handles the command to delete a word from the user's word list.
 
@@ -25,67 +29,83 @@ def handle_delete_word(user_message: types.Message) -> None:
     next step handler to process the delete word request.
     """
     handle_new_user(user_message)
-    bot.send_message(user_message.chat.id, CHATBOT_MESSAGE['delete_user_word'])
-    bot.register_next_step_handler(user_message, handle_delete_word_request)
+    send_message(user_message.chat.id, CHATBOT_MESSAGE['delete_user_word'])
+    get_bot().register_next_step_handler(
+        user_message, handle_delete_word_request
+    )
 
 
+@query_budget(10)
 def handle_delete_word_request(user_message: types.Message) -> None:
     """Handles the request to delete a word from the user's word list.
 
-    Deletes a word from the user's word list based on the user's input.
+    Deletes a word from the user's word list based on the user's input. If
+    there is no such word, the user's words spelt similarly are suggested.
     """
-    with SESSION as session:
+    with APP.session_factory() as session:
         user_id: int = get_user_id(session, user_message)
         word_to_delete: str = user_message.text.title()
+        operation, word = delete_or_hide_word(session, user_id, word_to_delete)
+        suggestions: list[str] = find_similar_words(
+            session, user_id, word
+        ) if operation == 'word_not_found' else []
+
+    if operation == 'word_not_found':
+        send_message(
+            user_message.chat.id, get_word_not_found_text(suggestions)
+        )
+    else:
+        inform_user_of_word_change(user_message, operation, word)
 
-        word_in_user_db: Word = get_word_by_user_id(
-            session,
-            word_to_delete,
-            user_id
+    show_interaction_menu(
+        user_message,
+        CHATBOT_BTNS,
+        ['next', 'add_word', 'delete_word']
         )
-        if word_in_user_db is None:
-            handle_word_not_in_user_db(
-                session, user_id,
-                word_to_delete, user_message
-            )
-        else:
-            handle_word_in_user_db(
-                session,
-                word_in_user_db,
-                user_message
-            )
-
-        show_interaction_menu(
-            user_message,
-            CHATBOT_BTNS,
-            ['next', 'add_word', 'delete_word']
-            )
-
-
-def handle_word_not_in_user_db(
-        session: SESSION,
-        user_id: int,
-        word: str,
-        user_message: types.Message
-) -> None:
+
+
+def get_word_not_found_text(suggestions: list[str]) -> str:
+    """Returns the error for a missing word with the suggested words."""
+    if not suggestions:
+        return CHATBOT_ERRORS['word_not_found']
+
+    return (f"{CHATBOT_ERRORS['word_not_found']}\n\n"
+            f"{CHATBOT_MESSAGE['did_you_mean']} {', '.join(suggestions)}")
+
+
+def delete_or_hide_word(session: Session, user_id: int, word: str) \
+        -> tuple[str, str]:
+    """Deletes the user's own word or hides a shared word from the user.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        word (str): The word to delete.
+
+    Returns:
+        tuple[str, str]: The performed operation ('delete', 'remove' or
+            'word_not_found') and the affected word.
+    """
+    word_in_user_db: Word | None = get_word_by_user_id(session, word, user_id)
+
+    if word_in_user_db is None:
+        return handle_word_not_in_user_db(session, user_id, word), word
+
+    return handle_word_in_user_db(session, word_in_user_db), \
+        word_in_user_db.word
+
+
+def handle_word_not_in_user_db(session: Session, user_id: int, word: str) \
+        -> str:
     """Handles the case when a word is not in the user's database."""
     if not word_exists_in_db(session, word):
-        bot.send_message(user_message.chat.id, CHATBOT_ERRORS['word_not_found'])
-        return
+        return 'word_not_found'
 
     remove_word_from_view(session, user_id, word)
-    inform_user_of_word_change(
-        user_message, 'remove', word
-    )
+    return 'remove'
 
 
-def handle_word_in_user_db(
-        session: SESSION,
-        word_in_user_db: Word,
-        user_message: types.Message
-) -> None:
+def handle_word_in_user_db(session: Session, word_in_user_db: Word) -> str:
     """Handles the case when a word is in the user's database."""
     delete_word_from_db(session, word_in_user_db)
-    inform_user_of_word_change(
-        user_message, 'delete', word_in_user_db.word
-    )
+    return 'delete'
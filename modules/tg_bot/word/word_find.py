@@ -0,0 +1,219 @@
+from typing import NamedTuple
+
+from telebot import types
+
+from ..bot_config import APP, CHATBOT_BTNS
+from ..cache import WordSearch, WordSearchPage, get_word_search
+from ..db import find_user_id, get_user_id
+from ..outbound import call_bot_api, send_message
+from ..query_budget import query_budget
+
+FIND_PAGE_SIZE = 10
+INLINE_PAGE_SIZE = 20
+# Seconds Telegram may reuse the answer to an inline query
+INLINE_CACHE_TIME = 10
+# The prefix is carried in the callback data of the page buttons, which
+# Telegram limits to 64 bytes
+MAX_PREFIX_LENGTH = 20
+
+ALL_WORDS_TITLE = 'Все слова:\n'
+NO_WORDS_FOUND_TEXT = 'Слов, начинающихся на «{prefix}», нет'
+
+
+class FoundWordsScreen(NamedTuple):
+    """A page of the found words ready to be sent.
+
+    Attributes:
+        text (str): The text listing the words of the page.
+        reply_markup (types.InlineKeyboardMarkup): The page navigation.
+    """
+    text: str
+    reply_markup: types.InlineKeyboardMarkup
+
+
+def load_word_search() -> WordSearch:
+    """Returns the word search index, loading it on first use.
+
+    The load is recorded as the 'load_word_search' startup phase.
+    """
+    word_search: WordSearch = get_word_search()
+    if not word_search.loaded:
+        with APP.phase('load_word_search'):
+            word_search.load(APP.session_factory)
+
+    return word_search
+
+
+@query_budget(1)
+def find_command(message: types.Message) -> None:
+    """Handles the /find command and sends the user the first page of the
+    words and translations starting with the text after the command.
+
+    Without the text, all the base words and the user's own words are
+    listed, hidden ones included.
+    """
+    with APP.session_factory() as session:
+        user_id: int = get_user_id(session, message)
+
+    screen: FoundWordsScreen = load_found_words_screen(
+        user_id, get_find_prefix(message.text)
+    )
+    send_message(message.chat.id, screen.text, screen.reply_markup)
+
+
+@query_budget(1)
+def handle_find_callback(
+        call: types.CallbackQuery, direction: str, anchor_id: str, prefix: str
+) -> None:
+    """Turns the page of the found words, editing the message in place.
+
+    A button pressed twice asks for the page already shown; Telegram
+    rejects such an edit as "message is not modified", which the outbound
+    dispatcher counts as sent.
+
+    Args:
+        call (types.CallbackQuery): The callback query of the button.
+        direction (str): 'after' or 'before' the anchor word.
+        anchor_id (str): The ID of the word the page starts from.
+        prefix (str): The prefix searched for.
+    """
+    with APP.session_factory() as session:
+        user_id: int = get_user_id(session, call.message)
+
+    screen: FoundWordsScreen = load_found_words_screen(
+        user_id, prefix, int(anchor_id), direction
+    )
+    chat_id: int = call.message.chat.id
+    call_bot_api(chat_id, 'answer_callback_query', callback_query_id=call.id)
+    call_bot_api(
+        chat_id, 'edit_message_text', text=screen.text, chat_id=chat_id,
+        message_id=call.message.message_id, reply_markup=screen.reply_markup
+    )
+
+
+@query_budget(1)
+def handle_inline_query(query: types.InlineQuery) -> None:
+    """Answers an inline query with the words starting with its text.
+
+    The words of users who have not started the bot are not known, so they
+    get the base words only.
+    """
+    with APP.session_factory() as session:
+        user_id: int | None = find_user_id(session, query.from_user.id)
+
+    results, next_offset = get_inline_answer(user_id, query)
+    call_bot_api(
+        query.from_user.id, 'answer_inline_query', inline_query_id=query.id,
+        results=results, cache_time=INLINE_CACHE_TIME, is_personal=True,
+        next_offset=next_offset
+    )
+
+
+def get_find_prefix(text: str | None) -> str:
+    """Returns the prefix given after the /find command."""
+    parts: list[str] = (text or '').split(maxsplit=1)
+    return parts[1].strip().lower()[:MAX_PREFIX_LENGTH] if len(parts) > 1 \
+        else ''
+
+
+def load_found_words_screen(
+        user_id: int,
+        prefix: str,
+        anchor_id: int | None = None,
+        direction: str | None = None
+) -> FoundWordsScreen:
+    """Searches a page of the words starting with the prefix and renders it.
+
+    Args:
+        user_id (int): The ID of the user.
+        prefix (str): The prefix searched for.
+        anchor_id (int | None): The word the page continues from; None for
+            the first page.
+        direction (str | None): 'after' or 'before' the anchor word.
+
+    Returns:
+        FoundWordsScreen: The page.
+    """
+    page: WordSearchPage = load_word_search().search(
+        user_id, prefix, anchor_id, direction or 'after', FIND_PAGE_SIZE
+    )
+    if direction is None:
+        return render_found_words(prefix, page, False, page.has_more)
+
+    if not page.words:
+        # The anchor word or the words before it are gone, start over
+        return load_found_words_screen(user_id, prefix)
+
+    if direction == 'before':
+        return render_found_words(prefix, page, page.has_more, True)
+
+    return render_found_words(prefix, page, True, page.has_more)
+
+
+def render_found_words(
+        prefix: str, page: WordSearchPage, has_previous: bool, has_next: bool
+) -> FoundWordsScreen:
+    """Renders the page text and the navigation buttons.
+
+    The callback data of the buttons carries the prefix and the ID of the
+    word the next page starts from, so turning a page needs no state.
+    """
+    if not page.words:
+        return FoundWordsScreen(
+            NO_WORDS_FOUND_TEXT.format(prefix=prefix),
+            types.InlineKeyboardMarkup()
+        )
+
+    title: str = f'Слова на «{prefix}»:\n' if prefix else ALL_WORDS_TITLE
+    text: str = title + ''.join(
+        f'\n🇺🇸 {word} - 🇷🇺 {translation}'
+        for _, word, translation in page.words
+    )
+
+    navigation: list[types.InlineKeyboardButton] = []
+    if has_previous:
+        navigation.append(types.InlineKeyboardButton(
+            text=CHATBOT_BTNS['previous_page'],
+            callback_data=f'find:before:{page.words[0].id}:{prefix}'
+        ))
+    if has_next:
+        navigation.append(types.InlineKeyboardButton(
+            text=CHATBOT_BTNS['next_page'],
+            callback_data=f'find:after:{page.words[-1].id}:{prefix}'
+        ))
+
+    keyboard = types.InlineKeyboardMarkup()
+    if navigation:
+        keyboard.row(*navigation)
+
+    return FoundWordsScreen(text, keyboard)
+
+
+def get_inline_answer(user_id: int | None, query: types.InlineQuery) \
+        -> tuple[list[types.InlineQueryResultArticle], str]:
+    """Returns the results of the inline query and the offset of the next
+    page.
+
+    The offset is the ID of the last word of the page, so Telegram asks
+    for the words after it when the user scrolls down; it is empty on the
+    last page. Nothing more is listed if that word has been deleted since.
+    """
+    page: WordSearchPage = load_word_search().search(
+        user_id,
+        query.query.strip(),
+        int(query.offset) if query.offset.isdigit() else None,
+        'after',
+        INLINE_PAGE_SIZE
+    )
+    results: list[types.InlineQueryResultArticle] = [
+        types.InlineQueryResultArticle(
+            id=str(word_id),
+            title=word,
+            description=translation,
+            input_message_content=types.InputTextMessageContent(
+                f'🇺🇸 {word} - 🇷🇺 {translation}'
+            )
+        )
+        for word_id, word, translation in page.words
+    ]
+    return results, str(page.words[-1].id) if page.has_more else ''
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 
 def check_word_format(
@@ -15,9 +16,14 @@ def check_word_format(
     )
 
 
+@lru_cache(maxsize=16)
 def create_regex_patterns(english_pattern: str, russian_pattern: str) \
         -> tuple[re.Pattern, re.Pattern]:
-    """Create regular expressions for English and Russian languages"""
+    """Create regular expressions for English and Russian languages
+
+    The compiled patterns are cached, so checking a word does not compile
+    them again.
+    """
     eng_regex = re.compile(r'^' + english_pattern + '$')
     rus_regex = re.compile(r'^' + russian_pattern + '$')
     return eng_regex, rus_regex
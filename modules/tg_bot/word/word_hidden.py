@@ -0,0 +1,201 @@
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+from telebot import types
+
+from ..bot_config import APP, CHATBOT_BTNS
+from ..db import (
+    HiddenWordsPage,
+    get_hidden_words_page,
+    get_user_id,
+    handle_new_user,
+    return_word_to_view
+)
+from ..outbound import call_bot_api, send_message
+from ..query_budget import query_budget
+from ..response_handlers import get_word_change_message
+
+HIDDEN_WORDS_TITLE = 'Скрытые слова:\n'
+NO_HIDDEN_WORDS_TEXT = 'Скрытых слов нет'
+
+
+class HiddenWordsScreen(NamedTuple):
+    """A page of the hidden words list ready to be sent.
+
+    Attributes:
+        text (str): The text listing the words of the page.
+        reply_markup (types.InlineKeyboardMarkup): The unhide buttons of the
+            words and the page navigation.
+    """
+    text: str
+    reply_markup: types.InlineKeyboardMarkup
+
+
+@query_budget(2)
+def hidden_words_command(message: types.Message) -> None:
+    """Handles the /hidden_words command and sends the user the first page
+    of their hidden words."""
+    handle_new_user(message)
+    with APP.session_factory() as session:
+        screen: HiddenWordsScreen = load_hidden_words_screen(
+            session, get_user_id(session, message)
+        )
+
+    send_message(message.chat.id, screen.text, screen.reply_markup)
+
+
+@query_budget(5)
+def handle_hidden_words_callback(
+        call: types.CallbackQuery, action: str, *args: str
+) -> None:
+    """Turns the page of the hidden words list or unhides one of its words.
+
+    The list message is edited in place.
+
+    Args:
+        call (types.CallbackQuery): The callback query of the button.
+        action (str): 'hidden' for page navigation, 'unhide' for unhiding.
+        *args (str): The rest of the callback data.
+    """
+    with APP.session_factory() as session:
+        word, screen = run_hidden_words_action(
+            session, get_user_id(session, call.message), action, *args
+        )
+
+    chat_id: int = call.message.chat.id
+    call_bot_api(
+        chat_id, 'answer_callback_query', callback_query_id=call.id,
+        text=get_word_change_message('unhide', word) if word else None
+    )
+    call_bot_api(
+        chat_id, 'edit_message_text', text=screen.text, chat_id=chat_id,
+        message_id=call.message.message_id, reply_markup=screen.reply_markup
+    )
+
+
+def run_hidden_words_action(
+        session: Session, user_id: int, action: str, *args: str
+) -> tuple[str | None, HiddenWordsScreen]:
+    """Runs the action of a hidden words button for the user.
+
+    Returns:
+        tuple[str | None, HiddenWordsScreen]: The unhidden word, if any, and
+            the page to show.
+    """
+    if action == 'unhide':
+        return unhide_hidden_word(session, user_id, *args)
+
+    return None, load_hidden_words_screen(session, user_id, *args)
+
+
+def load_hidden_words_screen(
+        session: Session,
+        user_id: int,
+        direction: str | None = None,
+        anchor_id: str | None = None,
+        has_previous: str = '0'
+) -> HiddenWordsScreen:
+    """Fetches a page of the user's hidden words and renders it.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        direction (str | None): 'after', 'before' or 'from' the anchor
+            setting; None for the first page.
+        anchor_id (str | None): The setting ID from the callback data.
+        has_previous (str): '1' if a page 'from' the anchor has a previous
+            page, as the callback data says.
+
+    Returns:
+        HiddenWordsScreen: The page.
+    """
+    if direction is None:
+        page: HiddenWordsPage = get_hidden_words_page(session, user_id)
+        return render_hidden_words(page, False, page.has_more)
+
+    page = get_hidden_words_page(session, user_id, int(anchor_id), direction)
+    if direction == 'before':
+        return render_hidden_words(page, page.has_more, True)
+    if direction == 'from' and not page.words and has_previous == '1':
+        # The last word of the last page was unhidden
+        page = get_hidden_words_page(
+            session, user_id, int(anchor_id), 'before'
+        )
+        return render_hidden_words(page, page.has_more, False)
+
+    return render_hidden_words(
+        page, direction == 'after' or has_previous == '1', page.has_more
+    )
+
+
+def unhide_hidden_word(
+        session: Session,
+        user_id: int,
+        user_word_setting_id: str,
+        first_id: str,
+        has_previous: str
+) -> tuple[str | None, HiddenWordsScreen]:
+    """Unhides the user's word and reloads the page it was listed on.
+
+    Args:
+        session (Session): The database session.
+        user_id (int): The ID of the user.
+        user_word_setting_id (str): The setting ID of the word.
+        first_id (str): The setting ID of the first word on the page.
+        has_previous (str): '1' if the page has a previous page.
+
+    Returns:
+        tuple[str | None, HiddenWordsScreen]: The unhidden word, or None if
+            it was not hidden anymore, and the reloaded page.
+    """
+    word: str | None = return_word_to_view(
+        session, user_id, int(user_word_setting_id)
+    )
+    return word, load_hidden_words_screen(
+        session, user_id, 'from', first_id, has_previous
+    )
+
+
+def render_hidden_words(
+        page: HiddenWordsPage, has_previous: bool, has_next: bool
+) -> HiddenWordsScreen:
+    """Renders the page text with an unhide button per word and the
+    navigation buttons.
+
+    The callback data of the buttons carries the setting IDs the pages
+    start from, so turning a page needs no state.
+    """
+    if not page.words:
+        return HiddenWordsScreen(
+            NO_HIDDEN_WORDS_TEXT, types.InlineKeyboardMarkup()
+        )
+
+    text: str = HIDDEN_WORDS_TITLE + ''.join(
+        f'\n🇺🇸 {word} - 🇷🇺 {translation}'
+        for _, word, translation in page.words
+    )
+
+    first_id: int = page.words[0].id
+    keyboard = types.InlineKeyboardMarkup(row_width=2)
+    for user_word_setting_id, word, _ in page.words:
+        keyboard.row(types.InlineKeyboardButton(
+            text=f"{CHATBOT_BTNS['unhide']} {word}",
+            callback_data=(f'unhide:{user_word_setting_id}:{first_id}:'
+                           f'{int(has_previous)}')
+        ))
+
+    navigation: list[types.InlineKeyboardButton] = []
+    if has_previous:
+        navigation.append(types.InlineKeyboardButton(
+            text=CHATBOT_BTNS['previous_page'],
+            callback_data=f'hidden:before:{first_id}'
+        ))
+    if has_next:
+        navigation.append(types.InlineKeyboardButton(
+            text=CHATBOT_BTNS['next_page'],
+            callback_data=f'hidden:after:{page.words[-1].id}'
+        ))
+    if navigation:
+        keyboard.row(*navigation)
+
+    return HiddenWordsScreen(text, keyboard)
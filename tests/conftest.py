@@ -0,0 +1,84 @@
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.load import StubTransport, prepare_work_dir, seed_words
+
+
+@pytest.fixture(scope='session')
+def transport(tmp_path_factory) -> StubTransport:
+    """Prepares a fresh SQLite database with the base words.
+
+    The config and data files are written to a temporary working
+    directory; Bot API calls of both bots go to the returned stub
+    transport of the load benchmark. Query budgets are strict.
+    """
+    from telebot import apihelper, asyncio_helper
+
+    from modules.tg_bot import APP
+    from modules.tg_bot.query_budget import QUERY_BUDGETS
+
+    work_dir: str = str(tmp_path_factory.mktemp('bot'))
+    prepare_work_dir(
+        work_dir, f'sqlite:///{os.path.join(work_dir, "bot.db")}'
+    )
+    # The bootstrap reads data/ from the working directory; the paths of
+    # APP were resolved when the modules were imported
+    project_root: str = os.getcwd()
+    os.chdir(work_dir)
+    APP.config_path = os.path.join(work_dir, 'settings.ini')
+    APP.data_path = os.path.join(work_dir, 'data', 'chatbot.json')
+
+    stub = StubTransport()
+
+    async def process_request(token, url, method='get', params=None,
+                              files=None, **kwargs):
+        return stub(method, url, params=params).json()['result']
+
+    process_async_request = asyncio_helper._process_request
+    apihelper.CUSTOM_REQUEST_SENDER = stub
+    asyncio_helper._process_request = process_request
+    QUERY_BUDGETS.strict = True
+    seed_words(work_dir, 0)
+    try:
+        yield stub
+    finally:
+        QUERY_BUDGETS.strict = False
+        apihelper.CUSTOM_REQUEST_SENDER = None
+        asyncio_helper._process_request = process_async_request
+        os.chdir(project_root)
+
+
+@pytest.fixture(scope='session')
+def sync_bot(transport):
+    """The threaded bot, handling updates in the calling thread."""
+    from modules.tg_bot import APP, get_bot
+    from modules.tg_bot.query_budget import count_handler_queries
+    from modules.tg_bot.word import load_word_search
+
+    bot = get_bot()
+    bot.threaded = False
+    # Loaded at startup, as start_bot does, so /find does not pay for it
+    load_word_search()
+    count_handler_queries(APP.engine)
+    return bot
+
+
+@pytest.fixture(scope='session')
+def async_bot(transport):
+    """The asyncio bot and the event loop it handles updates in."""
+    from modules.tg_bot.aio import get_async_bot
+    from modules.tg_bot.aio.bot_init import get_async_engine
+    from modules.tg_bot.query_budget import count_handler_queries
+    from modules.tg_bot.word import load_word_search
+
+    loop = asyncio.new_event_loop()
+    bot = get_async_bot()
+    load_word_search()
+    count_handler_queries(get_async_engine().sync_engine)
+    try:
+        yield bot, loop
+    finally:
+        loop.run_until_complete(get_async_engine().dispose())
+        loop.close()
@@ -0,0 +1,66 @@
+import itertools
+import random
+
+import pytest
+
+from modules.search import edit_distance
+
+
+def reference_distance(first: str, second: str) -> int:
+    """The textbook Levenshtein distance, computed over the full table."""
+    table: list[list[int]] = [
+        [i + j if i * j == 0 else 0 for j in range(len(second) + 1)]
+        for i in range(len(first) + 1)
+    ]
+    for i, j in itertools.product(
+            range(1, len(first) + 1), range(1, len(second) + 1)
+    ):
+        table[i][j] = min(
+            table[i - 1][j] + 1,
+            table[i][j - 1] + 1,
+            table[i - 1][j - 1] + (first[i - 1] != second[j - 1])
+        )
+    return table[-1][-1]
+
+
+def random_pairs(count: int) -> list[tuple[str, str]]:
+    rng = random.Random(22)
+    return [
+        (
+            ''.join(rng.choices('abc', k=rng.randint(0, 7))),
+            ''.join(rng.choices('abc', k=rng.randint(0, 7)))
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize(('first', 'second', 'distance'), [
+    ('', '', 0),
+    ('', 'abc', 3),
+    ('kitten', 'sitting', 3),
+    ('flaw', 'lawn', 2),
+    ('Yellow', 'Yelow', 1),
+])
+def test_edit_distance(first: str, second: str, distance: int) -> None:
+    assert edit_distance(first, second) == distance
+    assert edit_distance(second, first) == distance
+
+
+def test_matches_reference_distance() -> None:
+    for first, second in random_pairs(500):
+        assert edit_distance(first, second) == \
+            reference_distance(first, second)
+
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2, 3])
+def test_bounded_distance_is_capped(max_distance: int) -> None:
+    for first, second in random_pairs(500):
+        assert edit_distance(first, second, max_distance) == min(
+            reference_distance(first, second), max_distance + 1
+        )
+
+
+def test_bounded_distance_exceeded_in_the_last_row() -> None:
+    # Every row has a cell within the bound, so the distance of 4 is only
+    # known at the end
+    assert edit_distance('abcd', 'bdaa', 2) == 3
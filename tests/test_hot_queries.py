@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import create_engine, select
+
+from modules.db import Word, upgrade_database
+from modules.db.explain import HOT_QUERIES, check_hot_queries
+from modules.tg_bot.db import BOT_HOT_QUERIES
+
+QUERIES: dict = {**HOT_QUERIES, **BOT_HOT_QUERIES}
+
+
+@pytest.fixture(scope='module')
+def plans(tmp_path_factory) -> dict[str, tuple[bool, list[str]]]:
+    """Explains the hot queries on an empty database with the current
+    schema.
+
+    Without ANALYZE statistics SQLite plans for large tables, so the plans
+    are those of a production database rather than of a few test rows.
+    """
+    path = tmp_path_factory.mktemp('explain') / 'explain.db'
+    engine = create_engine(f'sqlite:///{path}')
+    upgrade_database(engine)
+    try:
+        yield check_hot_queries(engine, QUERIES)
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize('name', sorted(QUERIES))
+def test_hot_query_uses_index(plans, name):
+    indexed, plan = plans[name]
+    assert indexed, '\n'.join(plan)
+
+
+def test_table_scan_is_reported(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "scan.db"}')
+    upgrade_database(engine)
+    indexed, plan = check_hot_queries(engine, {
+        'word by translation': select(Word).where(Word.translation == 'x')
+    })['word by translation']
+    engine.dispose()
+
+    assert not indexed, '\n'.join(plan)
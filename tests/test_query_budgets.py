@@ -0,0 +1,202 @@
+import importlib
+import inspect
+import itertools
+import pkgutil
+from typing import Callable
+
+import pytest
+from telebot import types
+
+import modules.tg_bot
+from benchmarks.query_budget import Flow, hide_words, registered_handlers
+from modules.tg_bot.aio.instrumentation import instrument_async_handler
+from modules.tg_bot.instrumentation import instrument_handler
+from modules.tg_bot.query_budget import QUERY_BUDGETS, QueryBudgetExceeded
+
+UPDATE_IDS = itertools.count(1)
+# Handlers called by handle_callback_query rather than registered with the
+# bot; the test tracks them on their own
+NESTED_HANDLERS = ('handle_find_callback', 'handle_hidden_words_callback')
+
+
+class AsyncFlow(Flow):
+    """A user of the asyncio bot going through one flow.
+
+    Args:
+        bot: The asyncio bot.
+        loop: The event loop the bot handles updates in.
+        transport (StubTransport): The transport recording the replies.
+    """
+
+    def __init__(self, bot, loop, transport) -> None:
+        super().__init__(bot, transport)
+        self.loop = loop
+
+    def _process(self, update_json: dict) -> None:
+        from modules.tg_bot.aio.outbound import get_async_outbound_dispatcher
+        from modules.tg_bot.cache import (
+            get_user_id_cache, get_vocabulary_cache
+        )
+
+        async def process() -> None:
+            await self.bot.process_new_updates([update])
+            await get_async_outbound_dispatcher().wait_idle(timeout=10)
+
+        get_user_id_cache().clear()
+        get_vocabulary_cache().clear()
+        update_json['update_id'] = next(UPDATE_IDS)
+        update = types.Update.de_json(update_json)
+        try:
+            self.loop.run_until_complete(process())
+        except QueryBudgetExceeded as e:
+            self.errors.append(str(e))
+
+
+def answer_quiz(flow: Flow) -> None:
+    flow.send('/test_knowledge')
+    flow.send(flow.answer_options()[0])
+
+
+def page_hidden_words(flow: Flow) -> None:
+    hide_words(flow.chat_id, 25)
+    flow.send('/hidden_words')
+    flow.press(flow.last_buttons()[-1])
+    flow.press(flow.last_buttons()[-1])
+    flow.press(flow.last_buttons()[0])
+
+
+def page_found_words(flow: Flow) -> None:
+    flow.send('/find')
+    flow.press(flow.last_buttons()[-1])
+    flow.press(flow.last_buttons()[0])
+
+
+def quiz_category(flow: Flow) -> None:
+    flow.send('/categories')
+    flow.press(flow.last_buttons()[0])
+    flow.send(flow.answer_options()[0])
+    flow.press(flow.last_buttons()[0])
+
+
+# The flow of a user running each budgeted handler
+FLOWS: dict[str, Callable[[Flow], None]] = {
+    'start_message': lambda flow: flow.send('/start'),
+    'help_message': lambda flow: flow.send('/help'),
+    'about_bot_command': lambda flow: flow.send('/about'),
+    'handle_quiz': lambda flow: (
+        flow.send('/test_knowledge'), flow.send('/test_knowledge'),
+        quiz_category(flow)
+    ),
+    'validate_and_feedback_user_answer': lambda flow: (
+        answer_quiz(flow), quiz_category(flow)
+    ),
+    'handle_callback_query': lambda flow: (
+        answer_quiz(flow), flow.press('next'), flow.press('add_word'),
+        flow.press('delete_word'), quiz_category(flow)
+    ),
+    'show_quiz_categories': lambda flow: (
+        flow.send('/categories'), flow.press('quiz_categories')
+    ),
+    'handle_add_word': lambda flow: flow.send('/add_word'),
+    'handle_add_word_request': lambda flow: (
+        flow.send('/add_word'), flow.send('Budget, Бюджет'),
+        flow.send('/add_word'),
+        flow.send('\n'.join(f'Word{"x" * index}, Слово'
+                            for index in range(1, 20))),
+    ),
+    'handle_delete_word': lambda flow: flow.send('/delete_word'),
+    'handle_delete_word_request': lambda flow: (
+        flow.send('/add_word'), flow.send('Budget, Бюджет'),
+        flow.send('/delete_word'), flow.send('Budget'),
+        flow.send('/delete_word'), flow.send('Red'),
+        flow.send('/delete_word'), flow.send('Yelow'),
+    ),
+    'hidden_words_command': page_hidden_words,
+    'handle_hidden_words_callback': page_hidden_words,
+    'stats_command': lambda flow: (
+        answer_quiz(flow), flow.send('/stats'), flow.send('/stats')
+    ),
+    'find_command': lambda flow: (flow.send('/find'), flow.send('/find зел')),
+    'handle_find_callback': page_found_words,
+    'handle_inline_query': lambda flow: (
+        flow.inline('b'), flow.inline('', offset='1'),
+        flow.send('/start'), flow.inline('b'),
+    ),
+}
+
+
+def budgeted_handlers(kind: str) -> dict[str, int]:
+    """Returns the query budgets of the handlers of a bot by name.
+
+    Args:
+        kind (str): 'sync' for the threaded bot, 'async' for the asyncio
+            one.
+    """
+    package = modules.tg_bot if kind == 'sync' else modules.tg_bot.aio
+    budgets: dict[str, int] = {}
+    for module_info in pkgutil.walk_packages(
+            package.__path__, f'{package.__name__}.'
+    ):
+        if kind == 'sync' and module_info.name.startswith(
+                'modules.tg_bot.aio'
+        ):
+            continue
+        module = importlib.import_module(module_info.name)
+        for value in vars(module).values():
+            if inspect.isfunction(value) and hasattr(value, 'query_budget'):
+                budgets[value.__name__] = value.query_budget
+
+    return budgets
+
+
+def start_flow(kind: str, request, monkeypatch) -> Flow:
+    """Returns a new user of the bot whose nested handlers are tracked."""
+    transport = request.getfixturevalue('transport')
+    if kind == 'sync':
+        from modules.tg_bot import bot as bot_module
+
+        bot = request.getfixturevalue('sync_bot')
+        flow = Flow(bot, transport)
+        instrument = instrument_handler
+    else:
+        from modules.tg_bot.aio import bot as bot_module
+
+        bot, loop = request.getfixturevalue('async_bot')
+        flow = AsyncFlow(bot, loop, transport)
+        instrument = instrument_async_handler
+
+    for name in NESTED_HANDLERS:
+        monkeypatch.setattr(bot_module, name, instrument(
+            getattr(bot_module, name), 'callback_query'
+        ))
+    monkeypatch.setattr(QUERY_BUDGETS, 'peaks', {})
+    return flow
+
+
+@pytest.mark.parametrize('kind', ['sync', 'async'])
+def test_every_budgeted_handler_has_a_flow(kind):
+    assert sorted(budgeted_handlers(kind)) == sorted(FLOWS)
+
+
+@pytest.mark.parametrize('kind', ['sync', 'async'])
+def test_every_handler_has_a_budget(kind, request):
+    if kind == 'sync':
+        bot = request.getfixturevalue('sync_bot')
+    else:
+        bot, _ = request.getfixturevalue('async_bot')
+
+    assert [
+        handler.__name__ for handler in registered_handlers(bot)
+        if getattr(handler, 'query_budget', None) is None
+    ] == []
+
+
+@pytest.mark.parametrize('name', sorted(FLOWS))
+@pytest.mark.parametrize('kind', ['sync', 'async'])
+def test_handler_within_query_budget(kind, name, request, monkeypatch):
+    flow: Flow = start_flow(kind, request, monkeypatch)
+    FLOWS[name](flow)
+
+    assert flow.errors == []
+    assert name in QUERY_BUDGETS.peaks, f'{name} did not run'
+    assert QUERY_BUDGETS.peaks[name] <= budgeted_handlers(kind)[name]